@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import logging
 from copy import deepcopy
 from typing import TYPE_CHECKING
 
-from .blocking import _sql_gen_where_condition, block_using_rules_sql
+from .blocking import (
+    _equi_join_key_expressions,
+    _sql_gen_where_condition,
+    block_using_rules_sql,
+)
 from .misc import calculate_cartesian, calculate_reduction_ratio
 
+logger = logging.getLogger(__name__)
+
 # https://stackoverflow.com/questions/39740632/python-type-hinting-without-cyclic-imports
 if TYPE_CHECKING:
     from .linker import Linker
@@ -34,6 +41,153 @@ def number_of_comparisons_generated_by_blocking_rule_sql(
     return sql
 
 
+def blocking_key_counts_sql(
+    linker: Linker,
+    key_expressions: list[str],
+) -> str:
+    """For each value of the key of an equi-join blocking rule, count the number of
+    records sharing it, and the number of ordered pairs of these records which the
+    join generates.
+
+    The number of ordered pairs is twice the number of comparisons.  A key of n
+    records generates n * (n - 1) ordered pairs for a dedupe.  For a link, the
+    pairs of records from the same source dataset are excluded.  Keys with a null
+    component are excluded, because they never join.
+    """
+    settings_obj = linker._settings_obj
+
+    key_aliases = [f"__splink__key_{i}" for i in range(len(key_expressions))]
+    keys_as_aliases_expr = ", ".join(
+        f"{k} as {a}" for k, a in zip(key_expressions, key_aliases)
+    )
+    keys_expr = ", ".join(key_expressions)
+    not_null_expr = " and ".join(f"{k} is not null" for k in key_expressions)
+
+    if settings_obj._link_type == "link_only":
+        source_dataset_col = settings_obj._unique_id_input_columns[0].name()
+        sql = f"""
+        select
+            {", ".join(key_aliases)},
+            sum(n) as num_records,
+            sum(n) * sum(n) - sum(n * n) as num_ordered_pairs
+        from (
+            select {keys_as_aliases_expr}, count(*) as n
+            from __splink__df_concat
+            where {not_null_expr}
+            group by {keys_expr}, {source_dataset_col}
+        ) as key_source_counts
+        group by {", ".join(key_aliases)}
+        """
+    else:
+        sql = f"""
+        select
+            {keys_as_aliases_expr},
+            count(*) as num_records,
+            count(*) * (count(*) - 1) as num_ordered_pairs
+        from __splink__df_concat
+        where {not_null_expr}
+        group by {keys_expr}
+        """
+
+    return sql
+
+
+def number_of_ordered_pairs_from_blocking_key_counts_sql(
+    linker: Linker,
+    key_expressions: list[str],
+) -> str:
+    """Count the comparisons generated by an equi-join blocking rule from the
+    number of records sharing each value of its key, without executing the join.
+
+    The result is the number of ordered pairs of records, which is twice the
+    number of comparisons.
+    """
+    key_counts_sql = blocking_key_counts_sql(linker, key_expressions)
+
+    sql = f"""
+    select sum(num_ordered_pairs) as num_ordered_pairs
+    from ({key_counts_sql}) as key_counts
+    """
+
+    return sql
+
+
+def _key_value_sql(value):
+    if isinstance(value, str):
+        value = value.replace("'", "''")
+        return f"'{value}'"
+    return str(value)
+
+
+def blocking_key_skew_records(
+    linker: Linker,
+    blocking_rules: list[str],
+    top_n: int = 10,
+):
+    """For each blocking rule, find the values of its blocking key which generate
+    the most comparisons, using the number of records sharing each key rather than
+    executing the join.
+
+    Where a rule contains conditions other than equalities, such as a
+    levenshtein distance, the comparisons counted are those sharing the key of the
+    equalities, before the other conditions are applied.  This is the work done
+    by the join for that key.
+    """
+    sql_dialect = linker._sql_dialect
+    concat = linker._initialise_df_concat(materialise=True)
+
+    records = []
+    for blocking_rule in blocking_rules:
+        key_expressions = _equi_join_key_expressions(
+            blocking_rule, sql_dialect, ignore_other_conditions=True
+        )
+        if not key_expressions:
+            logger.warning(
+                f"Blocking rule {blocking_rule} does not contain an equi-join "
+                "condition, so its blocking key skew cannot be analysed"
+            )
+            continue
+
+        keys = [k.sql(dialect=sql_dialect) for k in key_expressions]
+        sql = blocking_key_counts_sql(linker, keys)
+        linker._enqueue_sql(sql, "__splink__df_blocking_key_counts")
+
+        sql = f"""
+        select *, sum(num_ordered_pairs) over () as total_ordered_pairs
+        from __splink__df_blocking_key_counts
+        order by num_ordered_pairs desc
+        limit {top_n}
+        """
+        linker._enqueue_sql(sql, "__splink__df_blocking_key_skew")
+        skew = linker._execute_sql_pipeline([concat])
+        skew_records = skew.as_record_dict()
+        skew.drop_table_from_database()
+
+        for r in skew_records:
+            key = " and ".join(
+                f"{k} = {_key_value_sql(r[f'__splink__key_{i}'])}"
+                for i, k in enumerate(keys)
+            )
+            num_ordered_pairs = int(r["num_ordered_pairs"])
+            total_ordered_pairs = int(r["total_ordered_pairs"])
+            if total_ordered_pairs:
+                proportion = num_ordered_pairs / total_ordered_pairs
+            else:
+                proportion = 0.0
+            records.append(
+                {
+                    "rule": blocking_rule,
+                    "key": key,
+                    "num_records": int(r["num_records"]),
+                    "num_comparisons": num_ordered_pairs // 2,
+                    "proportion_of_comparisons": proportion,
+                    "total_comparisons_for_rule": total_ordered_pairs // 2,
+                }
+            )
+
+    return records
+
+
 def cumulative_comparisons_generated_by_blocking_rules(
     linker: Linker,
     blocking_rules,
@@ -3,6 +3,12 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 import logging
 
+import sqlglot
+from sqlglot.expressions import EQ, Column
+from sqlglot.optimizer.normalize import normalize
+
+from .comparison_level import _get_and_subclauses
+from .misc import dedupe_preserving_order
 from .unique_id_concat import _composite_unique_id_from_nodes_sql
 
 logger = logging.getLogger(__name__)
@@ -17,10 +23,14 @@ class BlockingRule:
         self,
         blocking_rule,
         salting_partitions=1,
+        skewed_key_threshold=None,
     ):
         self.blocking_rule = blocking_rule
         self.preceding_rules = []
         self.salting_partitions = salting_partitions
+        # If set, only blocking keys shared by more than this number of records
+        # are salted
+        self.skewed_key_threshold = skewed_key_threshold
 
     @property
     def match_key(self):
@@ -49,6 +59,106 @@ class BlockingRule:
                 yield f"{self.blocking_rule} and ceiling(l.__splink_salt * {self.salting_partitions}) = {n+1}"  # noqa: E501
 
 
+def _equi_join_key_expressions(
+    blocking_rule: str, sql_dialect: str = None, ignore_other_conditions=False
+):
+    """If a blocking rule is a conjunction of equalities between the same
+    expression of the left and right records, such as
+    `l.first_name = r.first_name and substr(l.dob,1,4) = substr(r.dob,1,4)`,
+    return these expressions as sqlglot trees with the `l` and `r` table prefixes
+    removed.  Otherwise return None.
+
+    If `ignore_other_conditions` is True, return the keys of the equalities
+    even if the rule also contains other conditions, such as
+    `levenshtein(l.surname, r.surname) < 2`.  These are the keys the join is
+    partitioned on.
+    """
+    try:
+        syntax_tree = sqlglot.parse_one(blocking_rule, read=sql_dialect)
+    except sqlglot.errors.ParseError:
+        return None
+
+    def tables(expr):
+        return {c.table for c in expr.find_all(Column)}
+
+    def remove_table_prefixes(expr):
+        expr = expr.copy()
+        for column in expr.find_all(Column):
+            column.set("table", None)
+        return expr
+
+    keys = []
+    for expr in _get_and_subclauses(normalize(syntax_tree)):
+        key = None
+        if isinstance(expr, EQ):
+            left, right = expr.this, expr.expression
+            if tables(left) == {"r"} and tables(right) == {"l"}:
+                left, right = right, left
+            if tables(left) == {"l"} and tables(right) == {"r"}:
+                key = remove_table_prefixes(left)
+                if key != remove_table_prefixes(right):
+                    key = None
+
+        if key is not None:
+            keys.append(key)
+        elif not ignore_other_conditions:
+            return None
+
+    return keys or None
+
+
+def _exact_match_blocking_columns(blocking_rule: str, sql_dialect: str = None):
+    """If a blocking rule is a conjunction of exact matches on columns, such as
+    `l.first_name = r.first_name and l.dob = r.dob`, return the sql of the
+    columns, sorted so that equivalent rules give the same list.  Otherwise
+    return None.
+    """
+    keys = _equi_join_key_expressions(blocking_rule, sql_dialect)
+    if not keys or not all(isinstance(k, Column) for k in keys):
+        return None
+
+    return sorted({k.sql(dialect=sql_dialect) for k in keys})
+
+
+def _blocking_rules_using_hashed_keys(blocking_rules, sql_dialect, hash_columns_sql):
+    """Rewrite each exact match blocking rule to join on a single 64 bit hash of
+    the columns it matches on.
+
+    Returns the rewritten blocking rules, and a dict mapping the name of each
+    hash column to the sql expression which computes it.  The hash is null if any
+    of the columns is null, so that null values do not match, as in the original
+    rule.  The original rule is retained as a residual condition of the join, so
+    that pairs whose hashes collide are neither generated by the rule nor
+    excluded from later rules.
+    """
+    key_columns = {}
+    rewritten_rules = []
+    for br in blocking_rules:
+        columns = _exact_match_blocking_columns(br.blocking_rule, sql_dialect)
+        rule = br.blocking_rule
+        if columns:
+            key_name = f"__splink__blocking_key_{len(key_columns)}"
+            key_name = key_columns.setdefault(tuple(columns), key_name)
+            rule = f"l.{key_name} = r.{key_name} and ({rule})"
+
+        rewritten_br = BlockingRule(
+            rule,
+            salting_partitions=br.salting_partitions,
+            skewed_key_threshold=br.skewed_key_threshold,
+        )
+        rewritten_br.preceding_rules = rewritten_rules.copy()
+        rewritten_rules.append(rewritten_br)
+
+    hash_exprs = {}
+    for columns, key_name in key_columns.items():
+        any_null = " or ".join(f"{c} is null" for c in columns)
+        hash_exprs[
+            key_name
+        ] = f"case when {any_null} then null else {hash_columns_sql(columns)} end"
+
+    return rewritten_rules, hash_exprs
+
+
 def _sql_gen_where_condition(link_type, unique_id_cols):
     id_expr_l = _composite_unique_id_from_nodes_sql(unique_id_cols, "l")
     id_expr_r = _composite_unique_id_from_nodes_sql(unique_id_cols, "r")
@@ -77,10 +187,7 @@ def block_using_rules_sql(linker: Linker):
     so that duplicate comparisons are not generated.
     """
 
-    if type(linker).__name__ in ["SparkLinker"]:
-        apply_salt = True
-    else:
-        apply_salt = False
+    apply_salt = linker._supports_salting
 
     settings_obj = linker._settings_obj
 
@@ -146,25 +253,90 @@ def block_using_rules_sql(linker: Linker):
     if not blocking_rules:
         blocking_rules = [BlockingRule("1=1")]
 
+    strategy = linker._blocking_rule_deduplication_strategy
+    if strategy not in ("and_not_preceding_rules", "dedupe_min_match_key"):
+        raise ValueError(
+            f"Unknown blocking rule deduplication strategy '{strategy}'. "
+            "Must be one of 'and_not_preceding_rules' or 'dedupe_min_match_key'"
+        )
+
+    # With a single rule, there are no duplicate comparisons to remove
+    if len(blocking_rules) == 1:
+        strategy = "and_not_preceding_rules"
+
+    input_tablename_l = linker._input_tablename_l
+    input_tablename_r = linker._input_tablename_r
+
+    if settings_obj._hash_exact_match_blocking_keys:
+        try:
+            blocking_rules, hash_exprs = _blocking_rules_using_hashed_keys(
+                blocking_rules, linker._sql_dialect, linker._hash_columns_sql
+            )
+        except NotImplementedError:
+            logger.warning(
+                "WARNING: Hashing of exact match blocking keys is not supported by "
+                "this linker backend and will not be implemented for this run."
+            )
+        else:
+            if hash_exprs:
+                input_tablename_l, input_tablename_r = _enqueue_hashed_key_tables(
+                    linker, hash_exprs
+                )
+
+    unique_id_cols = settings_obj._unique_id_input_columns
+    if strategy == "dedupe_min_match_key":
+        # Generate only the ids of each pair, and join on the remaining columns
+        # once the pairs have been deduplicated
+        pair_select_expr = ", ".join(
+            [c.l_name_as_l() for c in unique_id_cols]
+            + [c.r_name_as_r() for c in unique_id_cols]
+        )
+    else:
+        pair_select_expr = sql_select_expr
+
     sqls = []
     for br in blocking_rules:
+        table_l, table_r = input_tablename_l, input_tablename_r
+
         # Apply our salted rules to resolve skew issues. If no salt was
         # selected to be added, then apply the initial blocking rule.
-        if apply_salt:
+        salted_tables = None
+        if apply_salt and br.skewed_key_threshold is not None:
+            salted_tables = _enqueue_tables_salting_skewed_keys(
+                linker, br, input_tablename_l, input_tablename_r
+            )
+
+        if salted_tables:
+            table_l, table_r = salted_tables
+            salted_blocking_rules = [
+                f"({br.blocking_rule}) "
+                "and l.__splink__salt_bucket = r.__splink__salt_bucket"
+            ]
+        elif apply_salt:
             salted_blocking_rules = br.salted_blocking_rules
         else:
             salted_blocking_rules = [br.blocking_rule]
 
+        if strategy == "and_not_preceding_rules":
+            and_not_preceding_rules_sql = br.and_not_preceding_rules_sql
+        else:
+            and_not_preceding_rules_sql = ""
+
         for salted_br in salted_blocking_rules:
+            # Brackets ensure the exclusion applies to the whole of a rule
+            # containing an OR
+            if and_not_preceding_rules_sql:
+                salted_br = f"({salted_br})"
+
             sql = f"""
             select
-            {sql_select_expr}
+            {pair_select_expr}
             , '{br.match_key}' as match_key
-            from {linker._input_tablename_l} as l
-            inner join {linker._input_tablename_r} as r
+            from {table_l} as l
+            inner join {table_r} as r
             on
             {salted_br}
-            {br.and_not_preceding_rules_sql}
+            {and_not_preceding_rules_sql}
             {where_condition}
             """
 
@@ -172,4 +344,169 @@ def block_using_rules_sql(linker: Linker):
 
     sql = "union all".join(sqls)
 
+    if strategy == "dedupe_min_match_key":
+        sql = _dedupe_pairs_and_join_columns_sql(
+            sql,
+            sql_select_expr,
+            unique_id_cols,
+            linker._input_tablename_l,
+            linker._input_tablename_r,
+        )
+
     return sql
+
+
+def _enqueue_hashed_key_tables(linker: Linker, hash_exprs: dict):
+    """Add the hashed blocking key columns to the input tables of the blocking
+    join, returning the templated names of the tables to join"""
+    hash_cols_expr = ", ".join(
+        f"{expr} as {key_name}" for key_name, expr in hash_exprs.items()
+    )
+
+    input_tablenames = {
+        "__splink__df_blocking_keys_l": linker._input_tablename_l,
+        "__splink__df_blocking_keys_r": linker._input_tablename_r,
+    }
+    if linker._input_tablename_l == linker._input_tablename_r:
+        input_tablenames = {"__splink__df_blocking_keys": linker._input_tablename_l}
+
+    for templated_name, input_tablename in input_tablenames.items():
+        sql = f"""
+        select *, {hash_cols_expr}
+        from {input_tablename}
+        """
+        linker._enqueue_sql(sql, templated_name)
+
+    templated_names = list(input_tablenames.keys())
+    return templated_names[0], templated_names[-1]
+
+
+def _enqueue_tables_salting_skewed_keys(
+    linker: Linker, br: BlockingRule, input_tablename_l: str, input_tablename_r: str
+):
+    """Salt only the blocking keys of `br` which are shared by more than
+    `br.skewed_key_threshold` records, so that the work of joining each of these
+    keys is split across `br.salting_partitions` tasks, while all other keys are
+    joined as a plain equi-join.
+
+    The records with a skewed key on the left are each assigned to one of the
+    salt buckets at random, and the records with a skewed key on the right are
+    replicated into every bucket, so each pair is generated exactly once.  All
+    other records are in bucket 0.
+
+    Returns the templated names of the left and right tables to join, or None if
+    the rule has no equi-join key to salt.
+    """
+    sql_dialect = linker._sql_dialect
+    keys = _equi_join_key_expressions(
+        br.blocking_rule, sql_dialect, ignore_other_conditions=True
+    )
+    if not keys:
+        logger.warning(
+            f"Blocking rule {br.blocking_rule} does not contain an equi-join "
+            "condition, so all of its keys will be salted"
+        )
+        return None
+
+    def key_sql(key, table):
+        key = key.copy()
+        for column in key.find_all(Column):
+            column.set("table", sqlglot.exp.to_identifier(table))
+        return key.sql(dialect=sql_dialect)
+
+    key_aliases = [f"__splink__key_{i}" for i in range(len(keys))]
+    keys_expr = ", ".join(key_sql(k, "t") for k in keys)
+    keys_as_aliases_expr = ", ".join(
+        f"{key_sql(k, 't')} as {a}" for k, a in zip(keys, key_aliases)
+    )
+    not_null_expr = " and ".join(f"{key_sql(k, 't')} is not null" for k in keys)
+
+    input_tablenames = dedupe_preserving_order([input_tablename_l, input_tablename_r])
+    records_sql = " union all ".join(
+        f"select {keys_as_aliases_expr} from {t} as t where {not_null_expr}"
+        for t in input_tablenames
+    )
+
+    match_key = br.match_key
+    skewed_keys_tablename = f"__splink__df_skewed_blocking_keys_{match_key}"
+    sql = f"""
+    select {", ".join(key_aliases)}
+    from ({records_sql}) as records
+    group by {", ".join(key_aliases)}
+    having count(*) > {br.skewed_key_threshold}
+    """
+    linker._enqueue_sql(sql, skewed_keys_tablename)
+
+    def join_skewed_keys_sql(table):
+        return " and ".join(
+            f"{key_sql(k, table)} = s.{a}" for k, a in zip(keys, key_aliases)
+        )
+
+    num_buckets = br.salting_partitions
+    salted_tablename_l = f"__splink__df_salted_blocking_keys_l_{match_key}"
+    sql = f"""
+    select l.*,
+    case
+        when s.{key_aliases[0]} is not null
+        then cast(floor(l.__splink_salt * {num_buckets}) as int)
+        else 0
+    end as __splink__salt_bucket
+    from {input_tablename_l} as l
+    left join {skewed_keys_tablename} as s
+    on {join_skewed_keys_sql("l")}
+    """
+    linker._enqueue_sql(sql, salted_tablename_l)
+
+    buckets_sql = " union all ".join(
+        f"select {n} as __splink__salt_bucket" for n in range(num_buckets)
+    )
+    salted_tablename_r = f"__splink__df_salted_blocking_keys_r_{match_key}"
+    sql = f"""
+    select r.*, b.__splink__salt_bucket
+    from {input_tablename_r} as r
+    left join {skewed_keys_tablename} as s
+    on {join_skewed_keys_sql("r")}
+    inner join ({buckets_sql}) as b
+    on b.__splink__salt_bucket = 0 or s.{key_aliases[0]} is not null
+    """
+    linker._enqueue_sql(sql, salted_tablename_r)
+
+    return salted_tablename_l, salted_tablename_r
+
+
+def _dedupe_pairs_and_join_columns_sql(
+    pairs_sql, sql_select_expr, unique_id_cols, input_tablename_l, input_tablename_r
+):
+    """Deduplicate the union of the pairs generated by each blocking rule
+    independently, keeping the match_key of the first rule that generated each
+    pair, and then join on the columns needed for comparison.
+
+    This gives the same result as excluding the comparisons generated by preceding
+    rules from each rule using `and_not_preceding_rules_sql`.
+    """
+    pair_cols = [c.name_l() for c in unique_id_cols] + [
+        c.name_r() for c in unique_id_cols
+    ]
+    pair_cols_expr = ", ".join(pair_cols)
+
+    join_l = " and ".join(f"p.{c.name_l()} = l.{c.name()}" for c in unique_id_cols)
+    join_r = " and ".join(f"p.{c.name_r()} = r.{c.name()}" for c in unique_id_cols)
+
+    return f"""
+    select
+    {sql_select_expr}
+    , p.match_key
+    from (
+        select
+            {pair_cols_expr},
+            cast(min(cast(match_key as int)) as varchar) as match_key
+        from (
+            {pairs_sql}
+        ) as __splink__blocked_pairs
+        group by {pair_cols_expr}
+    ) as p
+    inner join {input_tablename_l} as l
+    on {join_l}
+    inner join {input_tablename_r} as r
+    on {join_r}
+    """
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from array import array
+from collections import defaultdict
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
+
+import numpy as np
+
+from .blocking import BlockingRule, _equi_join_key_expressions
+from .compiled_scorer import _null_if_nan, _SqlToPython
+
+# https://stackoverflow.com/questions/39740632/python-type-hinting-without-cyclic-imports
+if TYPE_CHECKING:
+    from .linker import Linker
+
+
+def _column_values(series) -> np.ndarray:
+    # Numeric and boolean columns are stored as typed arrays, everything else as
+    # an array of Python objects
+    if series.dtype.kind in "iufb":
+        return series.to_numpy()
+    return series.to_numpy(dtype=object)
+
+
+class InMemoryBlockingIndex:
+    """An inverted index from the values of the equi-join keys of each blocking
+    rule (e.g. the surname in `l.surname = r.surname`) to the offsets of the rows
+    with those values, so that the rows a blocking rule would pair with a new
+    record can be found with a dict lookup rather than a join.
+
+    Blocking rules which contain conditions other than their equi-join keys,
+    such as `l.surname = r.surname and levenshtein(l.dob, r.dob) < 2`, are
+    evaluated in full on each candidate pair, using `condition(match_key)`.
+
+    `rows` may be any iterable of records, such as a generator, and is read once.
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[dict],
+        blocking_rules: list,
+        sql_dialect: str,
+        functions: dict[str, Callable] = None,
+    ):
+        compiler = _SqlToPython(sql_dialect, functions)
+        compiled_rules = []
+
+        for rule in blocking_rules:
+            if isinstance(rule, BlockingRule):
+                rule = rule.blocking_rule
+            keys = _equi_join_key_expressions(
+                rule, sql_dialect, ignore_other_conditions=True
+            )
+            if keys is None:
+                raise ValueError(
+                    f"The blocking rule `{rule}` cannot be indexed, because it does "
+                    "not contain an equality between the same expression of the "
+                    "left and right records, such as `l.surname = r.surname`"
+                )
+            key_functions = [compiler.compile(k) for k in keys]
+
+            if _equi_join_key_expressions(rule, sql_dialect) is None:
+                condition = compiler.compile_sql(rule)
+            else:
+                condition = None
+
+            compiled_rules.append((key_functions, condition))
+
+        indexes = [defaultdict(lambda: array("q")) for _ in compiled_rules]
+        num_rows = 0
+        for offset, row in enumerate(rows):
+            for (key_functions, _), index in zip(compiled_rules, indexes):
+                key = self._key(key_functions, row)
+                if key is not None:
+                    index[key].append(offset)
+            num_rows += 1
+
+        self._num_rows = num_rows
+        self._rules = [
+            (key_functions, dict(index), condition)
+            for (key_functions, condition), index in zip(compiled_rules, indexes)
+        ]
+
+    @staticmethod
+    def _key(key_functions: list[Callable], record: dict) -> tuple | None:
+        key = tuple(f(record) for f in key_functions)
+        # As in SQL, null values are not equal to each other
+        if any(v is None for v in key):
+            return None
+        return key
+
+    def candidates(self, record: dict) -> Iterator[tuple[int, int]]:
+        """Yield (row offset, match_key) for each row paired with `record` by the
+        equi-join keys of each blocking rule, in the order of the blocking rules.
+        A row may be yielded by more than one blocking rule.
+
+        If there are no blocking rules, every row is a candidate.
+        """
+        if not self._rules:
+            for offset in range(self._num_rows):
+                yield offset, 0
+            return
+
+        for match_key, (key_functions, index, _) in enumerate(self._rules):
+            key = self._key(key_functions, record)
+            if key is None:
+                continue
+            for offset in index.get(key, ()):
+                yield offset, match_key
+
+    def condition(self, match_key: int) -> Callable | None:
+        """The full condition of the blocking rule as a function of a record pair,
+        or None if the rule consists only of its equi-join keys"""
+        if not self._rules:
+            return None
+        return self._rules[match_key][2]
+
+
+class InMemoryMatcher:
+    """Finds and scores matches to new records entirely in Python, for low
+    latency lookups such as a search service.
+
+    The rows of `__splink__df_concat_with_tf` are read into memory once, stored
+    column-wise as NumPy arrays, and indexed by the equi-join keys of the blocking
+    rules using an `InMemoryBlockingIndex`.  Each lookup retrieves the candidate
+    rows from the index, and scores only those using a `CompiledScorer`.
+
+    Create using `linker.in_memory_matcher()`.
+    """
+
+    def __init__(
+        self,
+        linker: Linker,
+        blocking_rules: list = [],
+        match_weight_threshold: float = -4,
+        functions: dict[str, Callable] = None,
+    ):
+        settings_obj = linker._settings_obj
+
+        concat_with_tf = linker._initialise_df_concat_with_tf(materialise=True)
+        df = concat_with_tf.as_pandas_dataframe()
+        # Holding a dict per row would need several times the memory of the data
+        # itself, so records are only built for the candidates of each lookup
+        self._columns = {c: _column_values(df[c]) for c in df.columns}
+        self._num_rows = len(df)
+        del df
+
+        self._index = InMemoryBlockingIndex(
+            (self._row(offset) for offset in range(self._num_rows)),
+            blocking_rules,
+            settings_obj._sql_dialect,
+            functions,
+        )
+        self._scorer = linker.compile_scorer(functions)
+        self._match_weight_threshold = match_weight_threshold
+        self._unique_id_column_name = settings_obj._unique_id_column_name
+
+    def _row(self, offset: int) -> dict:
+        row = {}
+        for k, values in self._columns.items():
+            v = values[offset]
+            if isinstance(v, np.generic):
+                v = v.item()
+            row[k] = _null_if_nan(v)
+        return row
+
+    def find_matches(self, records) -> list[dict]:
+        """Find records in the input dataset(s) which match the given record(s).
+
+        Args:
+            records (dict | list[dict]): Input search record(s)
+
+        Returns:
+            list[dict]: The pairwise comparisons with a match weight above the
+                threshold, with the unique ids of the pair, the comparison vector
+                values and the `match_key` of the blocking rule which found it.
+        """
+        if isinstance(records, dict):
+            records = [records]
+
+        uid = self._unique_id_column_name
+        matches = []
+        for record in records:
+            record = {k: _null_if_nan(v) for k, v in record.items()}
+            found = set()
+            for offset, match_key in self._index.candidates(record):
+                if offset in found:
+                    continue
+                row = self._row(offset)
+                pair = self._scorer._record_pair(row, record)
+
+                condition = self._index.condition(match_key)
+                if condition is not None and condition(pair) is not True:
+                    continue
+                found.add(offset)
+
+                score = self._scorer._score_record_pair(pair)
+                if not score["match_weight"] > self._match_weight_threshold:
+                    continue
+
+                match = {
+                    "match_weight": score["match_weight"],
+                    "match_probability": score["match_probability"],
+                    f"{uid}_l": row.get(uid),
+                    f"{uid}_r": record.get(uid),
+                }
+                match.update(score)
+                match["match_key"] = str(match_key)
+                matches.append(match)
+
+        return matches
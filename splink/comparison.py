@@ -138,14 +138,16 @@ class Comparison:
         return any([cl._has_tf_adjustments for cl in self.comparison_levels])
 
     @property
-    def _case_statement(self):
+    def _case_expression(self):
         sqls = [
             cl._when_then_comparison_vector_value_sql for cl in self.comparison_levels
         ]
         sql = " ".join(sqls)
-        sql = f"CASE {sql} END as {self._gamma_column_name}"
+        return f"CASE {sql} END"
 
-        return sql
+    @property
+    def _case_statement(self):
+        return f"{self._case_expression} as {self._gamma_column_name}"
 
     @property
     def _input_columns_used_by_case_statement(self):
@@ -212,7 +214,10 @@ class Comparison:
             if self._settings_obj._retain_matching_columns:
                 output_cols.extend(col.names_l_r())
 
-        output_cols.append(self._case_statement)
+        # Where comparison vectors are packed, the comparison vector values of all
+        # comparisons are combined into a single column by the Settings object
+        if not self._settings_obj._pack_comparison_vectors:
+            output_cols.append(self._case_statement)
 
         for cl in self.comparison_levels:
             if cl._has_tf_adjustments:
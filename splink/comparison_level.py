@@ -547,76 +547,79 @@ class ComparisonLevel:
         return dedent(sql)
 
     @property
-    def _tf_adjustment_sql(self):
-        gamma_column_name = self.comparison._gamma_column_name
-        gamma_colname_value_is_this_level = (
-            f"{gamma_column_name} = {self._comparison_vector_value}"
-        )
+    def _tf_adjustment_expression_sql(self):
+        """The term frequency adjustment multiplier for a record pair in this
+        level, without the check that the pair is in this level"""
 
         # A tf adjustment of 1D is a multiplier of 1.0, i.e. no adjustment
-        if self._comparison_vector_value == -1:
-            sql = f"WHEN  {gamma_colname_value_is_this_level} then cast(1 as double)"
-        elif not self._has_tf_adjustments:
-            sql = f"WHEN  {gamma_colname_value_is_this_level} then cast(1 as double)"
-        elif self._tf_adjustment_weight == 0:
-            sql = f"WHEN  {gamma_colname_value_is_this_level} then cast(1 as double)"
-        elif self._is_else_level:
-            sql = f"WHEN  {gamma_colname_value_is_this_level} then cast(1 as double)"
+        if (
+            self._comparison_vector_value == -1
+            or not self._has_tf_adjustments
+            or self._tf_adjustment_weight == 0
+            or self._is_else_level
+        ):
+            return "cast(1 as double)"
+
+        tf_adj_col = self._tf_adjustment_input_column
+
+        coalesce_l_r = f"coalesce({tf_adj_col.tf_name_l()}, {tf_adj_col.tf_name_r()})"
+        coalesce_r_l = f"coalesce({tf_adj_col.tf_name_r()}, {tf_adj_col.tf_name_l()})"
+
+        tf_adjustment_exists = f"{coalesce_l_r} is not null"
+        u_prob_exact_match = self._u_probability_corresponding_to_exact_match
+
+        # Using coalesce protects against one of the tf adjustments being null
+        # Which would happen if the user provided their own tf adjustment table
+        # That didn't contain some of the values in this data
+
+        # In this case rather than taking the greater of the two, we take
+        # whichever value exists
+
+        if self._tf_minimum_u_value == 0.0:
+            divisor_sql = f"""
+            (CASE
+                WHEN {coalesce_l_r} >= {coalesce_r_l}
+                THEN {coalesce_l_r}
+                ELSE {coalesce_r_l}
+            END)
+            """
         else:
-            tf_adj_col = self._tf_adjustment_input_column
-
-            coalesce_l_r = (
-                f"coalesce({tf_adj_col.tf_name_l()}, {tf_adj_col.tf_name_r()})"
-            )
-            coalesce_r_l = (
-                f"coalesce({tf_adj_col.tf_name_r()}, {tf_adj_col.tf_name_l()})"
-            )
-
-            tf_adjustment_exists = f"{coalesce_l_r} is not null"
-            u_prob_exact_match = self._u_probability_corresponding_to_exact_match
-
-            # Using coalesce protects against one of the tf adjustments being null
-            # Which would happen if the user provided their own tf adjustment table
-            # That didn't contain some of the values in this data
-
-            # In this case rather than taking the greater of the two, we take
-            # whichever value exists
-
-            if self._tf_minimum_u_value == 0.0:
-                divisor_sql = f"""
-                (CASE
-                    WHEN {coalesce_l_r} >= {coalesce_r_l}
+            # This sql works correctly even when the tf_minimum_u_value is 0.0
+            # but is less efficient to execute, hence the above if statement
+            divisor_sql = f"""
+            (CASE
+                WHEN {coalesce_l_r} >= {coalesce_r_l}
+                AND {coalesce_l_r} > cast({self._tf_minimum_u_value} as double)
                     THEN {coalesce_l_r}
-                    ELSE {coalesce_r_l}
-                END)
-                """
-            else:
-                # This sql works correctly even when the tf_minimum_u_value is 0.0
-                # but is less efficient to execute, hence the above if statement
-                divisor_sql = f"""
-                (CASE
-                    WHEN {coalesce_l_r} >= {coalesce_r_l}
-                    AND {coalesce_l_r} > cast({self._tf_minimum_u_value} as double)
-                        THEN {coalesce_l_r}
-                    WHEN {coalesce_r_l}  > cast({self._tf_minimum_u_value} as double)
-                        THEN {coalesce_r_l}
-                    ELSE cast({self._tf_minimum_u_value} as double)
-                END)
-                """
-
-            sql = f"""
-            WHEN  {gamma_colname_value_is_this_level} then
-                (CASE WHEN {tf_adjustment_exists}
-                THEN
-                POW(
-                    cast({u_prob_exact_match} as double) /{divisor_sql},
-                    cast({self._tf_adjustment_weight} as double)
-                )
-                ELSE cast(1 as double)
-                END)
+                WHEN {coalesce_r_l}  > cast({self._tf_minimum_u_value} as double)
+                    THEN {coalesce_r_l}
+                ELSE cast({self._tf_minimum_u_value} as double)
+            END)
             """
+
+        sql = f"""
+        (CASE WHEN {tf_adjustment_exists}
+        THEN
+        POW(
+            cast({u_prob_exact_match} as double) /{divisor_sql},
+            cast({self._tf_adjustment_weight} as double)
+        )
+        ELSE cast(1 as double)
+        END)
+        """
         return dedent(sql).strip()
 
+    @property
+    def _tf_adjustment_sql(self):
+        gamma_column_name = self.comparison._gamma_column_name
+        gamma_colname_value_is_this_level = (
+            f"{gamma_column_name} = {self._comparison_vector_value}"
+        )
+        return (
+            f"WHEN  {gamma_colname_value_is_this_level} then "
+            f"{self._tf_adjustment_expression_sql}"
+        )
+
     def as_dict(self):
         "The minimal representation of this level to use as an input to Splink"
         output = {}
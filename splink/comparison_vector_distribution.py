@@ -2,14 +2,32 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from .comparison_vector_values import unpack_comparison_vector_value_sql
+from .constants import PACKED_COMPARISON_VECTOR
+
 # https://stackoverflow.com/questions/39740632/python-type-hinting-without-cyclic-imports
 if TYPE_CHECKING:
     from ..linker import Linker
 
 
 def comparison_vector_distribution_sql(linker: Linker):
-    gamma_columns = [c._gamma_column_name for c in linker._settings_obj.comparisons]
-    groupby_cols = " , ".join(gamma_columns)
+    settings_obj = linker._settings_obj
+    if settings_obj._pack_comparison_vectors:
+        # Group by the single packed column, extracting each comparison vector
+        # value from it
+        gamma_columns = [
+            f"({unpack_comparison_vector_value_sql(settings_obj, c)})"
+            for c in settings_obj.comparisons
+        ]
+        groupby_cols = PACKED_COMPARISON_VECTOR
+        select_gamma_columns = " , ".join(
+            f"{g} as {c._gamma_column_name}"
+            for g, c in zip(gamma_columns, settings_obj.comparisons)
+        )
+    else:
+        gamma_columns = [c._gamma_column_name for c in settings_obj.comparisons]
+        groupby_cols = " , ".join(gamma_columns)
+        select_gamma_columns = groupby_cols
     gam_concat = " || ',' || ".join(gamma_columns)
 
     case_tem = "(case when {g} = -1 then 0 when {g} = 0 then -1 else {g} end)"
@@ -21,7 +39,7 @@ def comparison_vector_distribution_sql(linker: Linker):
     count(*) as count_rows_in_comparison_vector_group,
     cast(count(*) as float)
         /(select count(*) from __splink__df_predict) as proportion_of_comparisons,
-    {groupby_cols}
+    {select_gamma_columns}
     from __splink__df_predict
     group by {groupby_cols}
     order by {sum_gam}
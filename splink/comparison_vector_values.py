@@ -1,5 +1,9 @@
 import logging
 
+import sqlglot
+
+from .comparison import Comparison
+from .constants import PACKED_COMPARISON_VECTOR
 from .settings import Settings
 
 logger = logging.getLogger(__name__)
@@ -30,3 +34,36 @@ def compute_comparison_vector_values_sql(
     """
 
     return sql
+
+
+def unpack_comparison_vector_value_sql(
+    settings_obj: Settings,
+    comparison: Comparison,
+    packed_column=PACKED_COMPARISON_VECTOR,
+) -> str:
+    """The expression extracting the comparison vector value of `comparison` from
+    a packed comparison vector"""
+    for cc, offset, num_bits in settings_obj._packed_comparison_vector_layout:
+        if cc is comparison:
+            sql = f"(({packed_column} >> {offset}) & {2**num_bits - 1}) - 1"
+            return sqlglot.transpile(
+                sql, read="duckdb", write=settings_obj._sql_dialect
+            )[0]
+    raise ValueError(f"{comparison} is not a comparison of the settings object")
+
+
+def unpack_comparison_vectors_sql(settings_obj: Settings, input_tablename) -> str:
+    """Add the comparison vector (gamma) column of each comparison to a table
+    of packed comparison vectors"""
+    gamma_cols = [
+        f"{unpack_comparison_vector_value_sql(settings_obj, cc)} "
+        f"as {cc._gamma_column_name}"
+        for cc in settings_obj.comparisons
+    ]
+
+    sql = f"""
+    select *, {", ".join(gamma_cols)}
+    from {input_tablename}
+    """
+
+    return sql
@@ -0,0 +1,576 @@
+from __future__ import annotations
+
+import math
+import re
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Callable
+
+import sqlglot
+import sqlglot.expressions as exp
+
+from .exceptions import SplinkException
+from .misc import bayes_factor_to_prob, prob_to_bayes_factor
+
+# https://stackoverflow.com/questions/39740632/python-type-hinting-without-cyclic-imports
+if TYPE_CHECKING:
+    from .comparison import Comparison
+    from .settings import Settings
+
+
+def _null_if_nan(value):
+    # pandas represents missing values as nan, rather than None
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def levenshtein(s1: str, s2: str) -> int:
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    previous = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1, 1):
+        current = [i]
+        for j, c2 in enumerate(s2, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (c1 != c2))
+            )
+        previous = current
+    return previous[-1]
+
+
+def damerau_levenshtein(s1: str, s2: str) -> int:
+    # Optimal string alignment distance, i.e. levenshtein distance which also
+    # allows the transposition of two adjacent characters
+    rows = [list(range(len(s2) + 1))]
+    for i in range(1, len(s1) + 1):
+        row = [i] + [0] * len(s2)
+        for j in range(1, len(s2) + 1):
+            cost = s1[i - 1] != s2[j - 1]
+            row[j] = min(rows[-1][j] + 1, row[j - 1] + 1, rows[-1][j - 1] + cost)
+            if i > 1 and j > 1 and s1[i - 1] == s2[j - 2] and s1[i - 2] == s2[j - 1]:
+                row[j] = min(row[j], rows[-2][j - 2] + 1)
+        rows = [rows[-1], row]
+    return rows[-1][-1]
+
+
+def jaro(s1: str, s2: str) -> float:
+    if not s1 or not s2:
+        return 0.0
+    window = max(max(len(s1), len(s2)) // 2 - 1, 0)
+    matched_2 = [False] * len(s2)
+    matches_1 = []
+    for i, c in enumerate(s1):
+        for j in range(max(0, i - window), min(len(s2), i + window + 1)):
+            if not matched_2[j] and s2[j] == c:
+                matched_2[j] = True
+                matches_1.append(c)
+                break
+    m = len(matches_1)
+    if m == 0:
+        return 0.0
+    matches_2 = [c for c, matched in zip(s2, matched_2) if matched]
+    transpositions = sum(a != b for a, b in zip(matches_1, matches_2)) // 2
+    return (m / len(s1) + m / len(s2) + (m - transpositions) / m) / 3
+
+
+def jaro_winkler(s1: str, s2: str) -> float:
+    sim = jaro(s1, s2)
+    if sim <= 0.7:
+        return sim
+    prefix = 0
+    for a, b in zip(s1[:4], s2[:4]):
+        if a != b:
+            break
+        prefix += 1
+    return sim + prefix * 0.1 * (1 - sim)
+
+
+def jaccard(s1, s2) -> float:
+    s1, s2 = set(s1), set(s2)
+    return len(s1 & s2) / len(s1 | s2)
+
+
+def _to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(str(value)).date()
+
+
+def date_diff(*args) -> int:
+    # date_diff(part, start, end) in DuckDB, datediff(end, start) in Spark
+    if len(args) == 2:
+        return (_to_date(args[0]) - _to_date(args[1])).days
+    part, start, end = args
+    start, end = _to_date(start), _to_date(end)
+    part = part.lower()
+    if part == "day":
+        return (end - start).days
+    if part == "month":
+        return (end.year - start.year) * 12 + end.month - start.month
+    if part == "year":
+        return end.year - start.year
+    raise SplinkException(f"date_diff with part '{part}' is not supported")
+
+
+def months_between(end, start) -> float:
+    end, start = _to_date(end), _to_date(start)
+    months = (end.year - start.year) * 12 + end.month - start.month
+    return months + (end.day - start.day) / 31
+
+
+def _regexp_extract(value, pattern, group=0):
+    match = re.search(pattern, value)
+    return match.group(group) if match else ""
+
+
+def _substring(value, start, length=None):
+    start = start - 1 if start > 0 else max(len(value) + start, 0)
+    if length is None:
+        return value[start:]
+    return value[start : start + length]
+
+
+# Python implementations of SQL functions, keyed by the lowercase name of the
+# sqlglot expression class, or of the function name if sqlglot does not
+# recognise the function.  Unless listed in _NULL_HANDLING_FUNCTIONS, the
+# functions are not called if any of their arguments are null, and return null
+PYTHON_FUNCTIONS: dict[str, Callable] = {
+    "levenshtein": levenshtein,
+    "levenshtein_distance": levenshtein,
+    "damerau_levenshtein": damerau_levenshtein,
+    "jaro": jaro,
+    "jaro_similarity": jaro,
+    "jaro_sim": jaro,
+    "jaro_winkler": jaro_winkler,
+    "jaro_winkler_similarity": jaro_winkler,
+    "jaro_winkler_sim": jaro_winkler,
+    "jaccard": jaccard,
+    "datediff": date_diff,
+    "date_diff": date_diff,
+    "months_between": months_between,
+    "strtotime": lambda value, fmt: datetime.strptime(value, fmt),
+    "tsordstodate": _to_date,
+    "abs": abs,
+    "ceil": math.ceil,
+    "floor": math.floor,
+    "round": round,
+    "pow": lambda x, y: float(x) ** y,
+    "sqrt": math.sqrt,
+    "ln": math.log,
+    "lower": lambda value: value.lower(),
+    "upper": lambda value: value.upper(),
+    "length": len,
+    "substring": _substring,
+    "substr": _substring,
+    "left": lambda value, n: value[:n],
+    "right": lambda value, n: value[-n:] if n > 0 else "",
+    "dpipe": lambda *values: "".join(str(v) for v in values),
+    "concat": lambda *values: "".join(str(v) for v in values),
+    "regexpextract": _regexp_extract,
+    "regexplike": lambda value, pattern: re.search(pattern, value) is not None,
+    "regexp_matches": lambda value, pattern: re.search(pattern, value) is not None,
+    "list_unique": lambda values: len(set(values)),
+    "list_concat": lambda a, b: list(a) + list(b),
+    "array_intersect": lambda a, b: list(dict.fromkeys(v for v in a if v in b)),
+    "arraysize": len,
+    "cardinality": len,
+    "size": len,
+    "greatest": lambda *values: max(v for v in values if v is not None),
+    "least": lambda *values: min(v for v in values if v is not None),
+}
+
+_NULL_HANDLING_FUNCTIONS = {"greatest", "least"}
+
+_CASTS = {
+    exp.DataType.Type.DOUBLE: float,
+    exp.DataType.Type.FLOAT: float,
+    exp.DataType.Type.DECIMAL: float,
+    exp.DataType.Type.INT: int,
+    exp.DataType.Type.BIGINT: int,
+    exp.DataType.Type.SMALLINT: int,
+    exp.DataType.Type.TINYINT: int,
+    exp.DataType.Type.VARCHAR: str,
+    exp.DataType.Type.TEXT: str,
+    exp.DataType.Type.CHAR: str,
+    exp.DataType.Type.DATE: _to_date,
+    exp.DataType.Type.BOOLEAN: bool,
+}
+
+_BINARY_OPERATORS = {
+    exp.EQ: lambda a, b: a == b,
+    exp.NEQ: lambda a, b: a != b,
+    exp.GT: lambda a, b: a > b,
+    exp.GTE: lambda a, b: a >= b,
+    exp.LT: lambda a, b: a < b,
+    exp.LTE: lambda a, b: a <= b,
+    exp.Add: lambda a, b: a + b,
+    exp.Sub: lambda a, b: a - b,
+    exp.Mul: lambda a, b: a * b,
+    exp.Mod: lambda a, b: a % b,
+}
+
+
+def _like_to_regex(pattern: str) -> re.Pattern:
+    regex = "".join(
+        ".*" if c == "%" else "." if c == "_" else re.escape(c) for c in pattern
+    )
+    return re.compile(f"^{regex}$", re.DOTALL)
+
+
+def _integer_division_truncates(sql_dialect: str) -> bool:
+    """Whether `/` between two integers truncates in the backend, as in SQLite and
+    Athena.  Spark always returns a double, as does DuckDB from version 0.8"""
+    if sql_dialect == "spark":
+        return False
+    if sql_dialect == "duckdb":
+        import duckdb
+
+        major, minor = (int(v) for v in re.findall(r"\d+", duckdb.__version__)[:2])
+        return (major, minor) < (0, 8)
+    return True
+
+
+class _SqlToPython:
+    """Compiles a sqlglot expression into a Python function of a single record
+    pair, represented as a dict of the `_l` and `_r` column values, which
+    follows SQL's rules for nulls (represented as None)"""
+
+    def __init__(self, sql_dialect: str, functions: dict[str, Callable] = None):
+        self.sql_dialect = sql_dialect
+        self.functions = {**PYTHON_FUNCTIONS, **(functions or {})}
+        self.integer_division = _integer_division_truncates(sql_dialect)
+
+    def compile_sql(self, sql: str) -> Callable:
+        return self.compile(sqlglot.parse_one(sql, read=self.sql_dialect))
+
+    def compile(self, e: exp.Expression) -> Callable:
+        if isinstance(e, exp.Paren):
+            return self.compile(e.this)
+
+        if isinstance(e, exp.Column):
+            name = e.name
+            if e.table in ("l", "r"):
+                name = f"{name}_{e.table}"
+            return lambda row: row.get(name)
+
+        if isinstance(e, exp.Literal):
+            if e.is_string:
+                value = e.this
+            else:
+                value = float(e.this) if re.search("[.eE]", e.this) else int(e.this)
+            return lambda row: value
+
+        if isinstance(e, exp.Null):
+            return lambda row: None
+
+        if isinstance(e, exp.Boolean):
+            value = e.this
+            return lambda row: value
+
+        if isinstance(e, exp.And):
+            a, b = self.compile(e.this), self.compile(e.expression)
+
+            def _and(row):
+                x = a(row)
+                if x is False:
+                    return False
+                y = b(row)
+                if y is False:
+                    return False
+                return None if x is None or y is None else True
+
+            return _and
+
+        if isinstance(e, exp.Or):
+            a, b = self.compile(e.this), self.compile(e.expression)
+
+            def _or(row):
+                x = a(row)
+                if x is True:
+                    return True
+                y = b(row)
+                if y is True:
+                    return True
+                return None if x is None or y is None else False
+
+            return _or
+
+        if isinstance(e, exp.Not):
+            a = self.compile(e.this)
+
+            def _not(row):
+                x = a(row)
+                return None if x is None else not x
+
+            return _not
+
+        if isinstance(e, exp.Is) and isinstance(e.expression, exp.Null):
+            a = self.compile(e.this)
+            return lambda row: a(row) is None
+
+        if isinstance(e, exp.Div):
+            a, b = self.compile(e.this), self.compile(e.expression)
+            integer_division = self.integer_division
+
+            def _div(row):
+                x, y = a(row), b(row)
+                if x is None or y is None or y == 0:
+                    return None
+                if integer_division and isinstance(x, int) and isinstance(y, int):
+                    return int(x / y)
+                return x / y
+
+            return _div
+
+        if type(e) in _BINARY_OPERATORS:
+            a, b = self.compile(e.this), self.compile(e.expression)
+            op = _BINARY_OPERATORS[type(e)]
+
+            def _binary(row):
+                x, y = a(row), b(row)
+                if x is None or y is None:
+                    return None
+                return op(x, y)
+
+            return _binary
+
+        if isinstance(e, exp.Neg):
+            a = self.compile(e.this)
+
+            def _neg(row):
+                x = a(row)
+                return None if x is None else -x
+
+            return _neg
+
+        if isinstance(e, exp.Case):
+            whens = [
+                (self.compile(i.this), self.compile(i.args["true"]))
+                for i in e.args["ifs"]
+            ]
+            default = self.compile(e.args["default"]) if e.args.get("default") else None
+
+            def _case(row):
+                for condition, value in whens:
+                    if condition(row) is True:
+                        return value(row)
+                return default(row) if default else None
+
+            return _case
+
+        if isinstance(e, exp.Coalesce):
+            args = [self.compile(a) for a in self._args(e)]
+
+            def _coalesce(row):
+                for a in args:
+                    x = a(row)
+                    if x is not None:
+                        return x
+                return None
+
+            return _coalesce
+
+        if isinstance(e, (exp.In, exp.Between, exp.Like)):
+            a = self.compile(e.this)
+            if isinstance(e, exp.In):
+                values = [self.compile(v) for v in e.expressions]
+                test = lambda x, row: x in [v(row) for v in values]  # noqa: E731
+            elif isinstance(e, exp.Between):
+                low, high = self.compile(e.args["low"]), self.compile(e.args["high"])
+                test = lambda x, row: low(row) <= x <= high(row)  # noqa: E731
+            else:
+                regex = _like_to_regex(e.expression.this)
+                test = lambda x, row: regex.match(x) is not None  # noqa: E731
+
+            def _predicate(row):
+                x = a(row)
+                return None if x is None else test(x, row)
+
+            return _predicate
+
+        if isinstance(e, (exp.Cast, exp.TryCast)):
+            a = self.compile(e.this)
+            to = e.args["to"].this
+            if to not in _CASTS:
+                raise SplinkException(f"Cannot compile cast to {to} into Python")
+            cast = _CASTS[to]
+
+            def _cast(row):
+                x = a(row)
+                return None if x is None else cast(x)
+
+            return _cast
+
+        if isinstance(e, exp.Func):
+            if isinstance(e, exp.Anonymous):
+                name = e.name.lower()
+            else:
+                name = e.key
+            if name not in self.functions:
+                raise SplinkException(
+                    f"No Python implementation of the SQL function '{name}' "
+                    f"in `{e.sql(dialect=self.sql_dialect)}`.  Register one "
+                    "using the `functions` argument."
+                )
+            fn = self.functions[name]
+            args = [self.compile(a) for a in self._args(e)]
+
+            if name in _NULL_HANDLING_FUNCTIONS:
+                return lambda row: fn(*[a(row) for a in args])
+
+            def _func(row):
+                values = [a(row) for a in args]
+                if None in values:
+                    return None
+                return fn(*values)
+
+            return _func
+
+        raise SplinkException(
+            f"Cannot compile `{e.sql(dialect=self.sql_dialect)}` into Python"
+        )
+
+    @staticmethod
+    def _args(e: exp.Expression) -> list[exp.Expression]:
+        if isinstance(e, exp.Anonymous):
+            return e.expressions
+        args = []
+        for key in e.arg_types:
+            value = e.args.get(key)
+            if isinstance(value, list):
+                args.extend(value)
+            elif value is not None:
+                args.append(value)
+        return args
+
+
+class _CompiledComparison:
+    def __init__(self, comparison: Comparison, compiler: _SqlToPython):
+        self.gamma_column_name = comparison._gamma_column_name
+        self.bf_column_name = comparison._bf_column_name
+        self.bf_tf_adj_column_name = comparison._bf_tf_adj_column_name
+        self.comparison_vector_value = compiler.compile_sql(comparison._case_expression)
+        self.bayes_factors = {}
+        self.tf_adjustments = {}
+        for cl in comparison.comparison_levels:
+            self.bayes_factors[cl._comparison_vector_value] = cl._bayes_factor
+            tf_sql = cl._tf_adjustment_expression_sql
+            if tf_sql != "cast(1 as double)":
+                self.tf_adjustments[cl._comparison_vector_value] = compiler.compile_sql(
+                    tf_sql
+                )
+        self.has_tf_adjustments = comparison._has_tf_adjustments
+
+
+class CompiledScorer:
+    """Scores record pairs in Python, without a round trip to the database.
+
+    The `sql_condition` of each comparison level, and the term frequency
+    adjustments, are compiled into Python functions, and the Bayes factor of
+    each comparison level is looked up from a precomputed table.  Create using
+    `linker.compile_scorer()`.
+    """
+
+    def __init__(
+        self,
+        settings_obj: Settings,
+        tf_lookups: dict[str, dict] = None,
+        functions: dict[str, Callable] = None,
+    ):
+        compiler = _SqlToPython(settings_obj._sql_dialect, functions)
+
+        self._comparisons = [
+            _CompiledComparison(cc, compiler) for cc in settings_obj.comparisons
+        ]
+        # (record column, tf column, lookup of term frequency by value)
+        tf_lookups = tf_lookups or {}
+        self._tf_columns = [
+            (
+                col.unquote().name(),
+                col.unquote().tf_name(),
+                tf_lookups.get(col.unquote().name()),
+            )
+            for col in settings_obj._term_frequency_columns
+        ]
+        self._retain_intermediate_calculation_columns = (
+            settings_obj._retain_intermediate_calculation_columns
+        )
+
+        prob = settings_obj._probability_two_random_records_match
+        self._prior_bayes_factor = (
+            math.inf if prob == 1.0 else prob_to_bayes_factor(prob)
+        )
+
+    def _record_pair(self, record_1: dict, record_2: dict) -> dict:
+        row = {}
+        for suffix, record in (("_l", record_1), ("_r", record_2)):
+            for k, v in record.items():
+                row[k + suffix] = _null_if_nan(v)
+            for col, tf_col, lookup in self._tf_columns:
+                if tf_col not in record and lookup is not None:
+                    row[tf_col + suffix] = lookup.get(row.get(col + suffix))
+        return row
+
+    def score(self, record_1: dict, record_2: dict) -> dict:
+        """Score a single record pair.
+
+        Args:
+            record_1 (dict): The first record, with the same columns as the input
+                data.  Term frequencies are looked up from the term frequency
+                tables which existed when the scorer was compiled, unless the
+                record contains them (e.g. `tf_first_name`).
+            record_2 (dict): The second record.
+
+        Returns:
+            dict: The `match_weight`, `match_probability` and comparison vector
+                values of the pair, and, if `retain_intermediate_calculation_columns`
+                is set, the Bayes factors of each comparison.
+        """
+        return self._score_record_pair(self._record_pair(record_1, record_2))
+
+    def _score_record_pair(self, row: dict) -> dict:
+        retain = self._retain_intermediate_calculation_columns
+
+        output = {}
+        bayes_factor = self._prior_bayes_factor
+        for cc in self._comparisons:
+            gamma = cc.comparison_vector_value(row)
+            bf = cc.bayes_factors[gamma]
+            output[cc.gamma_column_name] = gamma
+            if retain:
+                output[cc.bf_column_name] = bf
+            bayes_factor *= bf
+
+            if cc.has_tf_adjustments:
+                tf_adjustment = cc.tf_adjustments.get(gamma)
+                tf_bf = tf_adjustment(row) if tf_adjustment else 1.0
+                if retain:
+                    output[cc.bf_tf_adj_column_name] = tf_bf
+                bayes_factor *= tf_bf
+
+        if bayes_factor == math.inf:
+            match_weight, match_probability = math.inf, 1.0
+        elif bayes_factor == 0:
+            match_weight, match_probability = -math.inf, 0.0
+        else:
+            match_weight = math.log2(bayes_factor)
+            match_probability = bayes_factor_to_prob(bayes_factor)
+
+        return {
+            "match_weight": match_weight,
+            "match_probability": match_probability,
+            **output,
+        }
+
+    def score_pairs(self, pairs) -> list[dict]:
+        """Score a batch of record pairs.
+
+        Args:
+            pairs (iterable): Tuples of (record_1, record_2)
+
+        Returns:
+            list[dict]: The scores of each pair, as returned by `score`
+        """
+        return [self.score(record_1, record_2) for record_1, record_2 in pairs]
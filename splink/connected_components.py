@@ -13,7 +13,10 @@ import logging
 import time
 from typing import TYPE_CHECKING
 
+import pandas as pd
+
 from .splink_dataframe import SplinkDataFrame
+from .union_find import connected_components_from_edge_batches
 from .unique_id_concat import (
     _composite_unique_id_from_edges_sql,
     _composite_unique_id_from_nodes_sql,
@@ -294,6 +297,202 @@ def _cc_assess_exit_condition(representatives_name):
     return sql
 
 
+def _cc_create_node_index_table():
+    """SQL to assign each node a contiguous integer index, for use by the in-memory
+    union-find solver.
+
+    Indices are assigned in order of node_id, so that the minimum index in
+    each cluster corresponds to the minimum node_id, matching the representatives
+    chosen by the SQL implementation.
+    """
+
+    sql = """
+    select
+        node_id,
+        row_number() over (order by node_id) - 1 as node_index
+    from (
+        select unique_id_l as node_id
+        from __splink__df_connected_components_df
+
+        UNION
+
+        select unique_id_r as node_id
+        from __splink__df_connected_components_df
+    )
+    """
+
+    return sql
+
+
+def _cc_create_edge_index_table(node_index_table):
+    """SQL to express the edges table in terms of node indices.
+
+    Self links are only used to ensure all nodes are present in the nodes table, so
+    are excluded here.
+    """
+
+    sql = f"""
+    select
+        n_l.node_index as node_index_l,
+        n_r.node_index as node_index_r
+    from __splink__df_connected_components_df as e
+    inner join {node_index_table} as n_l
+        on e.unique_id_l = n_l.node_id
+    inner join {node_index_table} as n_r
+        on e.unique_id_r = n_r.node_id
+    where e.unique_id_l <> e.unique_id_r
+    """
+
+    return sql
+
+
+def _cc_representatives_from_index_table(node_index_table, representative_index_table):
+    """SQL to map the node indices output by the union-find solver back to node ids"""
+
+    sql = f"""
+    select
+        n.node_id,
+        r.node_id as representative
+    from {representative_index_table} as ri
+    inner join {node_index_table} as n
+        on ri.node_index = n.node_index
+    inner join {node_index_table} as r
+        on ri.representative_index = r.node_index
+    """
+
+    return sql
+
+
+def _cc_create_oriented_edges_table():
+    """SQL to create the initial edges table for the star contraction algorithm.
+
+    Each undirected edge is stored once, as (node_id, parent) with parent < node_id.
+    Self links are excluded, since isolated nodes are their own representative.
+    """
+
+    sql = """
+    select distinct
+        case when unique_id_l < unique_id_r
+            then unique_id_r else unique_id_l end as node_id,
+        case when unique_id_l < unique_id_r
+            then unique_id_l else unique_id_r end as parent
+    from __splink__df_connected_components_df
+    where unique_id_l <> unique_id_r
+    """
+
+    return sql
+
+
+def _cc_star_neighbours(edges_table):
+    """SQL to list each node's neighbours, in both directions, from an oriented
+    edges table"""
+
+    sql = f"""
+    select node_id, parent as neighbour
+    from {edges_table}
+
+    UNION ALL
+
+    select parent as node_id, node_id as neighbour
+    from {edges_table}
+    """
+
+    return sql
+
+
+def _cc_large_star():
+    """SQL for the 'large-star' operation of Kiveris et al. (see top of file).
+
+    Each node u connects every neighbour larger than itself to the minimum of u and
+    its neighbours.
+    """
+
+    sql = """
+    select distinct
+        n.neighbour as node_id,
+        case when m.min_neighbour < n.node_id
+            then m.min_neighbour else n.node_id end as parent
+    from __splink__cc_star_neighbours as n
+    inner join (
+        select node_id, min(neighbour) as min_neighbour
+        from __splink__cc_star_neighbours
+        group by node_id
+    ) as m
+    on n.node_id = m.node_id
+    where n.neighbour > n.node_id
+    """
+
+    return sql
+
+
+def _cc_small_star():
+    """SQL for the 'small-star' operation of Kiveris et al. (see top of file).
+
+    Each node u connects itself, and every neighbour smaller than itself, to the
+    minimum of those smaller neighbours.
+    """
+
+    sql = """
+    select distinct
+        l.neighbour as node_id,
+        m.min_neighbour as parent
+    from __splink__cc_star_lower_neighbours as l
+    inner join __splink__cc_star_min_lower_neighbour as m
+    on l.node_id = m.node_id
+    where l.neighbour <> m.min_neighbour
+
+    UNION
+
+    select node_id, min_neighbour as parent
+    from __splink__cc_star_min_lower_neighbour
+    """
+
+    return sql
+
+
+def _cc_star_assess_exit_condition(edges_table):
+    """SQL exit condition for the star contraction algorithm.
+
+    The algorithm has converged once every component is a star centred on its
+    minimum node: i.e. no node has more than one parent, and no parent has a parent
+    of its own.
+    """
+
+    sql = f"""
+    select count(*) as count
+    from (
+        select node_id
+        from {edges_table}
+        group by node_id
+        having count(*) > 1
+
+        UNION ALL
+
+        select e.node_id
+        from {edges_table} as e
+        inner join {edges_table} as p
+        on e.parent = p.node_id
+    )
+    """
+
+    return sql
+
+
+def _cc_representatives_from_stars(edges_table):
+    """SQL to create the representatives table from the converged stars"""
+
+    sql = f"""
+    select
+        n.node_id,
+        coalesce(e.parent, n.node_id) as representative
+    from nodes as n
+    left join {edges_table} as e
+    on n.node_id = e.node_id
+    """
+
+    return sql
+
+
 def _cc_create_unique_id_cols(
     linker: "Linker", concat_with_tf: str, df_predict: str, match_probability_threshold
 ):
@@ -392,45 +591,159 @@ def _exit_query(
         """
 
 
-def solve_connected_components(
+def _solve_representatives_star_contraction(
     linker: "Linker",
     edges_table: SplinkDataFrame,
-    df_predict: SplinkDataFrame,
     concat_with_tf: SplinkDataFrame,
-    pairwise_output: bool = False,
-    filter_pairwise_format_for_clusters: bool = False,
     _generated_graph: bool = False,
 ):
-    """Connected Components main algorithm.
+    """Solve connected components in SQL by alternating the 'large-star' and
+    'small-star' operations of Kiveris et al. until every component is a star.
 
-    This function helps cluster your linked (or deduped) records
-    into single groups, which can then be more easily visualised.
+    This converges in a number of iterations logarithmic in the size of the
+    components, rather than linear in their diameter.
+    """
 
-    Args:
-        linker:
-            Splink linker object. For more, see splink.linker.
+    linker._enqueue_sql(_cc_create_oriented_edges_table(), "__splink__df_cc_edges")
+    edges = linker._execute_sql_pipeline([edges_table])
 
-        edges_table (SplinkDataFrame):
-            Splink dataframe containing our edges dataframe to be connected.
+    iteration, root_rows = 0, 1
+    while root_rows > 0:
+        start_time = time.time()
+        iteration += 1
 
-        generated_graph (bool):
-            Specifies whether the input df is a NetworkX graph, or part of
-            a splink deduping or linking job.
+        # To allow debug mode to work with our recursive loop, add
+        # the iteration number as a suffix
+        if linker.debug_mode:
+            edges_name = "__splink__df_cc_edges"
+        else:
+            edges_name = f"__splink__df_cc_edges_{iteration}"
 
-            This is used for testing against NetworkX and only impacts how
-            our nodes table is generated as this can be shortcut using
-            __splink__df_concat_with_tf.
+        sql = _cc_star_neighbours(edges.physical_name)
+        linker._enqueue_sql(sql, "__splink__cc_star_neighbours")
+        linker._enqueue_sql(_cc_large_star(), "__splink__cc_large_star")
 
-    Returns:
-        SplinkDataFrame: A dataframe containing the connected components list
-        for your link or dedupe job.
+        sql = _cc_star_neighbours("__splink__cc_large_star")
+        linker._enqueue_sql(sql, "__splink__cc_star_neighbours_2")
+        sql = """
+        select node_id, neighbour
+        from __splink__cc_star_neighbours_2
+        where neighbour < node_id
+        """
+        linker._enqueue_sql(sql, "__splink__cc_star_lower_neighbours")
+        sql = """
+        select node_id, min(neighbour) as min_neighbour
+        from __splink__cc_star_lower_neighbours
+        group by node_id
+        """
+        linker._enqueue_sql(sql, "__splink__cc_star_min_lower_neighbour")
+        linker._enqueue_sql(_cc_small_star(), edges_name)
+
+        new_edges = linker._execute_sql_pipeline()
+        if new_edges.physical_name != edges.physical_name:
+            edges.drop_table_from_database()
+        edges = new_edges
+
+        sql = _cc_star_assess_exit_condition(edges.physical_name)
+        linker._enqueue_sql(sql, "__splink__df_root_rows")
+        root_rows_df = linker._execute_sql_pipeline(
+            materialise_as_hash=False, use_cache=False
+        )
+        root_rows = root_rows_df.as_record_dict()[0]["count"]
+        root_rows_df.drop_table_from_database()
+        logger.info(f"Completed iteration {iteration}, root rows count {root_rows}")
+        end_time = time.time()
+        logger.log(15, f"    Iteration time: {end_time - start_time} seconds")
+
+    input_dfs = [edges_table]
+    if not _generated_graph:
+        input_dfs.append(concat_with_tf)
+
+    sql = _cc_create_nodes_table(linker, _generated_graph)
+    linker._enqueue_sql(sql, "nodes")
+    sql = _cc_representatives_from_stars(edges.physical_name)
+    linker._enqueue_sql(sql, "__splink__df_representatives")
+    representatives = linker._execute_sql_pipeline(input_dfs)
+    edges.drop_table_from_database()
+
+    return representatives
+
+
+def _solve_representatives_union_find(
+    linker: "Linker", edges_table: SplinkDataFrame, batch_size: int = 1_000_000
+):
+    """Solve connected components in-process, by streaming the edges into a
+    union-find.
 
+    The edges are converted to contiguous integer node indices in the database,
+    streamed into Python in Arrow batches, and the resultant representatives are
+    registered back with the database.
     """
 
+    linker._enqueue_sql(_cc_create_node_index_table(), "__splink__df_node_index")
+    node_index = linker._execute_sql_pipeline([edges_table])
+
+    sql = f"select count(*) as count from {node_index.physical_name}"
+    linker._enqueue_sql(sql, "__splink__df_node_count")
+    node_count_df = linker._execute_sql_pipeline(
+        materialise_as_hash=False, use_cache=False
+    )
+    num_nodes = node_count_df.as_record_dict()[0]["count"]
+    node_count_df.drop_table_from_database()
+
+    sql = _cc_create_edge_index_table(node_index.physical_name)
+    linker._enqueue_sql(sql, "__splink__df_edge_index")
+    edge_index = linker._execute_sql_pipeline([edges_table])
+
+    start_time = time.time()
+    edge_batches = (
+        (
+            batch.column("node_index_l").to_numpy(),
+            batch.column("node_index_r").to_numpy(),
+        )
+        for batch in edge_index.iter_batches(batch_size)
+    )
+    representative_index = connected_components_from_edge_batches(
+        num_nodes, edge_batches
+    )
+    edge_index.drop_table_from_database()
+    end_time = time.time()
+    logger.log(15, f"    Union-find time: {end_time - start_time} seconds")
+
+    representative_index_df = linker.register_table(
+        pd.DataFrame(
+            {
+                "node_index": range(num_nodes),
+                "representative_index": representative_index,
+            }
+        ),
+        "__splink__df_representative_index",
+        overwrite=True,
+    )
+
+    sql = _cc_representatives_from_index_table(
+        node_index.physical_name, representative_index_df.physical_name
+    )
+    linker._enqueue_sql(sql, "__splink__df_representatives")
+    representatives = linker._execute_sql_pipeline()
+
+    node_index.drop_table_from_database()
+    representative_index_df.drop_table_from_database()
+
+    return representatives
+
+
+def _solve_representatives_label_propagation(
+    linker: "Linker",
+    edges_table: SplinkDataFrame,
+    concat_with_tf: SplinkDataFrame,
+    _generated_graph: bool = False,
+):
+    """Solve connected components in SQL, by iteratively propagating the minimum
+    representative to each node's neighbours until no representatives change"""
+
     input_dfs = [edges_table]
-    if _generated_graph:
-        edges_table.templated_name = "__splink__df_connected_components_df"
-    else:
+    if not _generated_graph:
         input_dfs.append(concat_with_tf)
 
     # Create our initial node and neighbours tables
@@ -508,6 +821,58 @@ def solve_connected_components(
         end_time = time.time()
         logger.log(15, f"    Iteration time: {end_time - start_time} seconds")
 
+    return representatives
+
+
+def solve_connected_components(
+    linker: "Linker",
+    edges_table: SplinkDataFrame,
+    df_predict: SplinkDataFrame,
+    concat_with_tf: SplinkDataFrame,
+    pairwise_output: bool = False,
+    filter_pairwise_format_for_clusters: bool = False,
+    _generated_graph: bool = False,
+    algorithm: str = "label_propagation",
+):
+    """Connected Components main algorithm.
+
+    This function helps cluster your linked (or deduped) records
+    into single groups, which can then be more easily visualised.
+
+    Args:
+        linker:
+            Splink linker object. For more, see splink.linker.
+
+        edges_table (SplinkDataFrame):
+            Splink dataframe containing our edges dataframe to be connected.
+
+        generated_graph (bool):
+            Specifies whether the input df is a NetworkX graph, or part of
+            a splink deduping or linking job.
+
+            This is used for testing against NetworkX and only impacts how
+            our nodes table is generated as this can be shortcut using
+            __splink__df_concat_with_tf.
+
+        algorithm (str):
+            "label_propagation" or "star_contraction" to solve using iterative
+            SQL, or "union_find" to stream the edges into an in-memory union-find.
+            "union_find" is only available for backends which can stream tables
+            into Python, such as DuckDB and SQLite.
+
+    Returns:
+        SplinkDataFrame: A dataframe containing the connected components list
+        for your link or dedupe job.
+
+    """
+
+    if _generated_graph:
+        edges_table.templated_name = "__splink__df_connected_components_df"
+
+    representatives = _solve_representatives(
+        linker, edges_table, concat_with_tf, _generated_graph, algorithm
+    )
+
     # Create our final representatives table
     # Need to edit how we export the table based on whether we are
     # performing a link or dedupe job.
@@ -528,3 +893,188 @@ def solve_connected_components(
     )
 
     return representatives
+
+
+def _solve_representatives(
+    linker: "Linker",
+    edges_table: SplinkDataFrame,
+    concat_with_tf: SplinkDataFrame,
+    _generated_graph: bool,
+    algorithm: str,
+) -> SplinkDataFrame:
+    """Solve connected components using the given algorithm, returning a table of
+    node_id and representative"""
+
+    if algorithm == "label_propagation":
+        representatives = _solve_representatives_label_propagation(
+            linker, edges_table, concat_with_tf, _generated_graph
+        )
+    elif algorithm == "star_contraction":
+        representatives = _solve_representatives_star_contraction(
+            linker, edges_table, concat_with_tf, _generated_graph
+        )
+    elif algorithm == "union_find":
+        representatives = _solve_representatives_union_find(linker, edges_table)
+    else:
+        raise ValueError(
+            f"Unknown connected components algorithm '{algorithm}'. "
+            "Must be one of 'label_propagation', 'star_contraction' or 'union_find'"
+        )
+
+    return representatives
+
+
+def _cc_new_nodes_from_predictions(uid_cols, df_new_predictions):
+    """SQL to list the unique id columns of every record in a table of new pairwise
+    predictions"""
+
+    cols_l = ", ".join(f"{c.name_l()} as {c.name()}" for c in uid_cols)
+    cols_r = ", ".join(f"{c.name_r()} as {c.name()}" for c in uid_cols)
+
+    sql = f"""
+    select {cols_l}
+    from {df_new_predictions}
+
+    UNION
+
+    select {cols_r}
+    from {df_new_predictions}
+    """
+
+    return sql
+
+
+def _cc_map_new_nodes_to_existing_clusters(uid_cols, df_clusters):
+    """SQL to map each record in the new predictions to the cluster it already
+    belongs to.
+
+    In the contracted graph used to update the clusters, each existing cluster is a
+    single node, identified by its cluster_id.  Records which are not yet in a
+    cluster are nodes in their own right.
+    """
+
+    uid_concat_n = _composite_unique_id_from_nodes_sql(uid_cols, "n")
+    uid_concat_c = _composite_unique_id_from_nodes_sql(uid_cols, "c")
+
+    sql = f"""
+    select
+        n.*,
+        {uid_concat_n} as node_id,
+        coalesce(c.cluster_id, {uid_concat_n}) as cluster_node_id,
+        c.cluster_id is null as is_new_record
+    from __splink__df_new_nodes as n
+    left join {df_clusters} as c
+    on {uid_concat_n} = {uid_concat_c}
+    """
+
+    return sql
+
+
+def _cc_contracted_edges(uid_cols, df_new_predictions, match_probability_threshold):
+    """SQL to create the edges of the contracted graph, in the format expected by
+    solve_connected_components.
+
+    Self links ensure every node of the contracted graph is present.
+    """
+
+    uid_concat_l = _composite_unique_id_from_edges_sql(uid_cols, "l", "p")
+    uid_concat_r = _composite_unique_id_from_edges_sql(uid_cols, "r", "p")
+
+    sql = f"""
+    select
+        n_l.cluster_node_id as unique_id_l,
+        n_r.cluster_node_id as unique_id_r
+    from {df_new_predictions} as p
+    inner join __splink__df_new_nodes_mapped as n_l
+    on {uid_concat_l} = n_l.node_id
+    inner join __splink__df_new_nodes_mapped as n_r
+    on {uid_concat_r} = n_r.node_id
+    where p.match_probability >= {match_probability_threshold}
+
+    UNION
+
+    select
+        cluster_node_id as unique_id_l,
+        cluster_node_id as unique_id_r
+    from __splink__df_new_nodes_mapped
+    """
+
+    return sql
+
+
+def _cc_updated_clusters(uid_cols, df_clusters, new_nodes_mapped, representatives):
+    """SQL to apply the solved contracted graph to the existing clusters, and add
+    the new records"""
+
+    cols_c = ", ".join(f"c.{c.name()}" for c in uid_cols)
+    cols_n = ", ".join(f"n.{c.name()}" for c in uid_cols)
+
+    sql = f"""
+    select
+        coalesce(r.representative, c.cluster_id) as cluster_id,
+        {cols_c}
+    from {df_clusters} as c
+    left join {representatives} as r
+    on c.cluster_id = r.node_id
+
+    UNION ALL
+
+    select
+        r.representative as cluster_id,
+        {cols_n}
+    from {new_nodes_mapped} as n
+    inner join {representatives} as r
+    on n.cluster_node_id = r.node_id
+    where n.is_new_record
+    """
+
+    return sql
+
+
+def update_clusters_from_new_predictions(
+    linker: "Linker",
+    df_clusters: SplinkDataFrame,
+    df_new_predictions: SplinkDataFrame,
+    match_probability_threshold: float,
+    algorithm: str = "label_propagation",
+) -> SplinkDataFrame:
+    """Update an existing set of clusters with a set of new pairwise predictions,
+    without re-solving connected components over the whole graph.
+
+    Each existing cluster touched by the new predictions is contracted to a single
+    node, so connected components only needs to be solved over the affected
+    clusters and new records.  Since each cluster's id is its minimum node id, the
+    merged clusters have the same ids that clustering from scratch would produce.
+    """
+
+    uid_cols = linker._settings_obj._unique_id_input_columns
+
+    sql = _cc_new_nodes_from_predictions(uid_cols, df_new_predictions.physical_name)
+    linker._enqueue_sql(sql, "__splink__df_new_nodes")
+    sql = _cc_map_new_nodes_to_existing_clusters(uid_cols, df_clusters.physical_name)
+    linker._enqueue_sql(sql, "__splink__df_new_nodes_mapped")
+    new_nodes_mapped = linker._execute_sql_pipeline()
+
+    sql = _cc_contracted_edges(
+        uid_cols, df_new_predictions.physical_name, match_probability_threshold
+    )
+    linker._enqueue_sql(sql, "__splink__df_connected_components_df")
+    edges_table = linker._execute_sql_pipeline([new_nodes_mapped])
+
+    representatives = _solve_representatives(
+        linker,
+        edges_table,
+        concat_with_tf=None,
+        _generated_graph=True,
+        algorithm=algorithm,
+    )
+
+    sql = _cc_updated_clusters(
+        uid_cols,
+        df_clusters.physical_name,
+        new_nodes_mapped.physical_name,
+        representatives.physical_name,
+    )
+    return linker._sql_to_splink_dataframe_checking_cache(
+        sql, "__splink__df_clusters_updated"
+    )
@@ -1 +1,5 @@
 LEVEL_NOT_OBSERVED_TEXT = "level not observed in training dataset"
+
+# The column holding the comparison vector values of all comparisons when
+# comparison vectors are packed into a single integer
+PACKED_COMPARISON_VECTOR = "packed_comparison_vector"
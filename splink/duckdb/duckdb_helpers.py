@@ -52,11 +52,19 @@ def create_temporary_duckdb_connection(self):
 
 
 def duckdb_load_from_file(path):
+    # Directories and globs of parquet files, which may be hive partitioned,
+    # are scanned lazily as a single table
+    if os.path.isdir(path) and any(Path(path).rglob("*.parquet")):
+        path = os.path.join(path, "**", "*.parquet")
+        return f"read_parquet('{path}', hive_partitioning=1)"
+
     file_functions = {
         ".csv": f"read_csv_auto('{path}')",
         ".parquet": f"read_parquet('{path}')",
     }
     file_ext = Path(path).suffix
+    if file_ext == ".parquet" and any(c in path for c in "*?["):
+        return f"read_parquet('{path}', hive_partitioning=1)"
     if file_ext in file_functions.keys():
         return file_functions[file_ext]
     else:
@@ -22,6 +22,22 @@ from .duckdb_helpers import (
 logger = logging.getLogger(__name__)
 
 
+def _is_record_batch_reader(input):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return False
+    return isinstance(input, pa.RecordBatchReader)
+
+
+def _is_lazy_arrow_input(input):
+    try:
+        import pyarrow.dataset as ds
+    except ImportError:
+        return False
+    return _is_record_batch_reader(input) or isinstance(input, ds.Dataset)
+
+
 class DuckDBLinkerDataFrame(SplinkDataFrame):
     linker: DuckDBLinker
 
@@ -35,6 +51,21 @@ class DuckDBLinkerDataFrame(SplinkDataFrame):
     def validate(self):
         pass
 
+    @property
+    def _estimated_size_bytes(self):
+        # Views (e.g. registered pandas dataframes) are not in duckdb_tables()
+        sql = f"""
+        select estimated_size, column_count
+        from duckdb_tables()
+        where table_name = '{self.physical_name}'
+        """
+        rec = self.linker._con.execute(sql).fetchone()
+        if rec is None:
+            return None
+        num_rows, num_cols = rec
+        # Assume 8 bytes per value
+        return num_rows * num_cols * 8
+
     def drop_table_from_database(self, force_non_splink_table=False):
         self._check_drop_table_created_by_splink(force_non_splink_table)
 
@@ -54,10 +85,43 @@ class DuckDBLinkerDataFrame(SplinkDataFrame):
 
         return self.linker._con.query(sql).to_df()
 
+    def iter_batches(self, batch_size=100_000):
+        sql = f"select * from {self.physical_name}"
+        reader = self.linker._con.execute(sql).fetch_record_batch(batch_size)
+        # DuckDB may round the size of batches up to a multiple of its vector size
+        for batch in reader:
+            for offset in range(0, batch.num_rows, batch_size):
+                yield batch.slice(offset, batch_size)
+
+    def as_arrow(self):
+        sql = f"select * from {self.physical_name}"
+        return self.linker._con.execute(sql).arrow()
+
+    def to_parquet(self, filepath, partition_by=None, overwrite=False):
+        self._prepare_output_path(filepath, overwrite)
+
+        options = "FORMAT PARQUET"
+        if partition_by:
+            partition_cols = [
+                InputColumn(c, sql_dialect="duckdb").name()
+                for c in ensure_is_list(partition_by)
+            ]
+            options += f", PARTITION_BY ({', '.join(partition_cols)})"
+
+        filepath = str(filepath).replace("'", "''")
+        self.linker._con.execute(
+            f"COPY {self.physical_name} TO '{filepath}' ({options})"
+        )
+
 
 class DuckDBLinker(Linker):
     """Manages the data linkage process and holds the data linkage model."""
 
+    # DuckDB plans each blocking rule as a hash join, and evaluating the
+    # exclusions of preceding rules within the join is slower than deduplicating
+    # the union of the pairs
+    _blocking_rule_deduplication_strategy = "dedupe_min_match_key"
+
     def __init__(
         self,
         input_table_or_tables: str | list,
@@ -77,7 +141,13 @@ class DuckDBLinker(Linker):
             input_table_or_tables (Union[str, list]): Input data into the linkage model.
                 Either a single string (the name of a table in a database) for
                 deduplication jobs, or a list of strings  (the name of tables in a
-                database) for link_only or link_and_dedupe
+                database) for link_only or link_and_dedupe.  Pandas dataframes,
+                pyarrow tables, datasets and `RecordBatchReader`s, and paths to csv
+                or parquet files, globs or directories of (hive partitioned)
+                parquet files are also accepted.  If
+                `select_only_columns_used_by_model` is set in the settings
+                dictionary, only the columns used by the model are read from
+                pyarrow datasets and `RecordBatchReader`s.
             settings_dict (dict, optional): A Splink settings dictionary. If not
                 provided when the object is created, can later be added using
                 `linker.load_settings()` Defaults to None.
@@ -129,8 +199,9 @@ class DuckDBLinker(Linker):
         try:
             # If pyarrow is installed, add to the accepted list
             import pyarrow as pa
+            import pyarrow.dataset as ds
 
-            accepted_df_dtypes.append(pa.lib.Table)
+            accepted_df_dtypes.extend([pa.lib.Table, pa.RecordBatchReader, ds.Dataset])
         except ImportError:
             pass
 
@@ -195,6 +266,7 @@ class DuckDBLinker(Linker):
                 )
             else:
                 self._con.unregister(table_name)
+                self._delete_table_from_database(table_name)
 
         self._table_registration(input, table_name)
         return self._table_to_splink_dataframe(table_name, table_name)
@@ -205,10 +277,45 @@ class DuckDBLinker(Linker):
         elif isinstance(input, list):
             input = pd.DataFrame.from_records(input)
 
+        if _is_record_batch_reader(input):
+            # A reader can only be consumed once, so stream it into a table
+            self._con.register(f"__splink__raw_{table_name}", input)
+            self._con.execute(
+                f"CREATE TABLE {table_name} AS "
+                f"SELECT * FROM __splink__raw_{table_name}"
+            )
+            self._con.unregister(f"__splink__raw_{table_name}")
+            return
+
         # Registration errors will automatically
         # occur if an invalid data type is passed as an argument
         self._con.register(table_name, input)
 
+    def _input_table_registration(self, input, table_name):
+        # Arrow datasets and record batch readers are scanned lazily, so if
+        # select_only_columns_used_by_model is set, only those columns are read
+        if (
+            not _is_lazy_arrow_input(input)
+            or self._settings_obj_ is None
+            or not self._settings_obj._select_only_columns_used_by_model
+        ):
+            return self._table_registration(input, table_name)
+
+        used = {c.lower() for c in self._settings_obj._columns_used_by_model}
+        columns = [
+            InputColumn(c, sql_dialect="duckdb").name()
+            for c in input.schema.names
+            if c.lower() in used
+        ]
+        select_sql = f"SELECT {', '.join(columns)} FROM __splink__raw_{table_name}"
+
+        self._con.register(f"__splink__raw_{table_name}", input)
+        if _is_record_batch_reader(input):
+            self._con.execute(f"CREATE TABLE {table_name} AS {select_sql}")
+            self._con.unregister(f"__splink__raw_{table_name}")
+        else:
+            self._con.execute(f"CREATE VIEW {table_name} AS {select_sql}")
+
     def _random_sample_sql(self, proportion, sample_size, seed=None):
         if proportion == 1.0:
             return ""
@@ -222,6 +329,9 @@ class DuckDBLinker(Linker):
     def _infinity_expression(self):
         return "cast('infinity' as double)"
 
+    def _hash_columns_sql(self, columns):
+        return f"hash({', '.join(columns)})"
+
     def _table_exists_in_database(self, table_name):
         sql = f"PRAGMA table_info('{table_name}');"
 
@@ -241,6 +351,14 @@ class DuckDBLinker(Linker):
             return False
         return True
 
+    def _load_table_from_parquet(self, path, templated_name, physical_name):
+        self._delete_table_from_database(physical_name)
+        path = str(path).replace("'", "''")
+        self._con.execute(
+            f"CREATE TABLE {physical_name} AS SELECT * FROM read_parquet('{path}')"
+        )
+        return self._table_to_splink_dataframe(templated_name, physical_name)
+
     def _check_cast_error(self, alias):
         from duckdb import InvalidInputException
 
@@ -258,6 +376,9 @@ class DuckDBLinker(Linker):
             ) from e
 
     def _delete_table_from_database(self, name):
+        # Tables registered from Python objects (e.g. pandas dataframes) are views
+        # which must be unregistered, rather than dropped
+        self._con.unregister(name)
         drop_sql = f"""
         DROP TABLE IF EXISTS {name}"""
         self._con.execute(drop_sql)
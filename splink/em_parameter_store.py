@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import numpy as np
+
+from .constants import LEVEL_NOT_OBSERVED_TEXT
+from .settings import Settings
+
+# The value ComparisonLevel uses for the m or u probability of a level which
+# was not observed in the training data
+LEVEL_NOT_OBSERVED_PROBABILITY = 1e-6
+
+
+class EMParameterStore:
+    """Holds the parameters being estimated during an EM training session as NumPy
+    arrays, so that the maximisation step and the convergence check do not need to
+    walk the ComparisonLevel objects on every iteration.
+
+    The m and u arrays have one row per comparison and one column per (non-null)
+    comparison level, in the order of `_comparison_levels_excluding_null`. i.e.
+    column `j` of a comparison with `n` levels holds the level with
+    comparison vector value `n - 1 - j`.  Comparisons with fewer levels than the
+    widest comparison are padded with NaN.
+    """
+
+    def __init__(
+        self,
+        num_levels: np.ndarray,
+        m_probabilities: np.ndarray,
+        u_probabilities: np.ndarray,
+        m_observed: np.ndarray,
+        u_observed: np.ndarray,
+        probability_two_random_records_match: float,
+        m_estimated: bool = False,
+        u_estimated: bool = False,
+    ):
+        self.num_levels = num_levels
+        self.m_probabilities = m_probabilities
+        self.u_probabilities = u_probabilities
+        self.m_observed = m_observed
+        self.u_observed = u_observed
+        self.probability_two_random_records_match = probability_two_random_records_match
+        # Whether the m and u probabilities have been updated by `maximise()`,
+        # and so need to be written back onto the ComparisonLevels
+        self.m_estimated = m_estimated
+        self.u_estimated = u_estimated
+
+    @classmethod
+    def from_settings_obj(cls, settings_obj: Settings) -> EMParameterStore:
+        ccs = settings_obj.comparisons
+        num_levels = np.array([cc._num_levels for cc in ccs], dtype="int64")
+        width = int(num_levels.max()) if len(ccs) else 0
+
+        m_probabilities = np.full((len(ccs), width), np.nan)
+        u_probabilities = np.full((len(ccs), width), np.nan)
+        m_observed = np.zeros((len(ccs), width), dtype=bool)
+        u_observed = np.zeros((len(ccs), width), dtype=bool)
+
+        for i, cc in enumerate(ccs):
+            for j, cl in enumerate(cc._comparison_levels_excluding_null):
+                m_probabilities[i, j] = cl.m_probability
+                u_probabilities[i, j] = cl.u_probability
+                m_observed[i, j] = cl._m_probability != LEVEL_NOT_OBSERVED_TEXT
+                u_observed[i, j] = cl._u_probability != LEVEL_NOT_OBSERVED_TEXT
+
+        return cls(
+            num_levels,
+            m_probabilities,
+            u_probabilities,
+            m_observed,
+            u_observed,
+            settings_obj._probability_two_random_records_match,
+        )
+
+    def copy(self) -> EMParameterStore:
+        return EMParameterStore(
+            self.num_levels,
+            self.m_probabilities.copy(),
+            self.u_probabilities.copy(),
+            self.m_observed.copy(),
+            self.u_observed.copy(),
+            self.probability_two_random_records_match,
+            self.m_estimated,
+            self.u_estimated,
+        )
+
+    @property
+    def _valid(self):
+        width = self.m_probabilities.shape[1]
+        return np.arange(width)[np.newaxis, :] < self.num_levels[:, np.newaxis]
+
+    def bayes_factors_by_comparison_vector_value(self) -> np.ndarray:
+        """An array of Bayes factors indexed by [comparison, comparison vector value]
+
+        The final column is 1.0, so that indexing with a comparison vector value of
+        -1 (the null level) gives a Bayes factor of 1.0
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bayes_factors = np.where(
+                self.u_probabilities == 0,
+                np.inf,
+                self.m_probabilities / self.u_probabilities,
+            )
+
+        num_ccs, width = bayes_factors.shape
+        by_cvv = np.ones((num_ccs, width + 1))
+        for i, n in enumerate(self.num_levels):
+            by_cvv[i, :n] = bayes_factors[i, :n][::-1]
+        return by_cvv
+
+    def maximise(
+        self,
+        m_counts: np.ndarray,
+        u_counts: np.ndarray,
+        probability_two_random_records_match: float,
+        fix_m_probabilities=False,
+        fix_u_probabilities=False,
+        fix_probability_two_random_records_match=False,
+    ):
+        """Update the parameters from the expected m and u counts of each level.
+
+        `m_counts` and `u_counts` are arrays of the same shape as the parameter
+        arrays, containing NaN for any level that was not observed.
+        """
+        if not fix_m_probabilities:
+            self.m_probabilities, self.m_observed = self._proportions(m_counts)
+            self.m_estimated = True
+
+        if not fix_u_probabilities:
+            self.u_probabilities, self.u_observed = self._proportions(u_counts)
+            self.u_estimated = True
+
+        if not fix_probability_two_random_records_match:
+            self.probability_two_random_records_match = (
+                probability_two_random_records_match
+            )
+
+    def _proportions(self, counts):
+        observed = ~np.isnan(counts) & self._valid
+        with np.errstate(divide="ignore", invalid="ignore"):
+            totals = np.nansum(np.where(observed, counts, np.nan), axis=1)
+            proportions = counts / totals[:, np.newaxis]
+        proportions = np.where(observed, proportions, LEVEL_NOT_OBSERVED_PROBABILITY)
+        proportions = np.where(self._valid, proportions, np.nan)
+        return proportions, observed
+
+    def max_change(self, previous: EMParameterStore) -> dict:
+        """Find the largest change in any parameter relative to `previous`.
+
+        Returns the change, which parameter it was in, and the
+        (comparison, column) index of the level if the parameter was an m or u
+        probability
+        """
+        change_m = self.m_probabilities - previous.m_probabilities
+        change_u = self.u_probabilities - previous.u_probabilities
+
+        abs_change_m = np.where(self._valid, np.abs(change_m), -np.inf)
+        abs_change_u = np.where(self._valid, np.abs(change_u), -np.inf)
+        m_is_larger = abs_change_m > abs_change_u
+
+        max_change = {
+            "max_change_type": None,
+            "max_change_value": None,
+            "max_abs_change_value": -0.1,
+            "index": None,
+        }
+
+        abs_change = np.maximum(abs_change_m, abs_change_u)
+        if abs_change.size and np.isfinite(abs_change).any():
+            index = np.unravel_index(np.argmax(abs_change), abs_change.shape)
+            if m_is_larger[index]:
+                max_change["max_change_type"] = "m_probability"
+                max_change["max_change_value"] = float(change_m[index])
+            else:
+                max_change["max_change_type"] = "u_probability"
+                max_change["max_change_value"] = float(change_u[index])
+            max_change["max_abs_change_value"] = float(abs_change[index])
+            max_change["index"] = tuple(int(i) for i in index)
+
+        change_probability_two_random_records_match = (
+            self.probability_two_random_records_match
+            - previous.probability_two_random_records_match
+        )
+        if (
+            abs(change_probability_two_random_records_match)
+            > max_change["max_abs_change_value"]
+        ):
+            max_change = {
+                "max_change_type": "probability_two_random_records_match",
+                "max_change_value": change_probability_two_random_records_match,
+                "max_abs_change_value": abs(
+                    change_probability_two_random_records_match
+                ),
+                "index": None,
+            }
+
+        return max_change
+
+    def populate_settings_obj(self, settings_obj: Settings, write_all=False):
+        """Write the parameters back onto the ComparisonLevels of `settings_obj`.
+
+        By default, only the m and u probabilities updated by `maximise()` are
+        written, through the ComparisonLevel setters, which warn about any level
+        which was not observed.  If `write_all` is true, all of the parameters are
+        written directly, without warnings, e.g. to reconstruct the settings at
+        each iteration of the training history.
+        """
+        for i, cc in enumerate(settings_obj.comparisons):
+            for j, cl in enumerate(cc._comparison_levels_excluding_null):
+                if self.m_observed[i, j]:
+                    m_probability = float(self.m_probabilities[i, j])
+                else:
+                    m_probability = LEVEL_NOT_OBSERVED_TEXT
+                if self.u_observed[i, j]:
+                    u_probability = float(self.u_probabilities[i, j])
+                else:
+                    u_probability = LEVEL_NOT_OBSERVED_TEXT
+
+                if write_all:
+                    cl._m_probability = m_probability
+                    cl._u_probability = u_probability
+                    continue
+
+                if self.m_estimated:
+                    cl.m_probability = m_probability
+                if self.u_estimated:
+                    cl.u_probability = u_probability
+
+        settings_obj._probability_two_random_records_match = (
+            self.probability_two_random_records_match
+        )
@@ -14,8 +14,12 @@ from .comparison import Comparison
 from .comparison_level import ComparisonLevel
 from .comparison_vector_values import compute_comparison_vector_values_sql
 from .constants import LEVEL_NOT_OBSERVED_TEXT
+from .em_parameter_store import EMParameterStore
 from .exceptions import EMTrainingException
-from .expectation_maximisation import expectation_maximisation
+from .expectation_maximisation import (
+    count_agreement_patterns_sql,
+    expectation_maximisation,
+)
 from .misc import bayes_factor_to_prob, prob_to_bayes_factor
 from .parse_sql import get_columns_used_from_sql
 
@@ -40,6 +44,7 @@ class EMTrainingSession:
         fix_probability_two_random_records_match: bool = False,
         comparisons_to_deactivate: list[Comparison] = None,
         comparison_levels_to_reverse_blocking_rule: list[ComparisonLevel] = None,
+        estimate_without_term_frequencies: bool = False,
     ):
         logger.info("\n----- Starting EM training session -----\n")
 
@@ -52,6 +57,15 @@ class EMTrainingSession:
         self._settings_obj._retain_intermediate_calculation_columns = False
         self._settings_obj._training_mode = True
 
+        self._estimate_without_term_frequencies = estimate_without_term_frequencies
+        if estimate_without_term_frequencies:
+            # The comparison vectors are aggregated into agreement pattern counts,
+            # which only makes sense if match probabilities depend only on the
+            # comparison vector
+            for cc in self._settings_obj.comparisons:
+                for cl in cc.comparison_levels:
+                    cl._level_dict["tf_adjustment_column"] = None
+
         if not isinstance(blocking_rule_for_training, BlockingRule):
             blocking_rule = BlockingRule(blocking_rule_for_training)
 
@@ -106,7 +120,10 @@ class EMTrainingSession:
         self._settings_obj.comparisons = filtered_ccs
         self._comparisons_that_can_be_estimated = filtered_ccs
 
-        self._settings_obj_history = []
+        # The parameters are held as arrays whilst training, and only written back
+        # onto the ComparisonLevels of self._settings_obj when needed
+        self._parameters = EMParameterStore.from_settings_obj(self._settings_obj)
+        self._parameter_history: list[EMParameterStore] = []
 
         # Add iteration 0 i.e. the starting parameters
         self._add_iteration()
@@ -163,6 +180,15 @@ class EMTrainingSession:
 
         sql = compute_comparison_vector_values_sql(self._settings_obj)
         self._training_linker._enqueue_sql(sql, "__splink__df_comparison_vectors")
+
+        # Rather than materialising every pairwise comparison, materialise only
+        # the count of each distinct comparison vector
+        if self._estimate_without_term_frequencies:
+            sql = count_agreement_patterns_sql(self._settings_obj)
+            self._training_linker._enqueue_sql(
+                sql, "__splink__agreement_pattern_counts"
+            )
+
         return self._training_linker._execute_sql_pipeline(input_dataframes)
 
     def _train(self):
@@ -236,7 +262,16 @@ class EMTrainingSession:
         self._original_linker._em_training_sessions.append(self)
 
     def _add_iteration(self):
-        self._settings_obj_history.append(deepcopy(self._settings_obj))
+        self._parameter_history.append(self._parameters.copy())
+
+    @property
+    def _settings_obj_history(self):
+        settings_obj_history = []
+        for parameters in self._parameter_history:
+            settings_obj = deepcopy(self._settings_obj)
+            parameters.populate_settings_obj(settings_obj, write_all=True)
+            settings_obj_history.append(settings_obj)
+        return settings_obj_history
 
     @property
     def _blocking_adjusted_probability_two_random_records_match(self):
@@ -339,61 +374,19 @@ class EMTrainingSession:
         return message
 
     def _max_change_in_parameters_comparison_levels(self):
-        previous_iteration = self._settings_obj_history[-2]
-        this_iteration = self._settings_obj_history[-1]
-        max_change = -0.1
-
-        max_change_levels = {
-            "previous_iteration": None,
-            "this_iteration": None,
-            "max_change_type": None,
-            "max_change_value": None,
-        }
-        comparisons = zip(previous_iteration.comparisons, this_iteration.comparisons)
-        for comparison in comparisons:
-            prev_cc = comparison[0]
-            this_cc = comparison[1]
-            z_cls = zip(prev_cc.comparison_levels, this_cc.comparison_levels)
-            for z_cl in z_cls:
-                if z_cl[0].is_null_level:
-                    continue
-                prev_cl = z_cl[0]
-                this_cl = z_cl[1]
-                change_m = this_cl.m_probability - prev_cl.m_probability
-                change_u = this_cl.u_probability - prev_cl.u_probability
-                change = max(abs(change_m), abs(change_u))
-                change_type = (
-                    "m_probability"
-                    if abs(change_m) > abs(change_u)
-                    else "u_probability"
-                )
-                change_value = change_m if abs(change_m) > abs(change_u) else change_u
-                if change > max_change:
-                    max_change = change
-                    max_change_levels["prev_comparison_level"] = prev_cl
-                    max_change_levels["current_comparison_level"] = this_cl
-                    max_change_levels["max_change_type"] = change_type
-                    max_change_levels["max_change_value"] = change_value
-                    max_change_levels["max_abs_change_value"] = abs(change_value)
-
-        change_probability_two_random_records_match = (
-            this_iteration._probability_two_random_records_match
-            - previous_iteration._probability_two_random_records_match
-        )
+        previous_iteration = self._parameter_history[-2]
+        this_iteration = self._parameter_history[-1]
 
-        if abs(change_probability_two_random_records_match) > max_change:
-            max_change = abs(change_probability_two_random_records_match)
-            max_change_levels["prev_comparison_level"] = None
+        max_change_levels = this_iteration.max_change(previous_iteration)
+
+        index = max_change_levels.pop("index")
+        if index is None:
             max_change_levels["current_comparison_level"] = None
-            max_change_levels[
-                "max_change_type"
-            ] = "probability_two_random_records_match"
-            max_change_levels[
-                "max_change_value"
-            ] = change_probability_two_random_records_match
-            max_change_levels["max_abs_change_value"] = abs(
-                change_probability_two_random_records_match
-            )
+        else:
+            cc_index, cl_index = index
+            cc = self._settings_obj.comparisons[cc_index]
+            cl = cc._comparison_levels_excluding_null[cl_index]
+            max_change_levels["current_comparison_level"] = cl
 
         max_change_levels["message"] = self._max_change_message(max_change_levels)
 
@@ -5,10 +5,12 @@ import time
 from typing import TYPE_CHECKING
 
 import duckdb
+import numpy as np
 
-from .comparison_level import ComparisonLevel
-from .constants import LEVEL_NOT_OBSERVED_TEXT
-from .m_u_records_to_parameters import m_u_records_to_lookup_dict
+from .comparison_vector_values import unpack_comparison_vector_value_sql
+from .constants import PACKED_COMPARISON_VECTOR
+from .em_parameter_store import EMParameterStore
+from .misc import prob_to_bayes_factor
 from .predict import predict_from_comparison_vectors_sqls
 from .settings import Settings
 from .splink_dataframe import SplinkDataFrame
@@ -24,21 +26,47 @@ logger = logging.getLogger(__name__)
 def compute_new_parameters_sql(settings_obj: Settings):
     """compute m and u counts from the results of predict"""
 
-    sql_template = """
-    select
-    {gamma_column} as comparison_vector_value,
-    sum(match_probability) as m_count,
-    sum(1-match_probability) as u_count,
-    '{output_column_name}' as output_column_name
-    from __splink__df_predict
-    group by {gamma_column}
-    """
+    if settings_obj._pack_comparison_vectors:
+        # Aggregate by the packed comparison vector once, then aggregate the
+        # (much smaller) result by each comparison's comparison vector value
+        sql_template = f"""
+        select
+        {{gamma_column}} as comparison_vector_value,
+        sum(m_count) as m_count,
+        sum(u_count) as u_count,
+        '{{output_column_name}}' as output_column_name
+        from (
+            select
+            {PACKED_COMPARISON_VECTOR},
+            sum(match_probability) as m_count,
+            sum(1-match_probability) as u_count
+            from __splink__df_predict
+            group by {PACKED_COMPARISON_VECTOR}
+        ) as packed_counts
+        group by {{gamma_column}}
+        """
+        gamma_columns = [
+            unpack_comparison_vector_value_sql(settings_obj, cc)
+            for cc in settings_obj.comparisons
+        ]
+    else:
+        sql_template = """
+        select
+        {gamma_column} as comparison_vector_value,
+        sum(match_probability) as m_count,
+        sum(1-match_probability) as u_count,
+        '{output_column_name}' as output_column_name
+        from __splink__df_predict
+        group by {gamma_column}
+        """
+        gamma_columns = [cc._gamma_column_name for cc in settings_obj.comparisons]
+
     union_sqls = [
         sql_template.format(
-            gamma_column=cc._gamma_column_name,
+            gamma_column=gamma_column,
             output_column_name=cc._output_column_name,
         )
-        for cc in settings_obj.comparisons
+        for cc, gamma_column in zip(settings_obj.comparisons, gamma_columns)
     ]
 
     # Probability of two random records matching
@@ -56,6 +84,134 @@ def compute_new_parameters_sql(settings_obj: Settings):
     return sql
 
 
+def count_agreement_patterns_sql(settings_obj: Settings):
+    """Count the number of times each distinct comparison vector (agreement
+    pattern) occurs in __splink__df_comparison_vectors.
+
+    Where term frequency adjustments are not used, the match probability of a
+    pairwise comparison depends only on its comparison vector, so EM can be run
+    against these counts rather than against every pairwise comparison
+    """
+    gamma_cols = [cc._gamma_column_name for cc in settings_obj.comparisons]
+    gamma_cols_expr = ", ".join(gamma_cols)
+
+    if settings_obj._pack_comparison_vectors:
+        unpacked_cols = [
+            f"{unpack_comparison_vector_value_sql(settings_obj, cc)} "
+            f"as {cc._gamma_column_name}"
+            for cc in settings_obj.comparisons
+        ]
+        sql = f"""
+        select {", ".join(unpacked_cols)}, count(*) as agreement_pattern_count
+        from __splink__df_comparison_vectors
+        group by {PACKED_COMPARISON_VECTOR}
+        """
+        return sql
+
+    sql = f"""
+    select {gamma_cols_expr}, count(*) as agreement_pattern_count
+    from __splink__df_comparison_vectors
+    group by {gamma_cols_expr}
+    """
+
+    return sql
+
+
+def compute_new_parameters_from_agreement_pattern_counts(
+    parameters: EMParameterStore,
+    comparison_vector_values: np.ndarray,
+    agreement_pattern_counts: np.ndarray,
+):
+    """The expectation step computed in-process using NumPy against the (small)
+    table of agreement pattern counts.
+
+    Args:
+        parameters (EMParameterStore): The current parameter estimates
+        comparison_vector_values (np.ndarray): The agreement patterns, with one
+            row per pattern and one column per comparison
+        agreement_pattern_counts (np.ndarray): The number of pairwise comparisons
+            with each agreement pattern
+
+    Returns:
+        The expected m and u counts of each comparison level, in the format expected
+        by `EMParameterStore.maximise()`, and the new estimate of the probability
+        two random records match
+    """
+    counts = agreement_pattern_counts.astype("float64")
+
+    # Expectation step
+    bayes_factors_by_cvv = parameters.bayes_factors_by_comparison_vector_value()
+    comparison_index = np.arange(comparison_vector_values.shape[1])
+    bayes_factors = prob_to_bayes_factor(
+        parameters.probability_two_random_records_match
+    )
+    bayes_factors = bayes_factors * np.prod(
+        bayes_factors_by_cvv[comparison_index, comparison_vector_values], axis=1
+    )
+
+    with np.errstate(invalid="ignore"):
+        match_probability = np.where(
+            np.isinf(bayes_factors), 1.0, bayes_factors / (1 + bayes_factors)
+        )
+
+    m_weights = counts * match_probability
+    u_weights = counts * (1 - match_probability)
+
+    # Expected counts of each level.  Consistent with the SQL implementation, levels
+    # which are never observed are NaN, and so do not get a parameter estimate
+    m_counts = np.full(parameters.m_probabilities.shape, np.nan)
+    u_counts = np.full(parameters.u_probabilities.shape, np.nan)
+    for i, num_levels in enumerate(parameters.num_levels):
+        gammas = comparison_vector_values[:, i]
+        not_null = gammas != -1
+        gammas = gammas[not_null]
+
+        observed = np.bincount(gammas, minlength=num_levels) > 0
+        m_count = np.bincount(gammas, m_weights[not_null], minlength=num_levels)
+        u_count = np.bincount(gammas, u_weights[not_null], minlength=num_levels)
+
+        # Columns of the parameter arrays are in descending comparison vector value
+        m_counts[i, :num_levels] = np.where(observed, m_count, np.nan)[::-1]
+        u_counts[i, :num_levels] = np.where(observed, u_count, np.nan)[::-1]
+
+    probability_two_random_records_match = m_weights.sum() / counts.sum()
+
+    return m_counts, u_counts, probability_two_random_records_match
+
+
+def m_u_counts_to_arrays(
+    settings_obj: Settings, parameters: EMParameterStore, m_u_counts
+):
+    """Convert the results of compute_new_parameters_sql, as a pandas dataframe, into
+    the format expected by `EMParameterStore.maximise()`"""
+
+    is_prop_record = (
+        m_u_counts["output_column_name"] == "_probability_two_random_records_match"
+    )
+    probability_two_random_records_match = m_u_counts.loc[
+        is_prop_record, "m_count"
+    ].iloc[0]
+
+    m_u_counts = m_u_counts[
+        ~is_prop_record & (m_u_counts.comparison_vector_value != -1)
+    ]
+
+    comparison_index = {
+        cc._output_column_name: i for i, cc in enumerate(settings_obj.comparisons)
+    }
+    i = m_u_counts["output_column_name"].map(comparison_index).to_numpy()
+    cvv = m_u_counts["comparison_vector_value"].to_numpy(dtype="int64")
+    # Columns of the parameter arrays are in descending comparison vector value
+    j = parameters.num_levels[i] - 1 - cvv
+
+    m_counts = np.full(parameters.m_probabilities.shape, np.nan)
+    u_counts = np.full(parameters.u_probabilities.shape, np.nan)
+    m_counts[i, j] = m_u_counts["m_count"].to_numpy(dtype="float64")
+    u_counts[i, j] = m_u_counts["u_count"].to_numpy(dtype="float64")
+
+    return m_counts, u_counts, probability_two_random_records_match
+
+
 def compute_proportions_for_new_parameters(m_u_df):
     """Using the results from compute_new_parameters_sql, compute
     m and u
@@ -88,52 +244,22 @@ def compute_proportions_for_new_parameters(m_u_df):
     return duckdb.query(sql).to_df().to_dict("records")
 
 
-def populate_m_u_from_lookup(
-    em_training_session, comparison_level: ComparisonLevel, m_u_records_lookup
+def maximisation_step(
+    em_training_session: EMTrainingSession,
+    m_counts,
+    u_counts,
+    probability_two_random_records_match,
 ):
-    cl = comparison_level
-    c = comparison_level.comparison
-    if not em_training_session._training_fix_m_probabilities:
-        try:
-            m_probability = m_u_records_lookup[c._output_column_name][
-                cl._comparison_vector_value
-            ]["m_probability"]
-
-        except KeyError:
-            m_probability = LEVEL_NOT_OBSERVED_TEXT
-        cl.m_probability = m_probability
-
-    if not em_training_session._training_fix_u_probabilities:
-        try:
-            u_probability = m_u_records_lookup[c._output_column_name][
-                cl._comparison_vector_value
-            ]["u_probability"]
-
-        except KeyError:
-            u_probability = LEVEL_NOT_OBSERVED_TEXT
-
-        cl.u_probability = u_probability
-
-
-def maximisation_step(em_training_session: EMTrainingSession, param_records):
-    settings_obj = em_training_session._settings_obj
-
-    m_u_records = []
-    for r in param_records:
-        if r["output_column_name"] == "_probability_two_random_records_match":
-            prop_record = r
-        else:
-            m_u_records.append(r)
-
-    if not em_training_session._training_fix_probability_two_random_records_match:
-        settings_obj._probability_two_random_records_match = prop_record[
-            "m_probability"
-        ]
-
-    m_u_records_lookup = m_u_records_to_lookup_dict(m_u_records)
-    for cc in settings_obj.comparisons:
-        for cl in cc._comparison_levels_excluding_null:
-            populate_m_u_from_lookup(em_training_session, cl, m_u_records_lookup)
+    em_training_session._parameters.maximise(
+        m_counts,
+        u_counts,
+        probability_two_random_records_match,
+        fix_m_probabilities=em_training_session._training_fix_m_probabilities,
+        fix_u_probabilities=em_training_session._training_fix_u_probabilities,
+        fix_probability_two_random_records_match=(
+            em_training_session._training_fix_probability_two_random_records_match
+        ),
+    )
 
     em_training_session._add_iteration()
 
@@ -147,6 +273,10 @@ def expectation_maximisation(
 
     In the maximisation step, we use these predicted probabilities to re-compute
     the parameters of the model
+
+    If the training session is estimating without term frequencies,
+    `df_comparison_vector_values` is instead the table of agreement pattern counts,
+    and both steps are computed in-process, without further queries to the backend
     """
 
     settings_obj = em_training_session._settings_obj
@@ -156,26 +286,48 @@ def expectation_maximisation(
     em_convergece = settings_obj._em_convergence
     logger.info("")  # newline
 
-    for i in range(1, max_iterations + 1):
-        start_time = time.time()
+    parameters = em_training_session._parameters
 
-        # Expectation step
-        sqls = predict_from_comparison_vectors_sqls(
-            settings_obj,
-            sql_infinity_expression=linker._infinity_expression,
+    agreement_pattern_counts = None
+    if em_training_session._estimate_without_term_frequencies:
+        agreement_pattern_counts = df_comparison_vector_values.as_pandas_dataframe()
+        gamma_cols = [cc._gamma_column_name for cc in settings_obj.comparisons]
+        comparison_vector_values = agreement_pattern_counts[gamma_cols].to_numpy(
+            dtype="int64"
         )
-        for sql in sqls:
-            linker._enqueue_sql(sql["sql"], sql["output_table_name"])
-
-        sql = compute_new_parameters_sql(settings_obj)
-        linker._enqueue_sql(sql, "__splink__m_u_counts")
-        df_params = linker._execute_sql_pipeline([df_comparison_vector_values])
-        param_records = df_params.as_pandas_dataframe()
-        param_records = compute_proportions_for_new_parameters(param_records)
+        agreement_pattern_counts = agreement_pattern_counts[
+            "agreement_pattern_count"
+        ].to_numpy()
 
-        df_params.drop_table_from_database()
+    for i in range(1, max_iterations + 1):
+        start_time = time.time()
 
-        maximisation_step(em_training_session, param_records)
+        if agreement_pattern_counts is not None:
+            new_parameters = compute_new_parameters_from_agreement_pattern_counts(
+                parameters, comparison_vector_values, agreement_pattern_counts
+            )
+        else:
+            # The expectation step sql is generated from the ComparisonLevels, so
+            # these need to reflect the current parameter estimates
+            parameters.populate_settings_obj(settings_obj)
+
+            # Expectation step
+            sqls = predict_from_comparison_vectors_sqls(
+                settings_obj,
+                sql_infinity_expression=linker._infinity_expression,
+            )
+            for sql in sqls:
+                linker._enqueue_sql(sql["sql"], sql["output_table_name"])
+
+            sql = compute_new_parameters_sql(settings_obj)
+            linker._enqueue_sql(sql, "__splink__m_u_counts")
+            df_params = linker._execute_sql_pipeline([df_comparison_vector_values])
+            m_u_counts = df_params.as_pandas_dataframe()
+            new_parameters = m_u_counts_to_arrays(settings_obj, parameters, m_u_counts)
+
+            df_params.drop_table_from_database()
+
+        maximisation_step(em_training_session, *new_parameters)
         max_change_dict = (
             em_training_session._max_change_in_parameters_comparison_levels()
         )
@@ -186,3 +338,5 @@ def expectation_maximisation(
         if max_change_dict["max_abs_change_value"] < em_convergece:
             break
     logger.info(f"\nEM converged after {i} iterations")
+
+    parameters.populate_settings_obj(settings_obj)
@@ -8,6 +8,7 @@ import re
 import warnings
 from collections import UserDict
 from copy import copy, deepcopy
+from itertools import count
 from pathlib import Path
 from statistics import median
 
@@ -20,10 +21,13 @@ from .accuracy import (
     truth_space_table_from_labels_table,
 )
 from .analyse_blocking import (
+    blocking_key_skew_records,
     cumulative_comparisons_generated_by_blocking_rules,
     number_of_comparisons_generated_by_blocking_rule_sql,
+    number_of_ordered_pairs_from_blocking_key_counts_sql,
 )
-from .blocking import BlockingRule, block_using_rules_sql
+from .blocking import BlockingRule, _equi_join_key_expressions, block_using_rules_sql
+from .blocking_index import InMemoryMatcher
 from .charts import (
     completeness_chart,
     cumulative_blocking_rule_comparisons_generated,
@@ -42,9 +46,11 @@ from .comparison_vector_distribution import (
     comparison_vector_distribution_sql,
 )
 from .comparison_vector_values import compute_comparison_vector_values_sql
+from .compiled_scorer import CompiledScorer
 from .connected_components import (
     _cc_create_unique_id_cols,
     solve_connected_components,
+    update_clusters_from_new_predictions,
 )
 from .em_training_session import EMTrainingSession
 from .estimate_u import estimate_u_values
@@ -65,9 +71,15 @@ from .misc import (
     prob_to_bayes_factor,
 )
 from .missingness import completeness_data, missingness_data
+from .persistent_cache import PersistentTableCache, input_fingerprint
 from .pipeline import SQLPipeline
-from .predict import predict_from_comparison_vectors_sqls
+from .predict import (
+    match_weight_upper_bound_filter_sql,
+    predict_from_comparison_vectors_sqls,
+    predict_from_comparison_vectors_using_lookup_sqls,
+)
 from .profile_data import profile_columns
+from .realtime_matcher import RealtimeMatcher
 from .settings import Settings
 from .splink_comparison_viewer import (
     comparison_viewer_table_sqls,
@@ -94,8 +106,29 @@ warnings.simplefilter("always", DeprecationWarning)
 
 
 class CacheDictWithLogging(UserDict):
+    """Cache of SplinkDataFrames, keyed by templated name.
+
+    If `max_size_bytes` is set, the least recently used tables are evicted from the
+    cache, and dropped from the database, once the estimated total size of the
+    cached tables exceeds it.  Tables in `pinned_templated_names`, and tables whose
+    size cannot be estimated (e.g. user-registered views), are never evicted.
+    """
+
+    def __init__(
+        self,
+        max_size_bytes: int = None,
+        pinned_templated_names: tuple[str] = ("__splink__df_concat_with_tf",),
+    ):
+        super().__init__()
+        self.max_size_bytes = max_size_bytes
+        self.pinned_templated_names = set(pinned_templated_names)
+        self._sizes = {}
+        self._last_used = {}
+        self._use_counter = count()
+
     def __getitem__(self, key) -> SplinkDataFrame:
         splink_dataframe = super().__getitem__(key)
+        self._last_used[key] = next(self._use_counter)
         phy_name = splink_dataframe.physical_name
         logger.debug(
             f"Using cache for template name {key}" f" with physical name {phy_name}"
@@ -109,14 +142,69 @@ class CacheDictWithLogging(UserDict):
         if not isinstance(value, SplinkDataFrame):
             raise TypeError("Cached items must be of type SplinkDataFrame")
 
+        self._sizes.pop(key, None)
         super().__setitem__(key, value)
+        self._last_used[key] = next(self._use_counter)
 
         logger.log(
             1, f"Setting cache for template name {key}" f" with physical name {value}"
         )
 
+        self._evict_if_over_budget(protected_key=key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._sizes.pop(key, None)
+        self._last_used.pop(key, None)
+
+    def _size(self, key) -> int | None:
+        if key not in self._sizes:
+            self._sizes[key] = self.data[key]._estimated_size_bytes
+        return self._sizes[key]
+
+    @property
+    def size_bytes(self) -> int:
+        """The estimated total size of the cached tables whose size is known"""
+        return sum(self._size(key) or 0 for key in self.data)
+
+    def _evict_if_over_budget(self, protected_key=None):
+        if self.max_size_bytes is None:
+            return
+
+        total = self.size_bytes
+        least_recently_used_first = sorted(self.data, key=self._last_used.get)
+        for key in least_recently_used_first:
+            if total <= self.max_size_bytes:
+                break
+            size = self._size(key)
+            if key == protected_key or key in self.pinned_templated_names or not size:
+                continue
+            self._evict(key)
+            total -= size
+
+    def _evict(self, key):
+        splink_dataframe = self.data[key]
+        del self[key]
+        physical_name = splink_dataframe.physical_name
+        logger.debug(
+            f"Evicting template name {key} with physical name {physical_name} "
+            "from cache"
+        )
+
+        still_cached = any(
+            df.physical_name == physical_name for df in self.data.values()
+        )
+        if physical_name.startswith("__splink__") and not still_cached:
+            splink_dataframe.drop_table_from_database()
+
+    def set_max_size_bytes(self, max_size_bytes: int | None):
+        self.max_size_bytes = max_size_bytes
+        self._evict_if_over_budget()
+
     def invalidate_cache(self):
         self.data = dict()
+        self._sizes = {}
+        self._last_used = {}
 
 
 class Linker:
@@ -130,6 +218,22 @@ class Linker:
     a `DuckDBLinker`.
     """
 
+    # How comparisons generated by more than one blocking rule are deduplicated.
+    # Either "and_not_preceding_rules", which excludes comparisons generated by
+    # preceding rules within each rule's join condition, or
+    # "dedupe_min_match_key", which generates each rule's comparisons
+    # independently and keeps the comparison with the lowest match_key.  Backends
+    # may override this with whichever is faster for their query engine.
+    _blocking_rule_deduplication_strategy = "and_not_preceding_rules"
+
+    # Whether blocking rules with `salting_partitions` are salted
+    _supports_salting = False
+
+    # Whether predict() evaluates the Bayes factors of each distinct comparison
+    # vector in a lookup table joined to the record pairs, rather than evaluating
+    # them for each record pair
+    _predict_using_match_weight_lookup = False
+
     def __init__(
         self,
         input_table_or_tables: str | list,
@@ -184,7 +288,9 @@ class Linker:
         self._pipeline = SQLPipeline()
 
         self._names_of_tables_created_by_splink: set = set()
-        self._intermediate_table_cache: dict = CacheDictWithLogging()
+        self._intermediate_table_cache: CacheDictWithLogging = CacheDictWithLogging()
+        self._persistent_cache: PersistentTableCache = None
+        self._input_fingerprint: str = None
 
         if not isinstance(settings_dict, (dict, type(None))):
             # Run if you've entered a filepath
@@ -341,6 +447,13 @@ class Linker:
             f"infinity sql expression not available for {type(self)}"
         )
 
+    def _hash_columns_sql(self, columns: list[str]) -> str:
+        """A sql expression hashing the values of `columns` to a 64 bit integer,
+        used to turn exact match blocking rules into integer equi-joins"""
+        raise NotImplementedError(
+            f"hashing of columns is not available for {type(self)}"
+        )
+
     @property
     def _verify_link_only_job(self):
 
@@ -397,7 +510,7 @@ class Linker:
                 alias = f"__splink__input_table_{i}"
 
             if isinstance(table, accepted_df_dtypes):
-                self._table_registration(table, alias)
+                self._input_table_registration(table, alias)
                 table = alias
 
             homogenised_tables.append(table)
@@ -609,6 +722,9 @@ class Linker:
 
         Tables can be of type: dictionary, record level dictionary,
         pandas dataframe, pyarrow table and in the spark case, a spark df.
+        In the duckdb case, pyarrow datasets are registered as views without
+        being read into memory, and pyarrow `RecordBatchReader`s are streamed
+        into a table.
 
         Examples:
             >>> test_dict = {"a": [666,777,888],"b": [4,5,6]}
@@ -653,6 +769,14 @@ class Linker:
             f"_table_registration not implemented for {type(self)}"
         )
 
+    def _input_table_registration(self, input, table_name):
+        """Register one of the input tables passed to the linker.
+
+        Backends which can read their input lazily may override this to
+        register only the columns needed by the model.
+        """
+        self._table_registration(input, table_name)
+
     def query_sql(self, sql, output_type="pandas"):
         """
         Run a SQL query against your backend database and return
@@ -709,10 +833,23 @@ class Linker:
         """
 
         to_hash = (sql + self._cache_uid).encode("utf-8")
-        hash = hashlib.sha256(to_hash).hexdigest()[:9]
+        full_hash = hashlib.sha256(to_hash).hexdigest()
+        hash = full_hash[:9]
         # Ensure hash is valid sql table name
         table_name_hash = f"{output_tablename_templated}_{hash}"
 
+        persistent_cache = self._persistent_cache
+        persist = (
+            materialise_as_hash
+            and persistent_cache is not None
+            and persistent_cache.should_persist(output_tablename_templated)
+        )
+        if persist:
+            # Tables on disk outlive the input data, so their key also identifies
+            # the contents of the input tables
+            to_hash = (full_hash + self._input_fingerprint).encode("utf-8")
+            persistent_key = hashlib.sha256(to_hash).hexdigest()
+
         if use_cache:
             if self._table_exists_in_database(output_tablename_templated):
                 logger.debug(f"Using existing table {output_tablename_templated}")
@@ -729,6 +866,19 @@ class Linker:
                     output_tablename_templated, table_name_hash
                 )
 
+            if persist:
+                path = persistent_cache.get(persistent_key)
+                if path is not None:
+                    logger.debug(
+                        f"Using on-disk cache for {output_tablename_templated}"
+                        f" with physical name {table_name_hash}"
+                    )
+                    splink_dataframe = self._load_table_from_parquet(
+                        str(path), output_tablename_templated, table_name_hash
+                    )
+                    self._names_of_tables_created_by_splink.add(table_name_hash)
+                    return splink_dataframe
+
         if self.debug_mode:
             print(sql)
 
@@ -745,6 +895,9 @@ class Linker:
 
         self._names_of_tables_created_by_splink.add(splink_dataframe.physical_name)
 
+        if persist:
+            persistent_cache.put(persistent_key, splink_dataframe, self._cache_uid)
+
         if self.debug_mode:
             df_pd = splink_dataframe.as_pandas_dataframe()
             try:
@@ -816,6 +969,13 @@ class Linker:
             f"table_exists_in_database not implemented for {type(self)}"
         )
 
+    def _load_table_from_parquet(
+        self, path: str, templated_name: str, physical_name: str
+    ) -> SplinkDataFrame:
+        raise NotImplementedError(
+            f"_load_table_from_parquet not implemented for {type(self)}"
+        )
+
     def _validate_input_dfs(self):
         if not hasattr(self, "_input_tables_dict"):
             # This is only triggered where a user loads a settings dict from a
@@ -1293,6 +1453,7 @@ class Linker:
         fix_m_probabilities=False,
         fix_u_probabilities=True,
         populate_probability_two_random_records_match_from_trained_values=False,
+        estimate_without_term_frequencies=False,
     ) -> EMTrainingSession:
         """Estimate the parameters of the linkage model using expectation maximisation.
 
@@ -1366,6 +1527,12 @@ class Linker:
             populate_probability_two_random_records_match_from_trained_values
                 (bool, optional): If True, derive this parameter from
                 the blocked value. Defaults to False.
+            estimate_without_term_frequencies (bool, optional): If True, the
+                iterations of the EM algorithm ignore any term frequency adjustments
+                and only depend on the comparison vectors.  This allows the EM
+                algorithm to run much faster, since the pairwise comparisons are
+                aggregated into counts of each distinct comparison vector, and the
+                iterations run in-process against these counts.  Defaults to False.
 
         Examples:
             >>> blocking_rule = "l.first_name = r.first_name and l.dob = r.dob"
@@ -1408,6 +1575,7 @@ class Linker:
             fix_probability_two_random_records_match=fix_probability_two_random_records_match,  # noqa 501
             comparisons_to_deactivate=comparisons_to_deactivate,
             comparison_levels_to_reverse_blocking_rule=comparison_levels_to_reverse_blocking_rule,  # noqa 501
+            estimate_without_term_frequencies=estimate_without_term_frequencies,
         )
 
         em_training_session._train()
@@ -1426,6 +1594,9 @@ class Linker:
         threshold_match_probability: float = None,
         threshold_match_weight: float = None,
         materialise_after_computing_term_frequencies=True,
+        early_threshold_filtering=False,
+        compact_output=False,
+        retain_comparison_vectors=False,
     ) -> SplinkDataFrame:
         """Create a dataframe of scored pairwise comparisons using the parameters
         of the linkage model.
@@ -1447,6 +1618,25 @@ class Linker:
                 for in the settings object.  If False, this will be
                 computed as part of one possibly gigantic CTE
                 pipeline.   Defaults to True
+            early_threshold_filtering (bool): If true, and a threshold is
+                specified, discard pairwise comparisons which cannot reach the
+                threshold before evaluating expensive comparisons such as string
+                distance functions.  Cheap comparisons such as exact matches are
+                evaluated first, and expensive comparisons are assumed to take
+                their most favourable level.  The results are unchanged.  Ignored
+                if `retain_comparison_vectors` is true. Defaults to False.
+            compact_output (bool): If true, the output contains only the unique
+                ids, `match_key`, `match_weight`, `match_probability` and the
+                comparison vector (gamma) columns, stored as small integers,
+                irrespective of `retain_matching_columns` and
+                `retain_intermediate_calculation_columns`.  Use
+                `linker.rejoin_record_values()` to add the values of the records
+                to the rows you wish to inspect.  Defaults to False.
+            retain_comparison_vectors (bool): If true, materialise and retain the
+                table of comparison vectors, so that the pairwise comparisons can
+                be scored again by `linker.rescore()` after the parameters of the
+                model change, without blocking and comparing the records again.
+                Defaults to False.
 
         Examples:
             >>> linker = DuckDBLinker(df, connection=":memory:")
@@ -1475,8 +1665,21 @@ class Linker:
         if nodes_with_tf:
             input_dataframes.append(nodes_with_tf)
 
+        # The retained comparison vectors may be rescored with different
+        # parameters, so they must not be filtered using the current ones
+        filter_sql = None
+        if early_threshold_filtering and not retain_comparison_vectors:
+            filter_sql = match_weight_upper_bound_filter_sql(
+                self._settings_obj,
+                threshold_match_probability,
+                threshold_match_weight,
+            )
+
         sql = block_using_rules_sql(self)
-        self._enqueue_sql(sql, "__splink__df_blocked")
+        if filter_sql:
+            self._enqueue_sql(sql, "__splink__df_blocked_before_threshold")
+        else:
+            self._enqueue_sql(sql, "__splink__df_blocked")
 
         repartition_after_blocking = getattr(self, "repartition_after_blocking", False)
 
@@ -1485,14 +1688,47 @@ class Linker:
             df_blocked = self._execute_sql_pipeline(input_dataframes)
             input_dataframes.append(df_blocked)
 
+        if filter_sql:
+            self._enqueue_sql(filter_sql, "__splink__df_blocked")
+
         sql = compute_comparison_vector_values_sql(self._settings_obj)
         self._enqueue_sql(sql, "__splink__df_comparison_vectors")
 
-        sqls = predict_from_comparison_vectors_sqls(
+        # The match weight lookup reads the comparison vectors twice, to find the
+        # distinct vectors and to join them to the lookup, so they should be
+        # computed only once
+        if retain_comparison_vectors or self._predict_using_match_weight_lookup:
+            df_comparison_vectors = self._execute_sql_pipeline(input_dataframes)
+            input_dataframes = [df_comparison_vectors]
+            if retain_comparison_vectors:
+                self._intermediate_table_cache[
+                    "__splink__df_comparison_vectors"
+                ] = df_comparison_vectors
+
+        return self._predict_from_comparison_vectors(
+            input_dataframes,
+            threshold_match_probability,
+            threshold_match_weight,
+            compact_output,
+        )
+
+    def _predict_from_comparison_vectors(
+        self,
+        input_dataframes: list[SplinkDataFrame],
+        threshold_match_probability: float = None,
+        threshold_match_weight: float = None,
+        compact_output=False,
+    ) -> SplinkDataFrame:
+        if self._predict_using_match_weight_lookup:
+            predict_sqls = predict_from_comparison_vectors_using_lookup_sqls
+        else:
+            predict_sqls = predict_from_comparison_vectors_sqls
+        sqls = predict_sqls(
             self._settings_obj,
             threshold_match_probability,
             threshold_match_weight,
             sql_infinity_expression=self._infinity_expression,
+            compact_output=compact_output,
         )
         for sql in sqls:
             self._enqueue_sql(sql["sql"], sql["output_table_name"])
@@ -1501,6 +1737,149 @@ class Linker:
         self._predict_warning()
         return predictions
 
+    def rescore(
+        self,
+        df_comparison_vectors: str | SplinkDataFrame = None,
+        threshold_match_probability: float = None,
+        threshold_match_weight: float = None,
+        compact_output=False,
+    ) -> SplinkDataFrame:
+        """Score a table of comparison vectors using the current parameters of the
+        linkage model, without blocking and comparing the records again.
+
+        This is useful when iterating on the parameters of a model (e.g. with
+        further expectation maximisation sessions) against a fixed set of
+        pairwise comparisons, since only the final projection which computes the
+        match weights is re-run.
+
+        The comparison vectors must have been computed using the same comparisons
+        and columns as the current model - only the m and u probabilities and
+        the `probability_two_random_records_match` may differ.
+
+        Examples:
+            >>> df_predict = linker.predict(retain_comparison_vectors=True)
+            >>> linker.estimate_parameters_using_expectation_maximisation(
+            >>>     "l.dob = r.dob"
+            >>> )
+            >>> df_rescored = linker.rescore()
+
+        Args:
+            df_comparison_vectors (str | SplinkDataFrame, optional): The comparison
+                vectors to score, or the name of a table containing them.  Defaults
+                to None, meaning the comparison vectors retained by the last call
+                to `linker.predict(retain_comparison_vectors=True)`.
+            threshold_match_probability (float, optional): If specified,
+                filter the results to include only pairwise comparisons with a
+                match_probability above this threshold. Defaults to None.
+            threshold_match_weight (float, optional): If specified,
+                filter the results to include only pairwise comparisons with a
+                match_weight above this threshold. Defaults to None.
+            compact_output (bool): As for `linker.predict()`. Defaults to False.
+
+        Returns:
+            SplinkDataFrame: A SplinkDataFrame of the scored pairwise comparisons.
+        """
+        if df_comparison_vectors is None:
+            cache = self._intermediate_table_cache
+            if "__splink__df_comparison_vectors" not in cache:
+                raise ValueError(
+                    "No comparison vectors have been retained.  Call "
+                    "linker.predict(retain_comparison_vectors=True) first, or "
+                    "pass a table of comparison vectors to rescore."
+                )
+            df_comparison_vectors = cache["__splink__df_comparison_vectors"]
+
+        if isinstance(df_comparison_vectors, SplinkDataFrame):
+            physical_name = df_comparison_vectors.physical_name
+        else:
+            physical_name = df_comparison_vectors
+        # The predict sql reads from the templated name of the comparison vectors
+        df_comparison_vectors = self._table_to_splink_dataframe(
+            "__splink__df_comparison_vectors", physical_name
+        )
+
+        return self._predict_from_comparison_vectors(
+            [df_comparison_vectors],
+            threshold_match_probability,
+            threshold_match_weight,
+            compact_output,
+        )
+
+    def rejoin_record_values(
+        self,
+        df_predict: SplinkDataFrame,
+        where_condition: str = None,
+        limit: int = None,
+    ) -> SplinkDataFrame:
+        """Add the values of the left and right records to pairwise predictions,
+        such as those output by `linker.predict(compact_output=True)`.
+
+        The values are joined only to the predictions matching `where_condition`
+        (and at most `limit` of them), so a small number of predictions can be
+        inspected without storing the record values for every prediction.
+
+        Examples:
+            >>> df_predict = linker.predict(compact_output=True)
+            >>> df_inspect = linker.rejoin_record_values(
+            >>>     df_predict, where_condition="match_weight > 10", limit=100
+            >>> )
+            >>> df_inspect.as_pandas_dataframe()
+
+        Args:
+            df_predict (SplinkDataFrame): Pairwise predictions, containing the
+                unique id columns of the left and right records.
+            where_condition (str, optional): A SQL condition selecting the
+                predictions to which record values are added. Defaults to None.
+            limit (int, optional): The maximum number of predictions to return.
+                Defaults to None.
+
+        Returns:
+            SplinkDataFrame: The selected predictions, with a `_l` and `_r` column
+                for each column of the input data.
+        """
+
+        concat_with_tf = self._initialise_df_concat_with_tf()
+
+        uid_cols = self._settings_obj._unique_id_input_columns
+        uid_names = {c.unquote().name() for c in uid_cols}
+        record_cols = [
+            c
+            for c in concat_with_tf.columns
+            if c.unquote().name() not in uid_names
+            and c.unquote().name() != "__splink_salt"
+        ]
+
+        select_cols = ["p.*"]
+        for c in record_cols:
+            select_cols.extend(c.l_r_names_as_l_r())
+        select_cols_expr = ", ".join(select_cols)
+
+        join_l = " and ".join(f"p.{c.name_l()} = l.{c.name()}" for c in uid_cols)
+        join_r = " and ".join(f"p.{c.name_r()} = r.{c.name()}" for c in uid_cols)
+
+        where_sql = f"where {where_condition}" if where_condition else ""
+        limit_sql = f"limit {limit}" if limit is not None else ""
+
+        sql = f"""
+        select *
+        from {df_predict.physical_name}
+        {where_sql}
+        {limit_sql}
+        """
+        self._enqueue_sql(sql, "__splink__df_predict_selected")
+
+        sql = f"""
+        select {select_cols_expr}
+        from __splink__df_predict_selected as p
+        left join {concat_with_tf.physical_name} as l
+        on {join_l}
+        left join {concat_with_tf.physical_name} as r
+        on {join_r}
+        """
+        self._enqueue_sql(sql, "__splink__df_predict_with_record_values")
+
+        return self._execute_sql_pipeline()
+
     def find_matches_to_new_records(
         self,
         records_or_tablename,
@@ -1543,19 +1922,45 @@ class Linker:
             SplinkDataFrame: The pairwise comparisons.
         """
 
-        original_blocking_rules = (
-            self._settings_obj._blocking_rules_to_generate_predictions
-        )
-        original_link_type = self._settings_obj._link_type
-
         if not isinstance(records_or_tablename, str):
             uid = ascii_uid(8)
-            self.register_table(
-                records_or_tablename, f"__splink__df_new_records_{uid}", overwrite=True
-            )
             new_records_tablename = f"__splink__df_new_records_{uid}"
+            df_new_records = self.register_table(
+                records_or_tablename, new_records_tablename, overwrite=True
+            )
         else:
             new_records_tablename = records_or_tablename
+            df_new_records = None
+
+        input_dfs = self._enqueue_find_matches_to_new_records_sqls(
+            new_records_tablename, blocking_rules, match_weight_threshold
+        )
+
+        try:
+            predictions = self._execute_sql_pipeline(
+                input_dataframes=input_dfs, use_cache=False
+            )
+        finally:
+            # The records registered by this method are no longer needed
+            if df_new_records is not None:
+                df_new_records.drop_table_from_database()
+
+        return predictions
+
+    def _enqueue_find_matches_to_new_records_sqls(
+        self,
+        new_records_tablename: str,
+        blocking_rules: list,
+        match_weight_threshold: float,
+    ) -> list[SplinkDataFrame]:
+        """Enqueue the sql to find and score matches between the records in
+        `new_records_tablename` and the input dataset(s), returning the input
+        dataframes needed to execute it"""
+
+        original_blocking_rules = (
+            self._settings_obj._blocking_rules_to_generate_predictions
+        )
+        original_link_type = self._settings_obj._link_type
 
         cache = self._intermediate_table_cache
         input_dfs = []
@@ -1590,41 +1995,115 @@ class Linker:
         self._settings_obj._link_type = "link_only_find_matches_to_new_records"
         self._find_new_matches_mode = True
 
-        sql = _join_tf_to_input_df_sql(self)
-        sql = sql.replace("__splink__df_concat", new_records_tablename)
-        self._enqueue_sql(sql, "__splink__df_new_records_with_tf")
+        try:
+            sql = _join_tf_to_input_df_sql(self)
+            sql = sql.replace("__splink__df_concat", new_records_tablename)
+            self._enqueue_sql(sql, "__splink__df_new_records_with_tf")
 
-        sql = block_using_rules_sql(self)
-        self._enqueue_sql(sql, "__splink__df_blocked")
+            sql = block_using_rules_sql(self)
+            self._enqueue_sql(sql, "__splink__df_blocked")
 
-        sql = compute_comparison_vector_values_sql(self._settings_obj)
-        self._enqueue_sql(sql, "__splink__df_comparison_vectors")
+            sql = compute_comparison_vector_values_sql(self._settings_obj)
+            self._enqueue_sql(sql, "__splink__df_comparison_vectors")
 
-        sqls = predict_from_comparison_vectors_sqls(
-            self._settings_obj,
-            sql_infinity_expression=self._infinity_expression,
-        )
-        for sql in sqls:
-            self._enqueue_sql(sql["sql"], sql["output_table_name"])
+            sqls = predict_from_comparison_vectors_sqls(
+                self._settings_obj,
+                sql_infinity_expression=self._infinity_expression,
+            )
+            for sql in sqls:
+                self._enqueue_sql(sql["sql"], sql["output_table_name"])
 
-        sql = f"""
-        select * from __splink__df_predict
-        where match_weight > {match_weight_threshold}
+            sql = f"""
+            select * from __splink__df_predict
+            where match_weight > {match_weight_threshold}
+            """
+
+            self._enqueue_sql(sql, "__splink__find_matches_predictions")
+        finally:
+            self._settings_obj._blocking_rules_to_generate_predictions = (
+                original_blocking_rules
+            )
+            self._settings_obj._link_type = original_link_type
+            self._find_new_matches_mode = False
+
+        return input_dfs
+
+    def realtime_matcher(
+        self,
+        blocking_rules=[],
+        match_weight_threshold=-4,
+    ) -> RealtimeMatcher:
+        """Create a matcher which repeatedly finds records in the input dataset(s)
+        which match new records, with less overhead per lookup than
+        `linker.find_matches_to_new_records()`.
+
+        The SQL is generated once, the tables which are searched are materialised
+        and pinned in the cache, and each lookup reuses the same staging and
+        output tables, which are dropped when the matcher is closed.
+
+        Examples:
+            >>> linker = DuckDBLinker(df)
+            >>> linker.load_settings("saved_settings.json")
+            >>> with linker.realtime_matcher(["l.surname = r.surname"]) as matcher:
+            >>>     for record in records:
+            >>>         matches = matcher.find_matches([record]).as_record_dict()
+
+        Args:
+            blocking_rules (list, optional): Blocking rules to select
+                which records to find and score. If [], do not use a blocking
+                rule - meaning the new records will be compared to all records
+                provided to the linker when it was instantiated. Defaults to [].
+            match_weight_threshold (int, optional): Return matches with a match weight
+                above this threshold. Defaults to -4.
+
+        Returns:
+            RealtimeMatcher: An object whose `find_matches(records)` method returns
+                the scored matches to the records as a SplinkDataFrame.
         """
+        return RealtimeMatcher(self, blocking_rules, match_weight_threshold)
 
-        self._enqueue_sql(sql, "__splink__find_matches_predictions")
+    def in_memory_matcher(
+        self,
+        blocking_rules=[],
+        match_weight_threshold=-4,
+        functions: dict = None,
+    ) -> InMemoryMatcher:
+        """Create a matcher which finds and scores matches to new records in Python,
+        using an in-memory index of the input dataset(s), without executing SQL
+        against the backend for each lookup.
 
-        predictions = self._execute_sql_pipeline(
-            input_dataframes=input_dfs, use_cache=False
-        )
+        The input records are read into memory once, and indexed by the values
+        of the equality conditions in the blocking rules (e.g. the surname in
+        `l.surname = r.surname`).  Finding matches to a new record is then a
+        dict lookup of the candidate records, which are scored using
+        `linker.compile_scorer()`.  This gives low and predictable latency, at
+        the cost of holding the input records in memory.
 
-        self._settings_obj._blocking_rules_to_generate_predictions = (
-            original_blocking_rules
-        )
-        self._settings_obj._link_type = original_link_type
-        self._find_new_matches_mode = False
+        Each blocking rule must contain at least one such equality.
 
-        return predictions
+        Examples:
+            >>> linker = DuckDBLinker(df)
+            >>> linker.load_settings("saved_settings.json")
+            >>> matcher = linker.in_memory_matcher(
+            >>>     ["l.surname = r.surname", "l.dob = r.dob"]
+            >>> )
+            >>> matcher.find_matches(record)
+
+        Args:
+            blocking_rules (list, optional): Blocking rules to select
+                which records to find and score. If [], do not use a blocking
+                rule - meaning the new records will be compared to all records
+                provided to the linker when it was instantiated. Defaults to [].
+            match_weight_threshold (int, optional): Return matches with a match weight
+                above this threshold. Defaults to -4.
+            functions (dict, optional): Python implementations of SQL functions,
+                as for `linker.compile_scorer()`. Defaults to None.
+
+        Returns:
+            InMemoryMatcher: An object whose `find_matches(records)` method returns
+                the scored matches to the records as a list of dicts.
+        """
+        return InMemoryMatcher(self, blocking_rules, match_weight_threshold, functions)
 
     def compare_two_records(self, record_1: dict, record_2: dict):
         """Use the linkage model to compare and score a pairwise record comparison
@@ -1701,6 +2180,145 @@ class Linker:
 
         return predictions
 
+    def compare_record_pairs(
+        self,
+        record_pairs,
+        threshold_match_probability: float = None,
+        threshold_match_weight: float = None,
+    ) -> SplinkDataFrame:
+        """Use the linkage model to score a table of explicit pairwise record
+        comparisons, e.g. from a clerical review queue, in a single query.
+
+        Each row of `record_pairs` contains the left and right records of a pair,
+        with the columns of the input data suffixed with `_l` and `_r`, as in the
+        output of `linker.predict()`.  This includes the unique id columns, and,
+        if the link type is not `dedupe_only`, the source dataset columns.  Term
+        frequencies are computed from the input data, or read from the cache.
+
+        Examples:
+            >>> df_pairs = pd.DataFrame([
+            >>>     {"unique_id_l": 1, "first_name_l": "John", ...,
+            >>>      "unique_id_r": 2, "first_name_r": "Jon", ...},
+            >>> ])
+            >>> linker.compare_record_pairs(df_pairs).as_pandas_dataframe()
+
+        Args:
+            record_pairs: The record pairs to score, as any input accepted by
+                `linker.register_table()`, a SplinkDataFrame, or the name of a
+                table in the database.
+            threshold_match_probability (float, optional): If specified,
+                filter the results to include only pairwise comparisons with a
+                match_probability above this threshold. Defaults to None.
+            threshold_match_weight (float, optional): If specified,
+                filter the results to include only pairwise comparisons with a
+                match_weight above this threshold. Defaults to None.
+
+        Returns:
+            SplinkDataFrame: The scored pairwise comparisons, with the same columns
+                as the output of `linker.predict()`.
+        """
+        df_registered = None
+        if isinstance(record_pairs, SplinkDataFrame):
+            record_pairs_tablename = record_pairs.physical_name
+        elif isinstance(record_pairs, str):
+            record_pairs_tablename = record_pairs
+        else:
+            record_pairs_tablename = f"__splink__df_record_pairs_{ascii_uid(8)}"
+            df_registered = self.register_table(
+                record_pairs, record_pairs_tablename, overwrite=True
+            )
+
+        input_dfs = [
+            self._table_to_splink_dataframe(
+                "__splink__df_record_pairs", record_pairs_tablename
+            )
+        ]
+
+        # Join the term frequencies of the left and right records
+        select_cols = ["p.*"]
+        left_joins = []
+        for i, col in enumerate(self._settings_obj._term_frequency_columns):
+            input_dfs.append(self.compute_tf_table(col.unquote().name()))
+            tbl = colname_to_tf_tablename(col)
+            for side, tf_name in [("l", col.tf_name_l()), ("r", col.tf_name_r())]:
+                alias = f"tf_{side}_{i}"
+                select_cols.append(f"{alias}.{col.tf_name()} as {tf_name}")
+                name = col.name_l() if side == "l" else col.name_r()
+                left_joins.append(
+                    f"left join {tbl} as {alias} on p.{name} = {alias}.{col.name()}"
+                )
+
+        sql = f"""
+        select {", ".join(select_cols)}
+        from __splink__df_record_pairs as p
+        {" ".join(left_joins)}
+        """
+        self._enqueue_sql(sql, "__splink__df_blocked")
+
+        # The pairs do not arise from blocking rules, so have no match_key
+        original_blocking_rules = (
+            self._settings_obj._blocking_rules_to_generate_predictions
+        )
+        self._settings_obj._blocking_rules_to_generate_predictions = []
+        try:
+            sql = compute_comparison_vector_values_sql(self._settings_obj)
+            self._enqueue_sql(sql, "__splink__df_comparison_vectors")
+
+            if self._predict_using_match_weight_lookup:
+                df_comparison_vectors = self._execute_sql_pipeline(input_dfs)
+                input_dfs = [df_comparison_vectors]
+
+            predictions = self._predict_from_comparison_vectors(
+                input_dfs, threshold_match_probability, threshold_match_weight
+            )
+        finally:
+            self._settings_obj._blocking_rules_to_generate_predictions = (
+                original_blocking_rules
+            )
+            self._pipeline.reset()
+            if df_registered is not None:
+                df_registered.drop_table_from_database()
+
+        return predictions
+
+    def compile_scorer(self, functions: dict = None) -> CompiledScorer:
+        """Compile the linkage model into a scorer which compares and scores record
+        pairs in Python, without executing SQL against the backend.
+
+        This is much faster than `linker.compare_two_records()` for scoring single
+        record pairs or small batches, e.g. in an online API.  The `sql_condition`
+        of each comparison level is translated into Python, with Python
+        implementations of common functions such as `levenshtein`, `jaro_winkler`
+        and `date_diff`.
+
+        Term frequency tables are computed (or read from the cache) when the
+        scorer is compiled, and held in memory.  The scorer does not change if
+        the model's parameters are subsequently updated.
+
+        Examples:
+            >>> linker = DuckDBLinker(df)
+            >>> linker.load_settings("saved_settings.json")
+            >>> scorer = linker.compile_scorer()
+            >>> scorer.score(record_left, record_right)["match_probability"]
+
+        Args:
+            functions (dict, optional): Python implementations of any SQL functions
+                used in the comparison levels which are not supported, or to
+                override the built in implementations, keyed by the lowercase
+                function name.  Defaults to None.
+
+        Returns:
+            CompiledScorer: An object with `score(record_1, record_2)` and
+                `score_pairs(pairs)` methods returning scores as dicts.
+        """
+        tf_lookups = {}
+        for col in self._settings_obj._term_frequency_columns:
+            col = col.unquote()
+            df_tf = self.compute_tf_table(col.name()).as_record_dict()
+            tf_lookups[col.name()] = {r[col.name()]: r[col.tf_name()] for r in df_tf}
+
+        return CompiledScorer(self._settings_obj, tf_lookups, functions)
+
     def _self_link(self) -> SplinkDataFrame:
         """Use the linkage model to compare and score all records in our input df with
             themselves.
@@ -1767,6 +2385,7 @@ class Linker:
         threshold_match_probability: float,
         pairwise_formatting: bool = False,
         filter_pairwise_format_for_clusters: bool = True,
+        algorithm: str = "label_propagation",
     ) -> SplinkDataFrame:
         """Clusters the pairwise match predictions that result from `linker.predict()`
         into groups of connected record using the connected components graph clustering
@@ -1789,6 +2408,16 @@ class Linker:
             filter_pairwise_format_for_clusters (bool): If pairwise formatting has been
                 selected, whether to output all columns found within linker.predict(),
                 or just return clusters.
+            algorithm (str): The connected components algorithm to use.
+                "label_propagation" solves iteratively in SQL and is available for
+                all backends, but needs as many iterations as the longest path in
+                any cluster.  "star_contraction" also solves iteratively in SQL and
+                is available for all backends, but needs a number of iterations
+                logarithmic in the size of the clusters.  "union_find" streams the
+                edges above the threshold into an in-memory union-find, solving in
+                a single pass. It is available for the DuckDB and SQLite backends,
+                and requires pyarrow.  All give identical cluster ids. Defaults to
+                "label_propagation".
 
         Returns:
             SplinkDataFrame: A SplinkDataFrame containing a list of all IDs, clustered
@@ -1813,10 +2442,74 @@ class Linker:
             concat_with_tf,
             pairwise_formatting,
             filter_pairwise_format_for_clusters,
+            algorithm=algorithm,
         )
 
         return cc
 
+    def update_clusters_from_new_predictions(
+        self,
+        df_clusters: SplinkDataFrame,
+        df_new_predictions: SplinkDataFrame,
+        threshold_match_probability: float,
+        algorithm: str = "label_propagation",
+    ) -> SplinkDataFrame:
+        """Updates an existing clustering with a set of new pairwise predictions,
+        for example from `linker.find_matches_to_new_records()`, without
+        re-clustering all records.
+
+        Only the clusters containing records which appear in the new predictions are
+        re-solved, so the cost scales with the size of the new predictions rather
+        than the size of the existing clusters.  The resultant cluster ids are the
+        same as if all predictions had been clustered at once using
+        `linker.cluster_pairwise_predictions_at_threshold()`.
+
+        The new records must have unique ids which are distinct from those of
+        records in the existing clusters.  New records are only added to the
+        output if they appear in `df_new_predictions`.
+
+        Examples:
+            >>> df_clusters = linker.cluster_pairwise_predictions_at_threshold(
+            >>>     df_predict, 0.95
+            >>> )
+            >>> linker.register_table(df_new_records, "new_records")
+            >>> df_new_predictions = linker.find_matches_to_new_records(
+            >>>     "new_records", match_weight_threshold=-5
+            >>> )
+            >>> df_clusters = linker.update_clusters_from_new_predictions(
+            >>>     df_clusters, df_new_predictions, 0.95
+            >>> )
+
+        Args:
+            df_clusters (SplinkDataFrame): The existing clusters, with a
+                `cluster_id` column along with the unique id columns (e.g.
+                `unique_id`, and `source_dataset` for link jobs) such as the output
+                of `linker.cluster_pairwise_predictions_at_threshold()` or of a
+                previous call to this method.
+            df_new_predictions (SplinkDataFrame): New pairwise predictions,
+                including a `match_probability` column.
+            threshold_match_probability (float): Pairwise predictions with a
+                `match_probability` at or above this threshold are considered to be
+                a match.
+            algorithm (str): The connected components algorithm to use to solve
+                the affected clusters. See
+                `linker.cluster_pairwise_predictions_at_threshold()`. Defaults to
+                "label_propagation".
+
+        Returns:
+            SplinkDataFrame: A SplinkDataFrame with a `cluster_id` and the unique
+                id columns for all records in `df_clusters` and
+                `df_new_predictions`.
+        """
+
+        return update_clusters_from_new_predictions(
+            self,
+            df_clusters,
+            df_new_predictions,
+            threshold_match_probability,
+            algorithm=algorithm,
+        )
+
     def profile_columns(
         self, column_expressions: str | list[str], top_n=10, bottom_n=10
     ):
@@ -2467,6 +3160,11 @@ class Linker:
         """Compute the number of pairwise record comparisons that would be generated by
         a blocking rule
 
+        Where the blocking rule is an equi-join, such as
+        `l.first_name = r.first_name and substr(l.dob,1,4) = substr(r.dob,1,4)`, the
+        count is computed from the number of records sharing each value of the
+        blocking key, without executing the join.
+
         Args:
             blocking_rule (str): The blocking rule to analyse
             link_type (str, optional): The link type.  This is needed only if the
@@ -2491,6 +3189,16 @@ class Linker:
         sql = vertically_concatenate_sql(self)
         self._enqueue_sql(sql, "__splink__df_concat")
 
+        # Where the rule is an equi-join, count the comparisons from the number of
+        # records sharing each key, which avoids executing the join
+        key_expressions = _equi_join_key_expressions(blocking_rule, self._sql_dialect)
+        if key_expressions:
+            keys = [k.sql(dialect=self._sql_dialect) for k in key_expressions]
+            sql = number_of_ordered_pairs_from_blocking_key_counts_sql(self, keys)
+            self._enqueue_sql(sql, "__splink__analyse_blocking_rule")
+            res = self._execute_sql_pipeline().as_record_dict()[0]
+            return int(res["num_ordered_pairs"] or 0) // 2
+
         sql = number_of_comparisons_generated_by_blocking_rule_sql(self, blocking_rule)
         self._enqueue_sql(sql, "__splink__analyse_blocking_rule")
         res = self._execute_sql_pipeline().as_record_dict()[0]
@@ -2540,6 +3248,55 @@ class Linker:
 
         return records
 
+    def blocking_key_skew_records(
+        self,
+        blocking_rules: str or list = None,
+        top_n: int = 10,
+    ):
+        """For each blocking rule, find the values of the blocking key which
+        generate the most comparisons, and the share of the rule's comparisons they
+        account for.
+
+        A small number of very common key values, such as a common surname or a
+        placeholder like 'unknown', can dominate the comparisons generated by a
+        blocking rule, and on distributed backends the work for each key value is
+        done by a single task.
+
+        The counts are computed from the number of records sharing each key value,
+        without executing the blocking join.  Where a rule contains conditions other
+        than equalities, such as `levenshtein(l.surname, r.surname) < 2`, the counts
+        are of the pairs sharing the key of the equalities, before the other
+        conditions are applied.  Rules with no equalities are skipped.
+
+        Args:
+            blocking_rules (str or list): The blocking rule(s) to analyse. If null,
+                the rules set out in your settings object will be used.
+            top_n (int, optional): The number of key values to report for each
+                rule. Defaults to 10.
+
+        Examples:
+            >>> linker = DuckDBLinker(df, settings)
+            >>> records = linker.blocking_key_skew_records(
+            >>>     ["l.surname = r.surname", "l.city = r.city"], top_n=5
+            >>> )
+            >>> pd.DataFrame(records)
+
+        Returns:
+            list: A list of records, one for each of the top key values of each
+                rule, with the number of records sharing the key value, the number
+                of comparisons it generates and the proportion of the rule's
+                comparisons this represents.
+        """
+        if blocking_rules:
+            blocking_rules = ensure_is_list(blocking_rules)
+        else:
+            blocking_rules = [
+                br.blocking_rule
+                for br in self._settings_obj._blocking_rules_to_generate_predictions
+            ]
+
+        return blocking_key_skew_records(self, blocking_rules, top_n=top_n)
+
     def cumulative_num_comparisons_from_blocking_rules_chart(
         self,
         blocking_rules: str or list = None,
@@ -2855,18 +3612,99 @@ class Linker:
         # whether a table already exists with the name of the output table
 
         # This function has the effect of changing the names of the output tables
-        # to include a different unique id
-
-        # As a result, any previously cached tables will not be found
+        # to include a different unique id.  As a result, any previously cached
+        # tables will not be found
+        previous_cache_uid = self._cache_uid
         self._cache_uid = ascii_uid(8)
-
-        # As a result, any previously cached tables will not be found
         self._intermediate_table_cache.invalidate_cache()
 
+        # The tables written to the on-disk cache with the previous unique id can
+        # no longer be found either, so remove them, and fingerprint the input
+        # data again
+        if self._persistent_cache is not None:
+            self._persistent_cache.clear(cache_uid=previous_cache_uid)
+            self._input_fingerprint = input_fingerprint(self)
+
         # Also drop any existing splink tables from the database
         # Note, this is not actually necessary, it's just good housekeeping
         self._delete_tables_created_by_splink_from_db()
 
+    def set_cache_size_limit(
+        self,
+        max_size_bytes: int | None,
+        pinned_templated_names: list[str] = None,
+    ):
+        """Limit the total size of the intermediate tables which Splink keeps in
+        its cache.
+
+        Once the estimated size of the cached tables exceeds `max_size_bytes`, the
+        least recently used tables are removed from the cache and dropped from the
+        database.  This allows long-running sessions, for example with an in-memory
+        DuckDB database, to train and compare several models without running out
+        of memory.  Dropped tables are recomputed if they are needed again.
+
+        Examples:
+            >>> linker = DuckDBLinker(df, settings)
+            >>> # Keep at most 2GB of intermediate tables
+            >>> linker.set_cache_size_limit(2e9)
+
+        Args:
+            max_size_bytes (int): The maximum estimated size of the cached tables,
+                in bytes.  None removes the limit.
+            pinned_templated_names (list[str], optional): Templated names of tables
+                which are never evicted. Defaults to None, meaning only
+                `__splink__df_concat_with_tf` is pinned.
+        """
+        cache = self._intermediate_table_cache
+        if pinned_templated_names is not None:
+            cache.pinned_templated_names = set(pinned_templated_names)
+        cache.set_max_size_bytes(max_size_bytes)
+
+    def enable_persistent_cache(
+        self,
+        cache_dir: str,
+        max_size_bytes: int = None,
+        templated_names: list[str] = None,
+    ):
+        """Persist expensive intermediate tables to Parquet files in `cache_dir`, so
+        that they can be reused by later Linker sessions rather than recomputed.
+
+        By default, `__splink__df_concat_with_tf`, term frequency tables and
+        comparison vectors are persisted.  Cached tables are keyed by a hash of the
+        SQL which created them, the `linker_uid` in the settings, and a fingerprint
+        of the input data, so to reuse tables across sessions the same
+        `linker_uid` must be used (e.g. by loading a saved model).  The fingerprint
+        consists of the size and modification time of input files, and the row
+        count and a checksum of other input tables, which are computed when this
+        method is called.  `linker.invalidate_cache()` removes the tables written
+        by this linker from the on-disk cache.
+
+        Examples:
+            >>> settings["linker_uid"] = "nightly_run"
+            >>> linker = DuckDBLinker(df, settings)
+            >>> linker.enable_persistent_cache("splink_cache/", max_size_bytes=10e9)
+            >>> # Reuses tables written by a previous run, if they exist
+            >>> linker.predict()
+
+        Args:
+            cache_dir (str): Directory in which to store the cached tables.  Created
+                if it does not exist.
+            max_size_bytes (int, optional): If provided, the least recently used
+                tables are evicted from the cache once its total size exceeds this
+                number of bytes.  Defaults to None, meaning no limit.
+            templated_names (list[str], optional): Templated names, or prefixes of
+                templated names, of the tables to persist. Defaults to None,
+                meaning the tables listed above.
+        """
+        kwargs = {}
+        if templated_names is not None:
+            kwargs["templated_names"] = tuple(templated_names)
+
+        self._persistent_cache = PersistentTableCache(
+            cache_dir, max_size_bytes=max_size_bytes, **kwargs
+        )
+        self._input_fingerprint = input_fingerprint(self)
+
     def register_table_input_nodes_concat_with_tf(self, input_data, overwrite=False):
         """Register a pre-computed version of the input_nodes_concat_with_tf table that
         you want to re-use e.g. that you created in a previous run
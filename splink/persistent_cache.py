@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .splink_dataframe import SplinkDataFrame
+
+# https://stackoverflow.com/questions/39740632/python-type-hinting-without-cyclic-imports
+if TYPE_CHECKING:
+    from .linker import Linker
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+
+# Templated names (or prefixes of templated names) of the tables which are
+# expensive to compute and worth persisting between sessions
+DEFAULT_PERSISTED_TEMPLATED_NAMES = (
+    "__splink__df_concat_with_tf",
+    "__splink__df_tf_",
+    "__splink__df_comparison_vectors",
+)
+
+
+# Input tables read directly from files by the DuckDB linker
+_FILE_READ_PATTERN = re.compile(r"read_(?:csv_auto|parquet)\('([^']*)'")
+
+
+def _files_fingerprint(path_pattern: str) -> list:
+    paths = sorted(glob.glob(path_pattern, recursive=True))
+    return [[p, os.stat(p).st_size, os.stat(p).st_mtime_ns] for p in paths]
+
+
+def _python_row_checksum(splink_dataframe: SplinkDataFrame) -> str | None:
+    """A checksum of the rows of the table computed in Python, for backends which
+    cannot hash rows in SQL, or None if the rows cannot be streamed"""
+    try:
+        import pandas as pd
+
+        checksum = np.uint64(0)
+        for batch in splink_dataframe.iter_batches():
+            row_hashes = pd.util.hash_pandas_object(batch.to_pandas(), index=False)
+            # The sum wraps around, and is independent of the order of the rows
+            with np.errstate(over="ignore"):
+                checksum += row_hashes.to_numpy().sum(dtype="uint64")
+    except (ImportError, NotImplementedError):
+        return None
+    return str(checksum)
+
+
+def _table_fingerprint(linker: Linker, splink_dataframe: SplinkDataFrame) -> list:
+    columns = [c.name() for c in splink_dataframe.columns]
+    aggregates = ["count(*) as row_count"]
+    try:
+        row_hash = linker._hash_columns_sql(columns)
+        aggregates.append(f"sum({row_hash} % 2147483647) as checksum")
+        sql_checksum = True
+    except NotImplementedError:
+        sql_checksum = False
+
+    sql = f"select {', '.join(aggregates)} from {splink_dataframe.physical_name}"
+    values = [str(v) for v in linker.query_sql(sql).iloc[0].tolist()]
+
+    if not sql_checksum:
+        checksum = _python_row_checksum(splink_dataframe)
+        if checksum is None:
+            logger.warning(
+                f"Unable to compute a checksum of the rows of input table "
+                f"{splink_dataframe.templated_name}, so changes to its values which "
+                "do not change its number of rows will not be detected by the "
+                "on-disk cache. Call linker.invalidate_cache() if the data changes."
+            )
+        values.append(checksum)
+
+    return [splink_dataframe.physical_name, columns, values]
+
+
+def input_fingerprint(linker: Linker) -> str:
+    """A hash of the contents of the linker's input tables, so that cached tables
+    are not reused once the input data changes.
+
+    Input files are identified by their paths, sizes and modification times.
+    Other tables are identified by their columns, row count and a checksum of
+    their rows, computed in SQL where the backend can hash rows, and otherwise
+    by streaming the rows into Python.
+    """
+    parts = []
+    for splink_dataframe in linker._input_tables_dict.values():
+        match = _FILE_READ_PATTERN.match(splink_dataframe.physical_name)
+        if match:
+            parts.append(_files_fingerprint(match.group(1)))
+        else:
+            parts.append(_table_fingerprint(linker, splink_dataframe))
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def _size_on_disk(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return path.stat().st_size
+
+
+def _remove_from_disk(path: Path):
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    elif path.exists():
+        path.unlink()
+
+
+class PersistentTableCache:
+    """A content-addressed cache of Splink's intermediate tables, stored as Parquet
+    in a directory on disk so that they survive between Linker sessions.
+
+    Each entry is keyed by the SHA-256 of the SQL that created it, the linker's
+    `_cache_uid` and a fingerprint of the contents of the input tables (see
+    `input_fingerprint`).  A manifest records the size, last access time and
+    `_cache_uid` of each entry, and the least recently used entries are evicted
+    once the cache exceeds `max_size_bytes`.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        max_size_bytes: int = None,
+        templated_names: tuple[str] = DEFAULT_PERSISTED_TEMPLATED_NAMES,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_bytes
+        self.templated_names = tuple(templated_names)
+        self._manifest = self._read_manifest()
+
+    @property
+    def _manifest_path(self) -> Path:
+        return self.cache_dir / MANIFEST_FILENAME
+
+    def _read_manifest(self) -> dict:
+        if not self._manifest_path.exists():
+            return {}
+        try:
+            with open(self._manifest_path, "r") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError):
+            logger.warning(
+                f"Unable to read the cache manifest at {self._manifest_path}, "
+                "the on-disk cache will be rebuilt"
+            )
+            return {}
+
+    def _write_manifest(self):
+        tmp_path = self._manifest_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._manifest, f, indent=4)
+        os.replace(tmp_path, self._manifest_path)
+
+    def should_persist(self, templated_name: str) -> bool:
+        return templated_name.startswith(self.templated_names)
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(entry["size_bytes"] for entry in self._manifest.values())
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.parquet"
+
+    def get(self, key: str) -> Path | None:
+        """Return the path of the cached table with this key, or None if the table
+        is not in the cache"""
+        entry = self._manifest.get(key)
+        if entry is None:
+            return None
+
+        path = self._path(key)
+        if not path.exists():
+            del self._manifest[key]
+            self._write_manifest()
+            return None
+
+        entry["last_accessed"] = time.time()
+        self._write_manifest()
+        return path
+
+    def put(self, key: str, splink_dataframe: SplinkDataFrame, cache_uid: str = None):
+        """Write `splink_dataframe` to the cache, evicting least recently used
+        entries if the cache is now over its size budget"""
+        path = self._path(key)
+        tmp_path = self.cache_dir / f"{key}.parquet.tmp"
+        _remove_from_disk(tmp_path)
+
+        splink_dataframe.to_parquet(str(tmp_path), overwrite=True)
+        _remove_from_disk(path)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        self._manifest[key] = {
+            "templated_name": splink_dataframe.templated_name,
+            "cache_uid": cache_uid,
+            "size_bytes": _size_on_disk(path),
+            "created": now,
+            "last_accessed": now,
+        }
+        logger.debug(
+            f"Persisted {splink_dataframe.templated_name} to on-disk cache at {path}"
+        )
+        self._evict(protected_key=key)
+        self._write_manifest()
+
+    def _evict(self, protected_key: str = None):
+        if self.max_size_bytes is None:
+            return
+
+        by_last_accessed = sorted(
+            self._manifest.items(), key=lambda item: item[1]["last_accessed"]
+        )
+        total = self.size_bytes
+        for key, entry in by_last_accessed:
+            if total <= self.max_size_bytes:
+                break
+            if key == protected_key:
+                continue
+            logger.debug(
+                f"Evicting {entry['templated_name']} ({key}) from on-disk cache"
+            )
+            _remove_from_disk(self._path(key))
+            del self._manifest[key]
+            total -= entry["size_bytes"]
+
+    def clear(self, cache_uid: str = None):
+        """Remove the cached tables written by linkers with the given `_cache_uid`,
+        or all cached tables if `cache_uid` is None"""
+        for key, entry in list(self._manifest.items()):
+            if cache_uid is None or entry.get("cache_uid") == cache_uid:
+                _remove_from_disk(self._path(key))
+                del self._manifest[key]
+        self._write_manifest()
@@ -2,12 +2,146 @@ from __future__ import annotations
 
 # This is otherwise known as the expectation step of the EM algorithm.
 import logging
+import math
 
-from .misc import prob_to_bayes_factor, prob_to_match_weight
+import sqlglot
+from sqlglot import exp
+
+from .comparison import Comparison
+from .comparison_vector_values import unpack_comparison_vectors_sql
+from .constants import PACKED_COMPARISON_VECTOR
+from .misc import dedupe_preserving_order, prob_to_bayes_factor, prob_to_match_weight
 from .settings import Settings
 
 logger = logging.getLogger(__name__)
 
+# Functions which are cheap relative to string distance functions
+# such as `levenshtein` or `jaro_winkler`
+_CHEAP_FUNCTIONS = (
+    exp.Abs,
+    exp.Cast,
+    exp.Coalesce,
+    exp.Length,
+    exp.Lower,
+    exp.Substring,
+    exp.Trim,
+    exp.Upper,
+)
+_CHEAP_ANONYMOUS_FUNCTIONS = {"substr", "substring", "left", "right", "lower", "upper"}
+
+
+def _threshold_as_match_weight(threshold_match_probability, threshold_match_weight):
+    # In case user provided both, take the minimum of the two thresholds
+    if threshold_match_probability is not None:
+        thres_prob_as_weight = prob_to_match_weight(threshold_match_probability)
+    else:
+        thres_prob_as_weight = None
+    if threshold_match_probability or threshold_match_weight:
+        thresholds = [
+            thres_prob_as_weight,
+            threshold_match_weight,
+        ]
+        return max([t for t in thresholds if t is not None])
+    return None
+
+
+def _comparison_is_cheap(comparison: Comparison):
+    """Whether the comparison levels of a comparison can be evaluated without
+    calling functions more expensive than simple string manipulation"""
+    for cl in comparison.comparison_levels:
+        if cl._is_else_level:
+            continue
+        dialect = cl._sql_dialect or "spark"
+        tree = sqlglot.parse_one(cl.sql_condition, read=dialect)
+        for fn in tree.find_all(exp.Func):
+            if isinstance(fn, _CHEAP_FUNCTIONS):
+                continue
+            if (
+                isinstance(fn, exp.Anonymous)
+                and fn.name.lower() in _CHEAP_ANONYMOUS_FUNCTIONS
+            ):
+                continue
+            return False
+    return True
+
+
+def match_weight_upper_bound_filter_sql(
+    settings_obj: Settings,
+    threshold_match_probability=None,
+    threshold_match_weight=None,
+    input_tablename="__splink__df_blocked_before_threshold",
+):
+    """Discard blocked pairs whose match weight cannot reach the threshold, before
+    the comparison vectors are computed.
+
+    The Bayes factors of cheap comparisons, such as exact matches, are evaluated
+    in full.  The Bayes factors of expensive comparisons, such as those using
+    string distance functions, are bounded above by that of their most
+    favourable level.  Only the remaining pairs go on to have the expensive
+    functions evaluated.
+
+    Returns None if no threshold is set or no useful bound can be computed,
+    for example because a Bayes factor is infinite.
+    """
+
+    threshold = _threshold_as_match_weight(
+        threshold_match_probability, threshold_match_weight
+    )
+    if threshold is None:
+        return None
+
+    prior = settings_obj._probability_two_random_records_match
+    if prior == 1.0:
+        return None
+
+    bayes_factors = [
+        cl._bayes_factor
+        for cc in settings_obj.comparisons
+        for cl in cc.comparison_levels
+    ]
+    if any(bf is None or math.isinf(bf) for bf in bayes_factors):
+        return None
+
+    cheap = [cc for cc in settings_obj.comparisons if _comparison_is_cheap(cc)]
+    if not cheap:
+        return None
+
+    factors = [f"cast({prob_to_bayes_factor(prior)} as double)"]
+    for cc in settings_obj.comparisons:
+        if cc in cheap:
+            # Evaluate the Bayes factor of the pair's level
+            whens = []
+            for cl in cc.comparison_levels:
+                bf = f"cast({cl._bayes_factor} as double)"
+                if cl._has_tf_adjustments:
+                    bf = f"{bf} * {cl._tf_adjustment_expression_sql}"
+                if cl._is_else_level:
+                    whens.append(f"ELSE {bf}")
+                else:
+                    whens.append(f"WHEN {cl.sql_condition} THEN {bf}")
+            factors.append(f"(CASE {' '.join(whens)} END)")
+        elif cc._has_tf_adjustments:
+            # The sum of the levels' adjusted Bayes factors is at least the largest
+            bfs = [
+                f"cast({cl._bayes_factor} as double) * "
+                f"{cl._tf_adjustment_expression_sql}"
+                for cl in cc.comparison_levels
+            ]
+            factors.append(f"({' + '.join(bfs)})")
+        else:
+            max_bf = max(cl._bayes_factor for cl in cc.comparison_levels)
+            factors.append(f"cast({max_bf} as double)")
+
+    # Allow for rounding error in the product of the Bayes factors
+    threshold_bf = 2**threshold * (1 - 1e-9)
+
+    sql = f"""
+    select *
+    from {input_tablename}
+    where {" * ".join(factors)} >= cast({threshold_bf} as double)
+    """
+    return sql
+
 
 def predict_from_comparison_vectors_sqls(
     settings_obj: Settings,
@@ -15,9 +149,21 @@ def predict_from_comparison_vectors_sqls(
     threshold_match_weight=None,
     include_clerical_match_score=False,
     sql_infinity_expression="'infinity'",
+    compact_output=False,
 ) -> list[dict]:
     sqls = []
 
+    comparison_vectors_tablename = "__splink__df_comparison_vectors"
+    if settings_obj._pack_comparison_vectors:
+        sql = unpack_comparison_vectors_sql(settings_obj, comparison_vectors_tablename)
+        sqls.append(
+            {
+                "sql": sql,
+                "output_table_name": "__splink__df_comparison_vectors_unpacked",
+            }
+        )
+        comparison_vectors_tablename = "__splink__df_comparison_vectors_unpacked"
+
     select_cols = settings_obj._columns_to_select_for_bayes_factor_parts
     select_cols_expr = ",".join(select_cols)
 
@@ -28,7 +174,7 @@ def predict_from_comparison_vectors_sqls(
 
     sql = f"""
     select {select_cols_expr} {clerical_match_score}
-    from __splink__df_comparison_vectors
+    from {comparison_vectors_tablename}
     """
 
     sql = {
@@ -37,12 +183,50 @@ def predict_from_comparison_vectors_sqls(
     }
     sqls.append(sql)
 
-    select_cols = settings_obj._columns_to_select_for_predict
+    if compact_output:
+        select_cols = settings_obj._columns_to_select_for_compact_predict
+    else:
+        select_cols = settings_obj._columns_to_select_for_predict
     select_cols_expr = ",".join(select_cols)
     mult = []
     for cc in settings_obj.comparisons:
         mult.extend(cc._match_weight_columns_to_multiply)
 
+    bayes_factor_expr, match_prob_expr = _bayes_factor_and_match_probability_exprs(
+        settings_obj, mult, sql_infinity_expression
+    )
+
+    threshold = _threshold_as_match_weight(
+        threshold_match_probability, threshold_match_weight
+    )
+    if threshold is not None:
+        threshold_expr = f" where log2({bayes_factor_expr}) >= {threshold} "
+    else:
+        threshold_expr = ""
+
+    sql = f"""
+    select
+    log2({bayes_factor_expr}) as match_weight,
+    {match_prob_expr} as match_probability,
+    {select_cols_expr} {clerical_match_score}
+    from __splink__df_match_weight_parts
+    {threshold_expr}
+    """
+
+    sql = {
+        "sql": sql,
+        "output_table_name": "__splink__df_predict",
+    }
+    sqls.append(sql)
+
+    return sqls
+
+
+def _bayes_factor_and_match_probability_exprs(
+    settings_obj: Settings, mult: list[str], sql_infinity_expression
+):
+    """The overall Bayes factor and match probability of a record pair, from the
+    columns `mult` of Bayes factors to multiply together"""
     probability_two_random_records_match = (
         settings_obj._probability_two_random_records_match
     )
@@ -70,34 +254,145 @@ def predict_from_comparison_vectors_sqls(
             f"ELSE (({bayes_factor_expr})/(1+({bayes_factor_expr}))) END"
         )
 
-    # In case user provided both, take the minimum of the two thresholds
-    if threshold_match_probability is not None:
-        thres_prob_as_weight = prob_to_match_weight(threshold_match_probability)
+    return bayes_factor_expr, match_prob_expr
+
+
+def predict_from_comparison_vectors_using_lookup_sqls(
+    settings_obj: Settings,
+    threshold_match_probability=None,
+    threshold_match_weight=None,
+    include_clerical_match_score=False,
+    sql_infinity_expression="'infinity'",
+    compact_output=False,
+) -> list[dict]:
+    """An alternative to `predict_from_comparison_vectors_sqls` which evaluates
+    the Bayes factor CASE expressions once per distinct comparison vector, rather
+    than once per record pair.
+
+    The match weight of each distinct comparison vector is computed in a small
+    lookup table, which is joined back to the comparison vectors on the gamma
+    columns.  Term frequency adjustments depend on the values in each record pair,
+    so are still computed per pair and added to the looked up match weight.
+    """
+    sqls = []
+
+    gamma_cols = [cc._gamma_column_name for cc in settings_obj.comparisons]
+
+    if settings_obj._pack_comparison_vectors:
+        # Join on the packed comparison vector, and unpack the gamma columns in
+        # the lookup table
+        key_cols = [PACKED_COMPARISON_VECTOR]
+        lookup_key_cols = [f"__splink__lookup_{PACKED_COMPARISON_VECTOR}"]
+        sql = f"""
+        select distinct {PACKED_COMPARISON_VECTOR}
+        from __splink__df_comparison_vectors
+        """
+        sqls.append(
+            {"sql": sql, "output_table_name": "__splink__df_distinct_packed_vectors"}
+        )
+        sql = unpack_comparison_vectors_sql(
+            settings_obj, "__splink__df_distinct_packed_vectors"
+        )
     else:
-        thres_prob_as_weight = None
-    if threshold_match_probability or threshold_match_weight:
-        thresholds = [
-            thres_prob_as_weight,
-            threshold_match_weight,
-        ]
-        threshold = max([t for t in thresholds if t is not None])
-        threshold_expr = f" where log2({bayes_factor_expr}) >= {threshold} "
+        key_cols = gamma_cols
+        lookup_key_cols = [f"__splink__lookup_{g}" for g in gamma_cols]
+        sql = f"""
+        select distinct {", ".join(gamma_cols)}
+        from __splink__df_comparison_vectors
+        """
+    sqls.append(
+        {"sql": sql, "output_table_name": "__splink__df_distinct_comparison_vectors"}
+    )
+
+    bf_cols = []
+    for cc in settings_obj.comparisons:
+        whens = " ".join(cl._bayes_factor_sql for cl in cc.comparison_levels)
+        bf_cols.append(f"CASE {whens} END as {cc._bf_column_name}")
+
+    sql = f"""
+    select {", ".join(dedupe_preserving_order(key_cols + gamma_cols))},
+    {", ".join(bf_cols)}
+    from __splink__df_distinct_comparison_vectors
+    """
+    sqls.append(
+        {
+            "sql": sql,
+            "output_table_name": "__splink__df_comparison_vector_bayes_factors",
+        }
+    )
+
+    mult = [cc._bf_column_name for cc in settings_obj.comparisons]
+    bayes_factor_expr, match_prob_expr = _bayes_factor_and_match_probability_exprs(
+        settings_obj, mult, sql_infinity_expression
+    )
+    lookup_cols = [f"{k} as {lk}" for k, lk in zip(key_cols, lookup_key_cols)]
+    if settings_obj._pack_comparison_vectors:
+        # The comparison vectors have no gamma columns, so take them from the lookup
+        lookup_cols.extend(gamma_cols)
+    sql = f"""
+    select {", ".join(lookup_cols)}, {", ".join(mult)},
+    log2({bayes_factor_expr}) as __splink__lookup_match_weight,
+    {match_prob_expr} as __splink__lookup_match_probability
+    from __splink__df_comparison_vector_bayes_factors
+    """
+    sqls.append({"sql": sql, "output_table_name": "__splink__df_match_weight_lookup"})
+
+    tf_cols = []
+    tf_adj_cols = []
+    for cc in settings_obj.comparisons:
+        if cc._has_tf_adjustments:
+            whens = " ".join(cl._tf_adjustment_sql for cl in cc.comparison_levels)
+            tf_cols.append(f"CASE {whens} END as {cc._bf_tf_adj_column_name}")
+            tf_adj_cols.append(cc._bf_tf_adj_column_name)
+    tf_cols_expr = "".join(f", {c}" for c in tf_cols)
+
+    join_expr = " and ".join(
+        f"cv.{k} = lookup.{lk}" for k, lk in zip(key_cols, lookup_key_cols)
+    )
+    sql = f"""
+    select cv.*, lookup.* {tf_cols_expr}
+    from __splink__df_comparison_vectors as cv
+    left join __splink__df_match_weight_lookup as lookup
+    on {join_expr}
+    """
+    sqls.append({"sql": sql, "output_table_name": "__splink__df_match_weight_parts"})
+
+    if tf_adj_cols:
+        match_weight_expr = (
+            f"(__splink__lookup_match_weight + log2({' * '.join(tf_adj_cols)}))"
+        )
+        match_prob_expr = f"1 / (1 + pow(2, -{match_weight_expr}))"
+    else:
+        match_weight_expr = "__splink__lookup_match_weight"
+        match_prob_expr = "__splink__lookup_match_probability"
+
+    if compact_output:
+        select_cols = settings_obj._columns_to_select_for_compact_predict
+    else:
+        select_cols = settings_obj._columns_to_select_for_predict
+    select_cols_expr = ",".join(select_cols)
+
+    if include_clerical_match_score:
+        clerical_match_score = ", clerical_match_score"
+    else:
+        clerical_match_score = ""
+
+    threshold = _threshold_as_match_weight(
+        threshold_match_probability, threshold_match_weight
+    )
+    if threshold is not None:
+        threshold_expr = f" where {match_weight_expr} >= {threshold} "
     else:
         threshold_expr = ""
 
     sql = f"""
     select
-    log2({bayes_factor_expr}) as match_weight,
+    {match_weight_expr} as match_weight,
     {match_prob_expr} as match_probability,
     {select_cols_expr} {clerical_match_score}
     from __splink__df_match_weight_parts
     {threshold_expr}
     """
-
-    sql = {
-        "sql": sql,
-        "output_table_name": "__splink__df_predict",
-    }
-    sqls.append(sql)
+    sqls.append({"sql": sql, "output_table_name": "__splink__df_predict"})
 
     return sqls
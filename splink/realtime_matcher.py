@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from .misc import ascii_uid
+from .splink_dataframe import SplinkDataFrame
+from .term_frequencies import colname_to_tf_tablename
+
+# https://stackoverflow.com/questions/39740632/python-type-hinting-without-cyclic-imports
+if TYPE_CHECKING:
+    from .linker import Linker
+
+logger = logging.getLogger(__name__)
+
+
+class RealtimeMatcher:
+    """Finds matches to new records in the input dataset(s) of a trained linker,
+    for use where many lookups are made, such as a search service.
+
+    The SQL to find and score matches is generated once, when the matcher is
+    created.  `__splink__df_concat_with_tf` and the term frequency tables are
+    materialised and pinned in the linker's cache, and each lookup writes the new
+    records to the same staging table, and its results to the same output table,
+    so that repeated lookups do not accumulate tables in the database.
+
+    Create using `linker.realtime_matcher()`.  Call `close()`, or use the matcher
+    as a context manager, to drop the staging and output tables.
+
+    The SQL reflects the model's parameters when the matcher was created, so a
+    new matcher should be created if the model is subsequently updated.
+    """
+
+    def __init__(
+        self,
+        linker: Linker,
+        blocking_rules: list = [],
+        match_weight_threshold: float = -4,
+    ):
+        self._linker = linker
+        uid = ascii_uid(8)
+        self._new_records_tablename = f"__splink__df_new_records_{uid}"
+        self._predictions_tablename = f"__splink__find_matches_predictions_{uid}"
+
+        # Each lookup reads these tables, so materialise them now, and prevent
+        # them from being evicted from the cache
+        linker._initialise_df_concat_with_tf(materialise=True)
+        templated_names = ["__splink__df_concat_with_tf"]
+        for col in linker._settings_obj._term_frequency_columns:
+            linker.compute_tf_table(col.unquote().name())
+            templated_names.append(colname_to_tf_tablename(col))
+
+        cache = linker._intermediate_table_cache
+        self._pinned_templated_names = [
+            n for n in templated_names if n not in cache.pinned_templated_names
+        ]
+        cache.pinned_templated_names.update(self._pinned_templated_names)
+
+        input_dfs = linker._enqueue_find_matches_to_new_records_sqls(
+            self._new_records_tablename, blocking_rules, match_weight_threshold
+        )
+        try:
+            self._sql = linker._pipeline._generate_pipeline(input_dfs)
+        finally:
+            linker._pipeline.reset()
+
+    def find_matches(self, records) -> SplinkDataFrame:
+        """Find records in the input dataset(s) which match the given record(s).
+
+        Args:
+            records: Input search record(s) as a list of dicts, or any other
+                input accepted by `linker.register_table()`.
+
+        Returns:
+            SplinkDataFrame: The pairwise comparisons with a match weight above the
+                threshold.  The table is overwritten by the next lookup, so any
+                results which are needed should be read before then, e.g. using
+                `as_record_dict()`.
+        """
+        linker = self._linker
+        linker.register_table(records, self._new_records_tablename, overwrite=True)
+        return linker._execute_sql_against_backend(
+            self._sql,
+            "__splink__find_matches_predictions",
+            self._predictions_tablename,
+        )
+
+    def close(self):
+        """Drop the staging and output tables, and unpin the tables searched by
+        the matcher from the linker's cache"""
+        linker = self._linker
+        for table_name in [self._new_records_tablename, self._predictions_tablename]:
+            linker._delete_table_from_database(table_name)
+
+        cache = linker._intermediate_table_cache
+        cache.pinned_templated_names.difference_update(self._pinned_templated_names)
+        self._pinned_templated_names = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -7,6 +7,7 @@ from .blocking import BlockingRule
 from .charts import m_u_parameters_chart, match_weights_chart
 from .comparison import Comparison
 from .comparison_level import ComparisonLevel
+from .constants import PACKED_COMPARISON_VECTOR
 from .default_from_jsonschema import default_value_from_schema
 from .input_column import InputColumn
 from .misc import dedupe_preserving_order, prob_to_bayes_factor, prob_to_match_weight
@@ -65,6 +66,13 @@ class Settings:
         )
 
         brs_as_strings = s_else_d("blocking_rules_to_generate_predictions")
+        self._hash_exact_match_blocking_keys = s_else_d(
+            "hash_exact_match_blocking_keys"
+        )
+        self._select_only_columns_used_by_model = s_else_d(
+            "select_only_columns_used_by_model"
+        )
+        self._pack_comparison_vectors = s_else_d("pack_comparison_vectors")
 
         self._blocking_rules_to_generate_predictions = self._brs_as_objs(brs_as_strings)
 
@@ -76,6 +84,10 @@ class Settings:
 
         self._warn_if_no_null_level_in_comparisons()
 
+        if self._pack_comparison_vectors:
+            # Raises an error if the comparison vector does not fit in 63 bits
+            self._packed_comparison_vector_layout
+
         self._additional_columns_to_retain_list = (
             self._get_additional_columns_to_retain()
         )
@@ -212,6 +224,18 @@ class Settings:
             cols_used.extend(cols)
         return dedupe_preserving_order(cols_used)
 
+    @property
+    def _columns_used_by_model(self):
+        """The input columns needed to block, compare and retain records when
+        making predictions"""
+        cols_used = list(self._columns_used_by_comparisons)
+        cols_used.extend(c.name() for c in self._term_frequency_columns)
+        for br in self._blocking_rules_to_generate_predictions:
+            cols_used.extend(get_columns_used_from_sql(br.blocking_rule))
+        cols_used.extend(c.name() for c in self._additional_columns_to_retain)
+        cols_used = [InputColumn(c).unquote().name() for c in cols_used]
+        return dedupe_preserving_order(cols_used)
+
     @property
     def _columns_to_select_for_blocking(self):
         cols = []
@@ -228,6 +252,29 @@ class Settings:
 
         return dedupe_preserving_order(cols)
 
+    @property
+    def _packed_comparison_vector_layout(self) -> list[tuple[Comparison, int, int]]:
+        """The position of each comparison's comparison vector value within the
+        packed comparison vector, as a list of (comparison, offset, num_bits).
+
+        Each comparison vector value is stored plus one, so that the null level
+        value of -1 is stored as 0.
+        """
+        layout = []
+        offset = 0
+        for cc in self.comparisons:
+            num_bits = cc._num_levels.bit_length()
+            layout.append((cc, offset, num_bits))
+            offset += num_bits
+
+        if offset > 63:
+            raise ValueError(
+                f"The comparison vector values need {offset} bits, which is more "
+                "than fit in a 64 bit integer, so cannot be packed.  Please set "
+                "`pack_comparison_vectors` to False."
+            )
+        return layout
+
     @property
     def _columns_to_select_for_comparison_vector_values(self):
         cols = []
@@ -239,6 +286,13 @@ class Settings:
         for cc in self.comparisons:
             cols.extend(cc._columns_to_select_for_comparison_vector_values)
 
+        if self._pack_comparison_vectors:
+            packed = [
+                f"({cc._case_expression} + 1) * {2**offset}"
+                for cc, offset, _ in self._packed_comparison_vector_layout
+            ]
+            cols.append(f"{' + '.join(packed)} as {PACKED_COMPARISON_VECTOR}")
+
         for add_col in self._additional_columns_to_retain:
             cols.extend(add_col.names_l_r())
 
@@ -259,6 +313,9 @@ class Settings:
         for cc in self.comparisons:
             cols.extend(cc._columns_to_select_for_bayes_factor_parts)
 
+        if self._pack_comparison_vectors:
+            cols.append(PACKED_COMPARISON_VECTOR)
+
         for add_col in self._additional_columns_to_retain:
             cols.extend(add_col.names_l_r())
 
@@ -279,6 +336,9 @@ class Settings:
         for cc in self.comparisons:
             cols.extend(cc._columns_to_select_for_predict)
 
+        if self._pack_comparison_vectors:
+            cols.append(PACKED_COMPARISON_VECTOR)
+
         for add_col in self._additional_columns_to_retain:
             cols.extend(add_col.names_l_r())
 
@@ -288,6 +348,27 @@ class Settings:
         cols = dedupe_preserving_order(cols)
         return cols
 
+    @property
+    def _columns_to_select_for_compact_predict(self):
+        cols = []
+
+        for uid_col in self._unique_id_input_columns:
+            cols.append(uid_col.name_l())
+            cols.append(uid_col.name_r())
+
+        # Comparison vector values fit in a single byte
+        if self._pack_comparison_vectors:
+            cols.append(PACKED_COMPARISON_VECTOR)
+        else:
+            for cc in self.comparisons:
+                gamma = cc._gamma_column_name
+                cols.append(f"cast({gamma} as tinyint) as {gamma}")
+
+        if self._needs_matchkey_column:
+            cols.append("match_key")
+
+        return dedupe_preserving_order(cols)
+
     def _get_comparison_by_output_column_name(self, name):
         for cc in self.comparisons:
             if cc._output_column_name == name:
@@ -299,7 +380,9 @@ class Settings:
         for br in brs_as_strings:
             if isinstance(br, dict):
                 br = BlockingRule(
-                    br["blocking_rule"], salting_partitions=br["salting_partitions"]
+                    br["blocking_rule"],
+                    salting_partitions=br["salting_partitions"],
+                    skewed_key_threshold=br.get("skewed_key_threshold"),
                 )
                 br.preceding_rules = brs_as_objs.copy()
                 brs_as_objs.append(br)
@@ -62,8 +62,46 @@ class SparkDataframe(SplinkDataFrame):
     def as_spark_dataframe(self):
         return self.linker.spark.table(self.physical_name)
 
+    def iter_batches(self, batch_size=100_000):
+        import pyarrow as pa
+
+        # toLocalIterator brings one partition at a time to the driver
+        rows = self.linker.spark.sql(f"select * from {self.physical_name}")
+        batch = []
+        for row in rows.toLocalIterator():
+            batch.append(row.asDict())
+            if len(batch) == batch_size:
+                yield pa.RecordBatch.from_pylist(batch)
+                batch = []
+        if batch:
+            yield pa.RecordBatch.from_pylist(batch)
+
+    def as_arrow(self):
+        spark_df = self.as_spark_dataframe()
+        # DataFrame.toArrow is only available from Spark 4.0
+        if hasattr(spark_df, "toArrow"):
+            return spark_df.toArrow()
+
+        import pyarrow as pa
+
+        return pa.Table.from_pandas(spark_df.toPandas(), preserve_index=False)
+
+    def to_parquet(self, filepath, partition_by=None, overwrite=False):
+        mode = "overwrite" if overwrite else "errorifexists"
+        writer = self.as_spark_dataframe().write.mode(mode)
+        if partition_by:
+            writer = writer.partitionBy(*ensure_is_list(partition_by))
+        writer.parquet(filepath)
+
 
 class SparkLinker(Linker):
+    # Generating the pairs of each blocking rule as a plain equi-join, and
+    # deduplicating the narrow id pairs, avoids evaluating the exclusions of
+    # preceding rules against every candidate pair of later rules
+    _blocking_rule_deduplication_strategy = "dedupe_min_match_key"
+
+    _supports_salting = True
+
     def __init__(
         self,
         input_table_or_tables,
@@ -346,6 +384,7 @@ class SparkLinker(Linker):
             r"__splink__df_representatives.*",
             r"__splink__df_neighbours",
             r"__splink__df_connected_components_df",
+            r"__splink__df_cc_edges.*",
         ]
 
         if re.fullmatch(r"|".join(regex_to_persist), templated_name):
@@ -398,10 +437,18 @@ class SparkLinker(Linker):
     def _run_sql_execution(self, final_sql, templated_name, physical_name):
         return self.spark.sql(final_sql)
 
+    def _load_table_from_parquet(self, path, templated_name, physical_name):
+        spark_df = self.spark.read.parquet(path)
+        spark_df.createOrReplaceTempView(physical_name)
+        return self._table_to_splink_dataframe(templated_name, physical_name)
+
     @property
     def _infinity_expression(self):
         return "'infinity'"
 
+    def _hash_columns_sql(self, columns):
+        return f"xxhash64({', '.join(columns)})"
+
     def register_table(self, input, table_name, overwrite=False):
         """
         Register a table to your backend database, to be used in one of the
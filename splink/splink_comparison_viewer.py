@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING
 
 from jinja2 import Template
 
+from .constants import PACKED_COMPARISON_VECTOR
 from .misc import EverythingEncoder
 
 # https://stackoverflow.com/questions/39740632/python-type-hinting-without-cyclic-imports
@@ -42,11 +43,17 @@ def row_examples(linker: Linker, example_rows_per_category=2):
     }
     sqls.append(sql)
 
-    sql = """
+    # Partitioning on a single integer is cheaper than on the concatenated string
+    if linker._settings_obj._pack_comparison_vectors:
+        partition_col = PACKED_COMPARISON_VECTOR
+    else:
+        partition_col = "gam_concat"
+
+    sql = f"""
     select *,
-        ROW_NUMBER() OVER (PARTITION BY gam_concat order by rand_order)
+        ROW_NUMBER() OVER (PARTITION BY {partition_col} order by rand_order)
             AS row_example_index,
-        COUNT(*) OVER (PARTITION BY gam_concat) AS count
+        COUNT(*) OVER (PARTITION BY {partition_col}) AS count
     from __splink__df_predict_with_row_id
     """
 
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import itertools
 import logging
+import shutil
+from pathlib import Path
 from typing import TYPE_CHECKING
 
+from .misc import ensure_is_list
+
 logger = logging.getLogger(__name__)
 
 # https://stackoverflow.com/questions/39740632/python-type-hinting-without-cyclic-imports
@@ -37,6 +42,12 @@ class SplinkDataFrame:
     def _random_sample_sql(percent):
         raise NotImplementedError("Random sample sql not implemented for this linker")
 
+    @property
+    def _estimated_size_bytes(self) -> int | None:
+        """An estimate of the size of the table in bytes, used to limit the size of
+        the linker's cache.  None if the size cannot be estimated"""
+        return None
+
     @property
     def physical_and_template_names_equal(self):
         return self.templated_name == self.physical_name
@@ -63,6 +74,136 @@ class SplinkDataFrame:
     def as_record_dict(self, limit=None):
         pass
 
+    def iter_batches(self, batch_size: int = 100_000):
+        """Iterate over the dataframe as a sequence of Arrow record batches, without
+        loading the whole dataframe into memory.
+
+        This allows large outputs, such as the scored pairs from `linker.predict()`,
+        to be consumed with bounded memory.
+
+        Requires `pyarrow`.  Other queries should not be run against the linker
+        until iteration is complete, because on some backends (e.g. DuckDB) these
+        interrupt the query which streams the batches.
+
+        Examples:
+            >>> df_predict = linker.predict()
+            >>> for batch in df_predict.iter_batches(batch_size=1_000_000):
+            >>>     sink.write(batch.to_pandas())
+
+        Args:
+            batch_size (int, optional): The maximum number of rows in each batch.
+                Defaults to 100,000.
+
+        Yields:
+            pyarrow.RecordBatch: Batches of rows of the dataframe
+        """
+        raise NotImplementedError(
+            "Iterating over a table in Arrow batches is not implemented for "
+            f"{type(self.linker)}"
+        )
+
+    @property
+    def _arrow_schema(self):
+        """The Arrow schema of the batches returned by `iter_batches`, or None if
+        it is only known once the batches have been read"""
+        return None
+
+    def as_arrow(self):
+        """Return the dataframe as a `pyarrow.Table`, without converting it to
+        pandas or Python objects where the backend supports this.
+
+        Requires `pyarrow`.
+
+        Returns:
+            pyarrow.Table: The dataframe as an Arrow table
+        """
+        import pyarrow as pa
+
+        batches = list(self.iter_batches())
+        schema = self._arrow_schema
+        if schema is None and not batches:
+            schema = pa.schema([(c.unquote().name(), pa.null()) for c in self.columns])
+        return pa.Table.from_batches(batches, schema=schema)
+
+    def _prepare_output_path(self, filepath: str, overwrite: bool):
+        path = Path(filepath)
+        if not path.exists():
+            return
+        if not overwrite:
+            raise ValueError(
+                f"The path {filepath} already exists. Please use the 'overwrite' "
+                "argument if you wish to overwrite it"
+            )
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+
+    def to_parquet(
+        self, filepath: str, partition_by: str | list = None, overwrite=False
+    ):
+        """Write the dataframe to Parquet, without converting it to pandas.
+
+        Where the backend supports it, the data is written natively (e.g. with
+        `COPY ... TO` in DuckDB, or the dataframe writer in Spark).  Otherwise it is
+        streamed to the file in Arrow batches, which requires `pyarrow`.
+
+        Examples:
+            >>> df_predict = linker.predict()
+            >>> df_predict.to_parquet("predictions.parquet")
+            >>> # Write a directory of files, partitioned by the match key
+            >>> df_predict.to_parquet("predictions", partition_by="match_key")
+
+        Args:
+            filepath (str): The path to write to.  If `partition_by` is provided,
+                this is a directory, with a subdirectory for each value of the
+                partition columns.
+            partition_by (str | list, optional): The column(s) to partition the
+                output by, using Hive-style `column=value` directories.  Defaults to
+                None.
+            overwrite (bool, optional): Whether to overwrite the file or directory
+                at `filepath` if it exists.  Defaults to False.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        self._prepare_output_path(filepath, overwrite)
+
+        batches = iter(self.iter_batches())
+        schema = self._arrow_schema
+        if schema is None:
+            first_batch = next(batches, None)
+            if first_batch is None:
+                schema = self.as_arrow().schema
+            else:
+                schema = first_batch.schema
+                batches = itertools.chain([first_batch], batches)
+
+        if partition_by:
+            partition_by = ensure_is_list(partition_by)
+            partitioning = ds.partitioning(
+                pa.schema([schema.field(c) for c in partition_by]), flavor="hive"
+            )
+            Path(filepath).mkdir(parents=True)
+            # Write each batch separately, because write_dataset consumes an
+            # iterator of batches on another thread, which some backends (e.g.
+            # SQLite) do not allow
+            for i, batch in enumerate(batches):
+                ds.write_dataset(
+                    batch,
+                    filepath,
+                    schema=schema,
+                    format="parquet",
+                    partitioning=partitioning,
+                    basename_template=f"part-{i}-{{i}}.parquet",
+                    existing_data_behavior="overwrite_or_ignore",
+                )
+        else:
+            with pq.ParquetWriter(filepath, schema) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+
     def as_pandas_dataframe(self, limit=None):
         """Return the dataframe as a pandas dataframe.
 
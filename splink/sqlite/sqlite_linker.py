@@ -58,6 +58,13 @@ class SQLiteDataFrame(SplinkDataFrame):
                 " sqlite table that exists in the provided db."
             )
 
+    @property
+    def _estimated_size_bytes(self):
+        sql = f"select count(*) as num_rows from {self.physical_name}"
+        num_rows = self.linker.con.execute(sql).fetchone()["num_rows"]
+        # Assume 8 bytes per value
+        return num_rows * len(self.columns) * 8
+
     def drop_table_from_database(self, force_non_splink_table=False):
         self._check_drop_table_created_by_splink(force_non_splink_table)
 
@@ -77,8 +84,68 @@ class SQLiteDataFrame(SplinkDataFrame):
         cur = self.linker.con.cursor()
         return cur.execute(sql).fetchall()
 
+    def _arrow_schema_and_mixed_type_columns(self):
+        """SQLite columns may hold values of several types, so find the types
+        present in each column to choose a consistent Arrow type for every batch.
+        Columns mixing text with other types are converted to strings."""
+        import pyarrow as pa
+
+        cols = self.columns
+        types_sql = ", ".join(
+            f"group_concat(distinct typeof({c.name()})) as c{i}"
+            for i, c in enumerate(cols)
+        )
+        sql = f"select {types_sql} from {self.physical_name}"
+        types_by_col = self.linker.con.execute(sql).fetchone()
+
+        fields = []
+        mixed_type_columns = []
+        for i, c in enumerate(cols):
+            name = c.unquote().name()
+            types = set((types_by_col[f"c{i}"] or "").split(",")) - {"", "null"}
+            if not types:
+                arrow_type = pa.null()
+            elif types == {"integer"}:
+                arrow_type = pa.int64()
+            elif types <= {"integer", "real"}:
+                arrow_type = pa.float64()
+            elif types == {"blob"}:
+                arrow_type = pa.binary()
+            else:
+                arrow_type = pa.string()
+                if types != {"text"}:
+                    mixed_type_columns.append(name)
+            fields.append(pa.field(name, arrow_type))
+
+        return pa.schema(fields), mixed_type_columns
+
+    @property
+    def _arrow_schema(self):
+        return self._arrow_schema_and_mixed_type_columns()[0]
+
+    def iter_batches(self, batch_size=100_000):
+        import pyarrow as pa
+
+        schema, mixed_type_columns = self._arrow_schema_and_mixed_type_columns()
+
+        cur = self.linker.con.cursor()
+        cur.execute(f"select * from {self.physical_name}")
+        while True:
+            records = cur.fetchmany(batch_size)
+            if not records:
+                break
+            for r in records:
+                for col in mixed_type_columns:
+                    if r[col] is not None:
+                        r[col] = str(r[col])
+            yield pa.RecordBatch.from_pylist(records, schema=schema)
+
 
 class SQLiteLinker(Linker):
+    # SQLite evaluates the Bayes factor CASE expressions row by row, so it is
+    # faster to evaluate them once per distinct comparison vector
+    _predict_using_match_weight_lookup = True
+
     def __init__(
         self,
         input_table_or_tables,
@@ -187,6 +254,11 @@ class SQLiteLinker(Linker):
         else:
             return True
 
+    def _load_table_from_parquet(self, path, templated_name, physical_name):
+        self._delete_table_from_database(physical_name)
+        pd.read_parquet(path).to_sql(physical_name, self.con, index=False)
+        return self._table_to_splink_dataframe(templated_name, physical_name)
+
     def _delete_table_from_database(self, name):
         drop_sql = f"""
         DROP TABLE IF EXISTS {name}"""
@@ -0,0 +1,73 @@
+"""A vectorised union-find (disjoint set) over integer node indices, used to solve
+connected components in-process for backends whose data can be streamed into
+Python.
+
+Nodes are always linked to the root with the smaller index, so once all edges
+have been processed the root of every component is its minimum node index.
+Provided node indices are assigned in the order of the node ids, this gives the
+same cluster ids as the SQL implementation in `connected_components.py`.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def _find_roots(parent: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """Find the root of each of `nodes`, compressing their paths to point
+    directly at the root"""
+    roots = parent[nodes]
+    while True:
+        grandparents = parent[roots]
+        if np.array_equal(grandparents, roots):
+            break
+        roots = grandparents
+    parent[nodes] = roots
+    return roots
+
+
+def union_edges(parent: np.ndarray, nodes_l: np.ndarray, nodes_r: np.ndarray):
+    """Merge the sets containing each pair of nodes (`nodes_l[i]`, `nodes_r[i]`),
+    updating `parent` in place"""
+    while len(nodes_l):
+        roots_l = _find_roots(parent, nodes_l)
+        roots_r = _find_roots(parent, nodes_r)
+
+        unmerged = roots_l != roots_r
+        nodes_l, nodes_r = nodes_l[unmerged], nodes_r[unmerged]
+        roots_l, roots_r = roots_l[unmerged], roots_r[unmerged]
+
+        higher = np.maximum(roots_l, roots_r)
+        lower = np.minimum(roots_l, roots_r)
+        # Where several edges attempt to re-parent the same root, link it to the
+        # lowest candidate.  Any other merges are completed on the next pass
+        np.minimum.at(parent, higher, lower)
+
+
+def compress(parent: np.ndarray) -> np.ndarray:
+    """Return an array mapping each node to the root of its set"""
+    while True:
+        grandparents = parent[parent]
+        if np.array_equal(grandparents, parent):
+            return parent
+        parent = grandparents
+
+
+def connected_components_from_edge_batches(num_nodes: int, edge_batches) -> np.ndarray:
+    """Solve connected components over nodes `0..num_nodes-1`.
+
+    Args:
+        num_nodes (int): The number of nodes
+        edge_batches: An iterable of (nodes_l, nodes_r) pairs of integer arrays
+
+    Returns:
+        np.ndarray: The representative (minimum node index) of each node's component
+    """
+    parent = np.arange(num_nodes, dtype="int64")
+    for nodes_l, nodes_r in edge_batches:
+        union_edges(
+            parent,
+            np.asarray(nodes_l, dtype="int64"),
+            np.asarray(nodes_r, dtype="int64"),
+        )
+    return compress(parent)
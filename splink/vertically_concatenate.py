@@ -23,13 +23,14 @@ def vertically_concatenate_sql(linker: Linker) -> str:
     is created.  This is used to uniquely identify rows in the vertical concatenation.
     Without it, ID collisions would be possible leading to ambiguity e.g. if several
     of the input tables have the same ID.
+
+    If `select_only_columns_used_by_model` is set, columns of the input tables which
+    are not needed to make predictions are not selected.
     """
 
     # Use column order from first table in dict
     df_obj = next(iter(linker._input_tables_dict.values()))
-    columns = df_obj.columns_escaped
-
-    select_columns_sql = ", ".join(columns)
+    columns = df_obj.columns
 
     salting_reqiured = False
 
@@ -43,6 +44,12 @@ def vertically_concatenate_sql(linker: Linker) -> str:
         )
         salting_reqiured = linker._settings_obj.salting_required
 
+        if linker._settings_obj._select_only_columns_used_by_model:
+            used = {c.lower() for c in linker._settings_obj._columns_used_by_model}
+            columns = [c for c in columns if c.unquote().name().lower() in used]
+
+    select_columns_sql = ", ".join(c.name() for c in columns)
+
     if salting_reqiured:
         salt_sql = ", random() as __splink_salt"
     else:
@@ -1,8 +1,12 @@
 import logging
+import sqlite3
 
+import pandas as pd
 import pytest
 
+from splink.duckdb.duckdb_linker import DuckDBLinker
 from splink.spark.jar_location import similarity_jar_location
+from splink.sqlite.sqlite_linker import SQLiteLinker
 
 logger = logging.getLogger(__name__)
 
@@ -35,3 +39,26 @@ def df_spark(spark):
     df = spark.read.csv("./tests/datasets/fake_1000_from_splink_demos.csv", header=True)
     df.persist()
     yield df
+
+
+@pytest.fixture
+def make_linker():
+    """Returns a function which creates a DuckDB or SQLite linker of the
+    fake_1000 dataset, for tests which compare the results of the two backends.
+
+    SQLite has no levenshtein function, so one is registered using rapidfuzz.
+    """
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+    def _make_linker(backend, settings):
+        if backend == "duckdb":
+            return DuckDBLinker(df, settings)
+
+        from rapidfuzz.distance.Levenshtein import distance
+
+        con = sqlite3.connect(":memory:")
+        con.create_function("levenshtein", 2, distance)
+        df.to_sql("input_df", con, index=False)
+        return SQLiteLinker("input_df", settings, connection=con)
+
+    return _make_linker
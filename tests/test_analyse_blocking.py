@@ -1,9 +1,15 @@
+import sqlite3
+
 import pandas as pd
+import pytest
 
 from splink.analyse_blocking import (
     cumulative_comparisons_generated_by_blocking_rules,
+    number_of_comparisons_generated_by_blocking_rule_sql,
 )
 from splink.duckdb.duckdb_linker import DuckDBLinker
+from splink.sqlite.sqlite_linker import SQLiteLinker
+from splink.vertically_concatenate import vertically_concatenate_sql
 from tests.basic_settings import get_settings_dict
 
 
@@ -144,8 +150,8 @@ def test_blocking_records_accuracy():
     validate_blocking_output(
         linker_settings,
         expected_out={
-            "row_count": [13591, 53472, 137280],
-            "cumulative_rows": [13591, 67063, 204343],
+            "row_count": [13591, 50245, 137280],
+            "cumulative_rows": [13591, 63836, 201116],
             "cartesian": 1999000,
         },
         blocking_rules=blocking_rules,
@@ -156,8 +162,8 @@ def test_blocking_records_accuracy():
     validate_blocking_output(
         linker_settings,
         expected_out={
-            "row_count": [7257, 27190, 68640],
-            "cumulative_rows": [7257, 34447, 103087],
+            "row_count": [7257, 25161, 68640],
+            "cumulative_rows": [7257, 32418, 101058],
             "cartesian": 1000000,
         },
         blocking_rules=blocking_rules,
@@ -170,11 +176,11 @@ def test_blocking_records_accuracy():
         linker_settings,
         expected_out={
             # number of links per block simply related to two-frame case
-            "row_count": [3 * 7257, 3 * 27190, 3 * 68640],
+            "row_count": [3 * 7257, 3 * 25161, 3 * 68640],
             "cumulative_rows": [
                 3 * 7257,
-                3 * 7257 + 3 * 27190,
-                3 * 7257 + 3 * 27190 + 3 * 68640,
+                3 * 7257 + 3 * 25161,
+                3 * 7257 + 3 * 25161 + 3 * 68640,
             ],
             "cartesian": 3_000_000,
         },
@@ -187,9 +193,84 @@ def test_blocking_records_accuracy():
         linker_settings,
         expected_out={
             # and as above,
-            "row_count": [31272, 120993, 308880],
-            "cumulative_rows": [31272, 31272 + 120993, 31272 + 120993 + 308880],
+            "row_count": [31272, 113109, 308880],
+            "cumulative_rows": [31272, 31272 + 113109, 31272 + 113109 + 308880],
             "cartesian": (3000 * 2999) // 2,
         },
         blocking_rules=blocking_rules,
     )
+
+
+def _count_comparisons_using_join(linker, blocking_rule):
+    linker._enqueue_sql(vertically_concatenate_sql(linker), "__splink__df_concat")
+    sql = number_of_comparisons_generated_by_blocking_rule_sql(linker, blocking_rule)
+    linker._enqueue_sql(sql, "__splink__analyse_blocking_rule")
+    res = linker._execute_sql_pipeline().as_record_dict()[0]
+    return res["count_of_pairwise_comparisons_generated"]
+
+
+@pytest.mark.parametrize("link_type", ["dedupe_only", "link_only", "link_and_dedupe"])
+@pytest.mark.parametrize("backend", ["duckdb", "sqlite"])
+def test_count_comparisons_from_key_counts_matches_join(link_type, backend):
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    settings = {"link_type": link_type}
+
+    if link_type == "dedupe_only":
+        input_tables = [df]
+    else:
+        input_tables = [df.iloc[:300], df.iloc[300:700], df.iloc[700:]]
+
+    if backend == "duckdb":
+        linker = DuckDBLinker(input_tables, settings)
+    else:
+        con = sqlite3.connect(":memory:")
+        names = []
+        for i, t in enumerate(input_tables):
+            t.to_sql(f"input_{i}", con, index=False)
+            names.append(f"input_{i}")
+        linker = SQLiteLinker(names, settings, connection=con)
+
+    blocking_rules = [
+        "l.first_name = r.first_name",
+        "l.surname = r.surname and r.first_name = l.first_name",
+        "substr(l.dob,1,4) = substr(r.dob,1,4) and l.city = r.city",
+    ]
+    for br in blocking_rules:
+        expected = _count_comparisons_using_join(linker, br)
+        assert linker.count_num_comparisons_from_blocking_rule(br) == expected
+
+
+def test_blocking_key_skew_records():
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    linker = DuckDBLinker(df, get_settings_dict())
+
+    city_counts = df["city"].value_counts()
+    pairs = city_counts * (city_counts - 1) // 2
+
+    records = linker.blocking_key_skew_records(
+        [
+            "l.city = r.city",
+            "levenshtein(l.surname, r.surname) < 2",
+            "l.city = r.city and levenshtein(l.surname, r.surname) < 2",
+        ],
+        top_n=3,
+    )
+    # The rule with no equi-join condition is skipped, and the key of the rule
+    # with a levenshtein condition is the city
+    assert len(records) == 6
+    assert [r["key"] for r in records[:3]] == [r["key"] for r in records[3:]]
+
+    top = records[0]
+    assert top["rule"] == "l.city = r.city"
+    assert top["key"] == f"city = '{pairs.idxmax()}'"
+    assert top["num_records"] == city_counts[pairs.idxmax()]
+    assert top["num_comparisons"] == pairs.max()
+    assert top["total_comparisons_for_rule"] == pairs.sum()
+    assert top["proportion_of_comparisons"] == pytest.approx(pairs.max() / pairs.sum())
+    assert [r["num_comparisons"] for r in records[:3]] == list(
+        pairs.sort_values(ascending=False)[:3]
+    )
+
+    # Defaults to the blocking rules in the settings
+    records = linker.blocking_key_skew_records(top_n=1)
+    assert records[0]["rule"] == "l.surname = r.surname"
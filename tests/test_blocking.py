@@ -0,0 +1,120 @@
+import pandas as pd
+import pytest
+
+from splink.blocking import _exact_match_blocking_columns
+from splink.duckdb.duckdb_linker import DuckDBLinker
+from tests.basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+
+@pytest.mark.parametrize("link_type", ["dedupe_only", "link_only", "link_and_dedupe"])
+def test_blocking_rule_deduplication_strategies_agree(link_type):
+    settings = get_settings_dict()
+    settings["link_type"] = link_type
+    settings["blocking_rules_to_generate_predictions"] = [
+        "l.first_name = r.first_name",
+        "l.surname = r.surname",
+        "l.dob = r.dob",
+        "l.city = r.city and levenshtein(l.surname, r.surname) <= 2",
+    ]
+
+    if link_type == "dedupe_only":
+        input_tables = df
+        uid_cols = ["unique_id_l", "unique_id_r"]
+    else:
+        input_tables = [df.iloc[:500], df.iloc[500:]]
+        uid_cols = [
+            "source_dataset_l",
+            "unique_id_l",
+            "source_dataset_r",
+            "unique_id_r",
+        ]
+
+    results = {}
+    for strategy in ["and_not_preceding_rules", "dedupe_min_match_key"]:
+        linker = DuckDBLinker(input_tables, settings)
+        linker._blocking_rule_deduplication_strategy = strategy
+        df_predict = linker.predict().as_pandas_dataframe()
+        cols = uid_cols + ["match_key", "match_weight"]
+        results[strategy] = (
+            df_predict[cols].sort_values(uid_cols).reset_index(drop=True)
+        )
+
+    assert results["dedupe_min_match_key"]["match_key"].nunique() == 4
+    pd.testing.assert_frame_equal(
+        results["and_not_preceding_rules"], results["dedupe_min_match_key"]
+    )
+
+
+def test_unknown_blocking_rule_deduplication_strategy():
+    settings = get_settings_dict()
+    linker = DuckDBLinker(df, settings)
+    linker._blocking_rule_deduplication_strategy = "not_a_strategy"
+    with pytest.raises(ValueError):
+        linker.predict()
+
+
+def test_exact_match_blocking_columns():
+    assert _exact_match_blocking_columns("l.first_name = r.first_name") == [
+        "first_name"
+    ]
+    assert _exact_match_blocking_columns(
+        "l.surname = r.surname and l.first_name = r.first_name"
+    ) == ["first_name", "surname"]
+    assert _exact_match_blocking_columns("r.dob = l.dob AND (l.city = r.city)") == [
+        "city",
+        "dob",
+    ]
+
+    assert _exact_match_blocking_columns("l.first_name = r.surname") is None
+    assert _exact_match_blocking_columns("l.dob = r.dob or l.city = r.city") is None
+    assert (
+        _exact_match_blocking_columns("substr(l.dob,1,4) = substr(r.dob,1,4)") is None
+    )
+    assert (
+        _exact_match_blocking_columns(
+            "l.surname = r.surname and levenshtein(l.dob, r.dob) <= 1"
+        )
+        is None
+    )
+    assert _exact_match_blocking_columns("1=1") is None
+
+
+@pytest.mark.parametrize("link_type", ["dedupe_only", "link_only", "link_and_dedupe"])
+@pytest.mark.parametrize(
+    "strategy", ["and_not_preceding_rules", "dedupe_min_match_key"]
+)
+def test_hashed_blocking_keys_give_same_comparisons(link_type, strategy):
+    settings = get_settings_dict()
+    settings["link_type"] = link_type
+    settings["blocking_rules_to_generate_predictions"] = [
+        "l.first_name = r.first_name and l.surname = r.surname",
+        "l.dob = r.dob",
+        "l.city = r.city and levenshtein(l.surname, r.surname) <= 2",
+        "l.surname = r.surname and l.first_name = r.first_name",
+        "l.email = r.email",
+    ]
+
+    if link_type == "dedupe_only":
+        input_tables = df
+    else:
+        input_tables = [df.iloc[:500], df.iloc[500:]]
+
+    results = {}
+    for hash_keys in [False, True, "collide"]:
+        settings["hash_exact_match_blocking_keys"] = bool(hash_keys)
+        linker = DuckDBLinker(input_tables, settings)
+        linker._blocking_rule_deduplication_strategy = strategy
+        if hash_keys == "collide":
+            # Every record has the same hash, so only the original rules can
+            # distinguish the pairs
+            linker._hash_columns_sql = lambda columns: "1"
+        df_predict = linker.predict().as_pandas_dataframe()
+        cols = ["unique_id_l", "unique_id_r", "match_key", "match_weight"]
+        results[hash_keys] = (
+            df_predict[cols].sort_values(cols[:2]).reset_index(drop=True)
+        )
+
+    pd.testing.assert_frame_equal(results[False], results[True])
+    pd.testing.assert_frame_equal(results[False], results["collide"])
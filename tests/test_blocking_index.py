@@ -0,0 +1,87 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from splink.blocking_index import InMemoryBlockingIndex
+from splink.duckdb.duckdb_linker import DuckDBLinker
+from tests.basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+
+def test_blocking_index_candidates():
+    rows = [
+        {"first_name": "John", "surname": "Smith", "dob": "1980-01-01"},
+        {"first_name": "Jon", "surname": "Smith", "dob": "1981-01-01"},
+        {"first_name": "Jane", "surname": None, "dob": "1980-05-01"},
+    ]
+    index = InMemoryBlockingIndex(
+        rows,
+        ["l.surname = r.surname", "substr(l.dob, 1, 4) = substr(r.dob, 1, 4)"],
+        "duckdb",
+    )
+    record = {"first_name": "John", "surname": "Smith", "dob": "1980-12-31"}
+    assert list(index.candidates(record)) == [(0, 0), (1, 0), (0, 1), (2, 1)]
+    assert list(index.candidates({"surname": None, "dob": None})) == []
+    assert index.condition(0) is None
+
+    index = InMemoryBlockingIndex(
+        rows, ["l.surname = r.surname and l.first_name <> r.first_name"], "duckdb"
+    )
+    pair = {"surname_l": "Smith", "surname_r": "Smith", "first_name_l": "Jon"}
+    assert index.condition(0)({**pair, "first_name_r": "John"}) is True
+    assert index.condition(0)({**pair, "first_name_r": "Jon"}) is False
+
+    with pytest.raises(ValueError):
+        InMemoryBlockingIndex(rows, ["levenshtein(l.surname, r.surname) < 2"], "duckdb")
+
+
+@pytest.mark.parametrize(
+    "blocking_rules",
+    [
+        ["l.surname = r.surname", "l.dob = r.dob"],
+        [
+            "l.surname = r.surname and levenshtein(l.first_name, r.first_name) <= 2",
+            "substr(l.dob, 1, 4) = substr(r.dob, 1, 4) and l.city = r.city",
+        ],
+    ],
+)
+def test_in_memory_matcher_matches_find_matches_to_new_records(blocking_rules):
+    linker = DuckDBLinker(df, get_settings_dict())
+    matcher = linker.in_memory_matcher(blocking_rules, match_weight_threshold=-4)
+
+    uid_cols = ["unique_id_l", "unique_id_r"]
+    for record in df.dropna().sample(5, random_state=1).to_dict("records"):
+        df_expected = linker.find_matches_to_new_records(
+            [record], blocking_rules=blocking_rules, match_weight_threshold=-4
+        ).as_pandas_dataframe()
+        df_matches = pd.DataFrame(matcher.find_matches(record))
+
+        assert len(df_matches) == len(df_expected) > 0
+        df_expected = df_expected.sort_values(uid_cols).reset_index(drop=True)
+        df_matches = df_matches.sort_values(uid_cols).reset_index(drop=True)
+        for col in df_matches.columns:
+            for a, b in zip(df_matches[col], df_expected[col]):
+                if isinstance(a, float):
+                    assert math.isclose(a, b, rel_tol=1e-9), col
+                else:
+                    assert a == b, col
+
+
+def test_in_memory_matcher_stores_rows_column_wise():
+    linker = DuckDBLinker(df, get_settings_dict())
+    matcher = linker.in_memory_matcher(["l.surname = r.surname"])
+
+    assert matcher._num_rows == len(df)
+    assert all(isinstance(v, np.ndarray) for v in matcher._columns.values())
+    assert matcher._columns["unique_id"].dtype.kind == "i"
+
+    # Records are built on demand, with Python values and missing values as None
+    expected = df[df["first_name"].isna()].iloc[0]
+    offset = int((matcher._columns["unique_id"] == expected["unique_id"]).argmax())
+    row = matcher._row(offset)
+    assert type(row["unique_id"]) is int
+    assert row["first_name"] is None
+    assert row["surname"] == expected["surname"]
@@ -1,4 +1,5 @@
 import os
+import sqlite3
 from unittest.mock import create_autospec, patch
 
 import pandas as pd
@@ -6,6 +7,8 @@ import pytest
 
 from splink.duckdb.duckdb_linker import DuckDBLinker, DuckDBLinkerDataFrame
 from splink.linker import SplinkDataFrame
+from splink.persistent_cache import PersistentTableCache, input_fingerprint
+from splink.sqlite.sqlite_linker import SQLiteLinker
 from tests.basic_settings import get_settings_dict
 
 df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
@@ -269,3 +272,195 @@ def test_cache_register_compute_tf_table(debug_mode):
         # now this should be cached, as I have manually registered
         linker.compute_tf_table("first_name")
         mock_execute_sql_pipeline.assert_not_called()
+
+
+@pytest.mark.parametrize("cache_dirname", ["cache", "o'brien's cache"])
+def test_persistent_cache_across_linkers(tmp_path, cache_dirname):
+    settings = get_settings_dict()
+    settings["linker_uid"] = "persistent_cache_test"
+    cache_dir = os.path.join(tmp_path, cache_dirname)
+
+    linker = DuckDBLinker(df, settings)
+    linker.enable_persistent_cache(cache_dir)
+    concat_with_tf = linker._initialise_df_concat_with_tf(materialise=True)
+    expected = concat_with_tf.as_pandas_dataframe()
+    assert len(linker._persistent_cache._manifest) == 1
+
+    # A new linker, with a new connection, should read from the on-disk cache
+    new_linker = DuckDBLinker(df, settings)
+    new_linker.enable_persistent_cache(cache_dir)
+    with patch.object(
+        new_linker, "_execute_sql_against_backend", new=make_mock_execute(new_linker)
+    ) as mock_execute_sql_pipeline:
+        concat_with_tf = new_linker._initialise_df_concat_with_tf(materialise=True)
+        mock_execute_sql_pipeline.assert_not_called()
+
+    pd.testing.assert_frame_equal(concat_with_tf.as_pandas_dataframe(), expected)
+
+    # Tables not matching the persisted templated names are not written to disk
+    new_linker.compute_tf_table("first_name")
+    new_linker.query_sql("select 1 as a")
+    templated_names = {
+        e["templated_name"] for e in new_linker._persistent_cache._manifest.values()
+    }
+    assert templated_names == {
+        "__splink__df_concat_with_tf",
+        "__splink__df_tf_first_name",
+    }
+
+    # A different linker_uid does not use the cached tables
+    settings["linker_uid"] = "another_uid"
+    other_linker = DuckDBLinker(df, settings)
+    other_linker.enable_persistent_cache(cache_dir)
+    with patch.object(
+        other_linker,
+        "_execute_sql_against_backend",
+        new=make_mock_execute(other_linker),
+    ) as mock_execute_sql_pipeline:
+        other_linker._initialise_df_concat_with_tf(materialise=True)
+        mock_execute_sql_pipeline.assert_called()
+
+
+def test_persistent_cache_eviction(tmp_path):
+    settings = get_settings_dict()
+    cache_dir = os.path.join(tmp_path, "cache")
+
+    linker = DuckDBLinker(df, settings)
+    linker.enable_persistent_cache(cache_dir, max_size_bytes=1)
+    linker.compute_tf_table("first_name")
+    linker.compute_tf_table("surname")
+
+    # Only the most recently written table is kept when over budget
+    manifest = linker._persistent_cache._manifest
+    assert [e["templated_name"] for e in manifest.values()] == [
+        "__splink__df_tf_surname"
+    ]
+    parquet_files = [f for f in os.listdir(cache_dir) if f.endswith(".parquet")]
+    assert len(parquet_files) == 1
+
+
+def test_cache_size_limit():
+    settings = get_settings_dict()
+
+    linker = DuckDBLinker(df, settings)
+    cache = linker._intermediate_table_cache
+    linker._initialise_df_concat_with_tf()
+    tf_first_name = linker.compute_tf_table("first_name")
+    linker.compute_tf_table("surname")
+    linker.compute_tf_table("city")
+
+    # Use surname, so first_name is the least recently used tf table
+    cache["__splink__df_tf_surname"]
+
+    # Limit to the size of everything except the first_name tf table
+    limit = cache.size_bytes - cache._size("__splink__df_tf_first_name")
+    linker.set_cache_size_limit(limit)
+
+    assert set(cache.keys()) == {
+        "__splink__df_concat_with_tf",
+        "__splink__df_tf_surname",
+        "__splink__df_tf_city",
+    }
+    assert not linker._table_exists_in_database(tf_first_name.physical_name)
+
+    # A limit smaller than the pinned concat_with_tf table leaves only it, along
+    # with the table that has just been added
+    linker.set_cache_size_limit(1)
+    assert set(cache.keys()) == {"__splink__df_concat_with_tf"}
+
+    linker.compute_tf_table("first_name")
+    assert set(cache.keys()) == {
+        "__splink__df_concat_with_tf",
+        "__splink__df_tf_first_name",
+    }
+
+    # Evicted tables are recomputed when needed
+    linker.set_cache_size_limit(None)
+    linker.predict()
+
+
+def _uses_persistent_cache(linker):
+    with patch.object(
+        linker, "_execute_sql_against_backend", new=make_mock_execute(linker)
+    ) as mock_execute_sql_pipeline:
+        linker._initialise_df_concat_with_tf(materialise=True)
+        return not mock_execute_sql_pipeline.called
+
+
+def test_persistent_cache_detects_changed_input_data(tmp_path):
+    settings = get_settings_dict()
+    settings["linker_uid"] = "persistent_cache_test"
+    cache_dir = os.path.join(tmp_path, "cache")
+
+    linker = DuckDBLinker(df, settings)
+    linker.enable_persistent_cache(cache_dir)
+    linker._initialise_df_concat_with_tf(materialise=True)
+
+    linker = DuckDBLinker(df.copy(), settings)
+    linker.enable_persistent_cache(cache_dir)
+    assert _uses_persistent_cache(linker)
+
+    df_changed = df.copy()
+    df_changed.loc[0, "first_name"] = "a changed name"
+    linker = DuckDBLinker(df_changed, settings)
+    linker.enable_persistent_cache(cache_dir)
+    assert not _uses_persistent_cache(linker)
+
+    # Input files are identified by their size and modification time
+    csv_path = os.path.join(tmp_path, "input.csv")
+    df.to_csv(csv_path, index=False)
+    linker = DuckDBLinker(csv_path, settings)
+    linker.enable_persistent_cache(cache_dir)
+    linker._initialise_df_concat_with_tf(materialise=True)
+
+    linker = DuckDBLinker(csv_path, settings)
+    linker.enable_persistent_cache(cache_dir)
+    assert _uses_persistent_cache(linker)
+
+    df_changed.to_csv(csv_path, index=False)
+    linker = DuckDBLinker(csv_path, settings)
+    linker.enable_persistent_cache(cache_dir)
+    assert not _uses_persistent_cache(linker)
+
+
+def test_invalidate_cache_clears_persistent_cache(tmp_path):
+    settings = get_settings_dict()
+    settings["linker_uid"] = "persistent_cache_test"
+    cache_dir = os.path.join(tmp_path, "cache")
+
+    other_linker = DuckDBLinker(df, {**settings, "linker_uid": "other_uid"})
+    other_linker.enable_persistent_cache(cache_dir)
+    other_linker._initialise_df_concat_with_tf(materialise=True)
+
+    linker = DuckDBLinker(df, settings)
+    linker.enable_persistent_cache(cache_dir)
+    linker._initialise_df_concat_with_tf(materialise=True)
+    linker.compute_tf_table("first_name")
+
+    manifest = PersistentTableCache(cache_dir)._manifest
+    assert len(manifest) == 3
+
+    # Only the tables written by this linker are removed
+    linker.invalidate_cache()
+    manifest = PersistentTableCache(cache_dir)._manifest
+    assert [e["cache_uid"] for e in manifest.values()] == ["other_uid"]
+
+    # Tables computed after invalidation are persisted and can be reused
+    linker._initialise_df_concat_with_tf(materialise=True)
+    new_linker = DuckDBLinker(df, {**settings, "linker_uid": linker._cache_uid})
+    new_linker.enable_persistent_cache(cache_dir)
+    assert _uses_persistent_cache(new_linker)
+
+
+def test_input_fingerprint_detects_changed_values_in_sqlite():
+    # SQLite cannot hash rows in SQL, so they are hashed in Python
+    pytest.importorskip("pyarrow")
+    con = sqlite3.connect(":memory:")
+    df.to_sql("input_df", con, index=False)
+    linker = SQLiteLinker("input_df", get_settings_dict(), connection=con)
+
+    fingerprint = input_fingerprint(linker)
+    assert input_fingerprint(linker) == fingerprint
+
+    con.execute("update input_df set first_name = 'changed' where unique_id = 0")
+    assert input_fingerprint(linker) != fingerprint
@@ -9,18 +9,24 @@ from tests.cc_testing_utils import (
     run_cc_implementation,
 )
 
+
 ###############################################################################
 # Accuracy Testing
 ###############################################################################
 
 
+@pytest.mark.parametrize(
+    "algorithm", ["label_propagation", "star_contraction", "union_find"]
+)
 @pytest.mark.parametrize("execution_number", range(20))
-def test_small_erdos_renyi_graph(execution_number):
+def test_small_erdos_renyi_graph(execution_number, algorithm):
     g = generate_random_graph(graph_size=500)
     linker = register_cc_df(g)
 
     assert check_df_equality(
-        run_cc_implementation(linker).sort_values(by=["node_id", "representative"]),
+        run_cc_implementation(linker, algorithm).sort_values(
+            by=["node_id", "representative"]
+        ),
         networkx_solve(g).sort_values(by=["node_id", "representative"]),
     )
 
@@ -47,3 +53,12 @@ def test_large_erdos_renyi_graph(execution_number):
         run_cc_implementation(linker).sort_values(by=["node_id", "representative"]),
         networkx_solve(g).sort_values(by=["node_id", "representative"]),
     )
+
+
+def test_union_find_drops_intermediate_tables():
+    g = generate_random_graph(graph_size=100)
+    predict_df = register_cc_df(g)
+    run_cc_implementation(predict_df, "union_find")
+
+    linker = predict_df.linker
+    assert not linker._table_exists_in_database("__splink__df_representative_index")
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+from splink.duckdb.duckdb_linker import DuckDBLinker
+from tests.basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+
+@pytest.mark.parametrize("link_type", ["dedupe_only", "link_and_dedupe"])
+def test_compact_predict_and_rejoin_record_values(link_type):
+    settings = get_settings_dict()
+    settings["link_type"] = link_type
+    settings["blocking_rules_to_generate_predictions"] = [
+        "l.surname = r.surname",
+        "l.dob = r.dob",
+    ]
+
+    if link_type == "dedupe_only":
+        linker = DuckDBLinker(df, settings)
+        uid_cols = ["unique_id_l", "unique_id_r"]
+    else:
+        linker = DuckDBLinker([df.iloc[:500], df.iloc[500:]], settings)
+        uid_cols = [
+            "source_dataset_l",
+            "source_dataset_r",
+            "unique_id_l",
+            "unique_id_r",
+        ]
+
+    df_full = linker.predict().as_pandas_dataframe()
+    df_compact = linker.predict(compact_output=True)
+    df_compact_pd = df_compact.as_pandas_dataframe()
+
+    gamma_cols = [c for c in df_full.columns if c.startswith("gamma_")]
+    assert list(df_compact_pd.columns) == [
+        "match_weight",
+        "match_probability",
+        *uid_cols,
+        *gamma_cols,
+        "match_key",
+    ]
+    assert all(df_compact_pd[c].dtype == "int8" for c in gamma_cols)
+
+    cols = ["match_weight", "match_probability", *uid_cols, *gamma_cols]
+    pd.testing.assert_frame_equal(
+        df_compact_pd[cols].sort_values(uid_cols).reset_index(drop=True),
+        df_full[cols]
+        .astype({c: "int8" for c in gamma_cols})
+        .sort_values(uid_cols)
+        .reset_index(drop=True),
+    )
+
+    df_rejoined = linker.rejoin_record_values(
+        df_compact, where_condition="match_weight > 5", limit=50
+    ).as_pandas_dataframe()
+    assert len(df_rejoined) == 50
+    assert (df_rejoined["match_weight"] > 5).all()
+
+    value_cols = ["first_name_l", "first_name_r", "city_l", "city_r", "group_l"]
+    df_expected = df_full[uid_cols + value_cols].merge(
+        df_rejoined[uid_cols], on=uid_cols
+    )
+    pd.testing.assert_frame_equal(
+        df_rejoined[uid_cols + value_cols].sort_values(uid_cols).reset_index(drop=True),
+        df_expected.sort_values(uid_cols).reset_index(drop=True),
+    )
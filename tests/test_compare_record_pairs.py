@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+from splink.duckdb.duckdb_linker import DuckDBLinker
+from tests.basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+uid_cols = ["unique_id_l", "unique_id_r"]
+
+
+def _sorted(df):
+    return df.sort_values(uid_cols).reset_index(drop=True)
+
+
+def _record_pairs(df_predict):
+    # Rebuild the left and right records of each pair from the input data
+    pairs = df_predict[uid_cols]
+    pairs = pairs.merge(df.add_suffix("_l"), on="unique_id_l")
+    return pairs.merge(df.add_suffix("_r"), on="unique_id_r")
+
+
+@pytest.mark.parametrize("use_lookup", [False, True])
+def test_compare_record_pairs_matches_predict(use_lookup):
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        "l.surname = r.surname",
+        "l.dob = r.dob",
+    ]
+    linker = DuckDBLinker(df, settings)
+    linker._predict_using_match_weight_lookup = use_lookup
+
+    df_predict = linker.predict().as_pandas_dataframe()
+    df_pairs = _record_pairs(df_predict)
+
+    df_scored = linker.compare_record_pairs(df_pairs).as_pandas_dataframe()
+    assert "match_key" not in df_scored.columns
+    pd.testing.assert_frame_equal(
+        _sorted(df_scored),
+        _sorted(df_predict.drop(columns="match_key")),
+        check_like=True,
+    )
+
+    df_scored = linker.compare_record_pairs(
+        df_pairs, threshold_match_weight=2
+    ).as_pandas_dataframe()
+    df_expected = df_predict[df_predict["match_weight"] >= 2]
+    assert len(df_scored) == len(df_expected)
+    assert set(df_scored["unique_id_l"]) == set(df_expected["unique_id_l"])
+
+    # The pairs can also be given as a table in the database
+    pairs_table = linker.register_table(df_pairs, "my_record_pairs")
+    df_scored = linker.compare_record_pairs("my_record_pairs").as_pandas_dataframe()
+    assert len(df_scored) == len(df_predict)
+    df_scored = linker.compare_record_pairs(pairs_table).as_pandas_dataframe()
+    assert len(df_scored) == len(df_predict)
+
+    # The blocking rules are unchanged
+    assert len(linker._settings_obj._blocking_rules_to_generate_predictions) == 2
+
+
+def test_compare_record_pairs_matches_compare_two_records():
+    linker = DuckDBLinker(df, get_settings_dict())
+    records = df.dropna().head(2).to_dict(orient="records")
+
+    df_pairs = pd.DataFrame(
+        [
+            {
+                **{f"{k}_l": v for k, v in records[0].items()},
+                **{f"{k}_r": v for k, v in records[1].items()},
+            }
+        ]
+    )
+    df_scored = linker.compare_record_pairs(df_pairs).as_pandas_dataframe()
+    df_expected = linker.compare_two_records(*records).as_pandas_dataframe()
+
+    pd.testing.assert_frame_equal(df_scored, df_expected, check_like=True)
@@ -0,0 +1,113 @@
+import math
+
+import pandas as pd
+import pytest
+
+import splink.duckdb.duckdb_comparison_library as cl
+import splink.duckdb.duckdb_comparison_template_library as ctl
+from splink.compiled_scorer import _SqlToPython
+from splink.duckdb.duckdb_linker import DuckDBLinker
+from splink.exceptions import SplinkException
+from tests.basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+records = {r["unique_id"]: r for r in df.to_dict("records")}
+
+
+def _assert_scorer_matches_predict(linker):
+    df_predict = linker.predict().as_record_dict()
+    scorer = linker.compile_scorer()
+
+    scores = scorer.score_pairs(
+        (records[r["unique_id_l"]], records[r["unique_id_r"]]) for r in df_predict
+    )
+    assert len(scores) > 0
+    for score, row in zip(scores, df_predict):
+        for k, v in score.items():
+            assert math.isclose(v, row[k], rel_tol=1e-9, abs_tol=1e-9), (k, row)
+
+
+def test_compiled_scorer_basic_settings():
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        "l.surname = r.surname",
+        "l.dob = r.dob",
+    ]
+    linker = DuckDBLinker(df, settings)
+    _assert_scorer_matches_predict(linker)
+
+
+def test_compiled_scorer_comparison_library():
+    settings = {
+        "link_type": "dedupe_only",
+        "blocking_rules_to_generate_predictions": [
+            "l.surname = r.surname",
+            "l.dob = r.dob",
+        ],
+        "comparisons": [
+            ctl.name_comparison(
+                "first_name",
+                levenshtein_thresholds=[2],
+                jaro_thresholds=[0.9],
+                jaccard_thresholds=[0.8],
+                term_frequency_adjustments_name=True,
+            ),
+            cl.jaro_winkler_at_thresholds("surname", [0.9, 0.7]),
+            ctl.date_comparison(
+                "dob",
+                cast_strings_to_date=True,
+                separate_1st_january=True,
+                datediff_thresholds=[1, 5],
+                datediff_metrics=["month", "year"],
+            ),
+            cl.levenshtein_at_thresholds("email", 2, regex_extract="^[^@]+"),
+            cl.exact_match("city", term_frequency_adjustments=True),
+        ],
+        "retain_intermediate_calculation_columns": True,
+    }
+    linker = DuckDBLinker(df, settings)
+    linker.estimate_u_using_random_sampling(max_pairs=1e5, seed=1)
+    linker.estimate_m_from_label_column("group")
+    _assert_scorer_matches_predict(linker)
+
+
+def test_compiled_scorer_functions():
+    settings = get_settings_dict()
+    settings["comparisons"][1] = {
+        "output_column_name": "surname",
+        "comparison_levels": [
+            {
+                "sql_condition": "surname_l IS NULL OR surname_r IS NULL",
+                "is_null_level": True,
+            },
+            {
+                "sql_condition": "soundex(surname_l) = soundex(surname_r)",
+                "m_probability": 0.9,
+                "u_probability": 0.1,
+            },
+            {"sql_condition": "ELSE", "m_probability": 0.1, "u_probability": 0.9},
+        ],
+    }
+    linker = DuckDBLinker(df, settings)
+
+    with pytest.raises(SplinkException):
+        linker.compile_scorer()
+
+    scorer = linker.compile_scorer(functions={"soundex": lambda s: s[0]})
+    record_1 = {**records[1], "surname": "Smith"}
+    record_2 = {**records[2], "surname": "Stone", "first_name": None}
+    score = scorer.score(record_1, record_2)
+    assert score["gamma_surname"] == 1
+    assert score["gamma_first_name"] == -1
+    assert score["bf_tf_adj_first_name"] == 1.0
+
+
+def test_compiled_division_matches_backend():
+    import duckdb
+
+    row = {"a_l": 7, "a_r": 2}
+    expected = duckdb.query("select 7 / 2").fetchone()[0]
+    assert _SqlToPython("duckdb").compile_sql("a_l / a_r")(row) == expected
+
+    assert _SqlToPython("sqlite").compile_sql("a_l / a_r")(row) == 3
+    assert _SqlToPython("spark").compile_sql("a_l / a_r")(row) == 3.5
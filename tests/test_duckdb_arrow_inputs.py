@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+from splink.duckdb.duckdb_linker import DuckDBLinker
+from tests.basic_settings import get_settings_dict
+
+pa = pytest.importorskip("pyarrow")
+ds = pytest.importorskip("pyarrow.dataset")
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+
+def _predictions(linker):
+    cols = ["unique_id_l", "unique_id_r", "match_weight"]
+    df_predict = linker.predict().as_pandas_dataframe()
+    return df_predict[cols].sort_values(cols[:2]).reset_index(drop=True)
+
+
+@pytest.fixture
+def partitioned_parquet(tmp_path):
+    df_with_unused = df.assign(unused_col="x", partition=df["unique_id"] % 3)
+    ds.write_dataset(
+        pa.Table.from_pandas(df_with_unused, preserve_index=False),
+        tmp_path / "partitioned",
+        format="parquet",
+        partitioning=["partition"],
+        partitioning_flavor="hive",
+    )
+    return str(tmp_path / "partitioned")
+
+
+def test_lazy_arrow_inputs_give_same_predictions(partitioned_parquet):
+    settings = get_settings_dict()
+    expected = _predictions(DuckDBLinker(df, settings))
+
+    dataset = ds.dataset(partitioned_parquet, partitioning="hive")
+    linker = DuckDBLinker(dataset, settings)
+    input_columns = linker.query_sql("select * from __splink__input_table_0 limit 1")
+    assert "unused_col" in input_columns.columns
+    pd.testing.assert_frame_equal(_predictions(linker), expected)
+
+    settings_used_columns = {**settings, "select_only_columns_used_by_model": True}
+    linker = DuckDBLinker(dataset, settings_used_columns)
+    input_columns = linker.query_sql("select * from __splink__input_table_0 limit 1")
+    assert "unused_col" not in input_columns.columns
+    assert "partition" not in input_columns.columns
+    pd.testing.assert_frame_equal(_predictions(linker), expected)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    reader = pa.RecordBatchReader.from_batches(table.schema, table.to_batches(100))
+    linker = DuckDBLinker(reader, settings)
+    pd.testing.assert_frame_equal(_predictions(linker), expected)
+
+    linker = DuckDBLinker(partitioned_parquet, settings)
+    pd.testing.assert_frame_equal(_predictions(linker), expected)
+
+
+def test_register_record_batch_reader():
+    linker = DuckDBLinker(df, get_settings_dict())
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    reader = pa.RecordBatchReader.from_batches(table.schema, table.to_batches(100))
+
+    registered = linker.register_table(reader, "registered_reader")
+    # The reader is consumed on registration, so the table can be read repeatedly
+    assert len(registered.as_pandas_dataframe()) == len(df)
+    assert len(registered.as_pandas_dataframe()) == len(df)
+
+    reader = pa.RecordBatchReader.from_batches(table.schema, table.to_batches(100))
+    registered = linker.register_table(reader, "registered_reader", overwrite=True)
+    assert len(registered.as_pandas_dataframe()) == len(df)
+
+
+def test_lazy_arrow_inputs_retain_columns_not_used_by_model(partitioned_parquet):
+    # Columns which are not used by the model, such as a label column, remain
+    # available unless select_only_columns_used_by_model is set
+    settings = get_settings_dict()
+    settings["additional_columns_to_retain"] = []
+    dataset = ds.dataset(partitioned_parquet, partitioning="hive")
+    linker = DuckDBLinker(dataset, settings)
+    linker.estimate_m_from_label_column("group")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    reader = pa.RecordBatchReader.from_batches(table.schema, table.to_batches(100))
+    linker = DuckDBLinker(reader, settings)
+    linker.estimate_m_from_label_column("group")
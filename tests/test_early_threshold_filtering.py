@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from splink.predict import _comparison_is_cheap, match_weight_upper_bound_filter_sql
+from splink.settings import Settings
+from tests.basic_settings import get_settings_dict
+
+
+def test_comparisons_classified_by_cost():
+    settings_obj = Settings(get_settings_dict())
+    cheap = {
+        cc._output_column_name: _comparison_is_cheap(cc)
+        for cc in settings_obj.comparisons
+    }
+    assert cheap == {
+        "first_name": False,
+        "surname": True,
+        "dob": True,
+        "email": True,
+        "city": True,
+    }
+
+    assert match_weight_upper_bound_filter_sql(settings_obj) is None
+    assert match_weight_upper_bound_filter_sql(settings_obj, 0.9) is not None
+
+
+@pytest.mark.parametrize("backend", ["duckdb", "sqlite"])
+@pytest.mark.parametrize("threshold_match_weight", [-2, 3, 8, 12])
+def test_early_threshold_filtering_gives_same_predictions(
+    backend, threshold_match_weight, make_linker
+):
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        "l.surname = r.surname",
+        "l.dob = r.dob",
+    ]
+
+    results = {}
+    for early in [False, True]:
+        linker = make_linker(backend, settings)
+        df_predict = linker.predict(
+            threshold_match_weight=threshold_match_weight,
+            early_threshold_filtering=early,
+        ).as_pandas_dataframe()
+        cols = ["unique_id_l", "unique_id_r", "match_weight"]
+        results[early] = df_predict[cols].sort_values(cols[:2]).reset_index(drop=True)
+
+    assert len(results[False]) > 0
+    pd.testing.assert_frame_equal(results[False], results[True])
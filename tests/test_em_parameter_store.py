@@ -0,0 +1,183 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from splink.constants import LEVEL_NOT_OBSERVED_TEXT
+from splink.duckdb.duckdb_linker import DuckDBLinker
+from splink.em_parameter_store import (
+    LEVEL_NOT_OBSERVED_PROBABILITY,
+    EMParameterStore,
+)
+from splink.expectation_maximisation import m_u_counts_to_arrays
+from splink.settings import Settings
+from tests.basic_settings import get_settings_dict
+
+
+def _m_u_probabilities(settings_obj):
+    return {
+        (cc._output_column_name, cl._comparison_vector_value): (
+            cl.m_probability,
+            cl.u_probability,
+        )
+        for cc in settings_obj.comparisons
+        for cl in cc._comparison_levels_excluding_null
+    }
+
+
+def test_parameter_store_array_round_trip():
+    settings_obj = Settings(get_settings_dict())
+    parameters = EMParameterStore.from_settings_obj(settings_obj)
+
+    # first_name has three non-null levels, the other comparisons two
+    assert parameters.num_levels.tolist() == [3, 2, 2, 2, 2]
+    assert parameters.m_probabilities.shape == (5, 3)
+    # Columns are in descending comparison vector value, padded with NaN
+    np.testing.assert_array_equal(parameters.m_probabilities[0], [0.7, 0.2, 0.1])
+    np.testing.assert_array_equal(parameters.u_probabilities[1], [0.1, 0.9, np.nan])
+    assert parameters.m_observed[:, :2].all()
+
+    # Writing the arrays onto another settings object gives the same parameters
+    parameters.m_estimated = True
+    parameters.u_estimated = True
+    new_settings_obj = Settings(get_settings_dict())
+    for cc in new_settings_obj.comparisons:
+        for cl in cc._comparison_levels_excluding_null:
+            cl.m_probability = 0.5
+            cl.u_probability = 0.5
+    new_settings_obj._probability_two_random_records_match = 0.5
+
+    parameters.populate_settings_obj(new_settings_obj)
+    assert _m_u_probabilities(new_settings_obj) == _m_u_probabilities(settings_obj)
+    assert new_settings_obj._probability_two_random_records_match == pytest.approx(
+        settings_obj._probability_two_random_records_match
+    )
+
+
+def test_m_u_counts_to_arrays():
+    settings_obj = Settings(get_settings_dict())
+    parameters = EMParameterStore.from_settings_obj(settings_obj)
+
+    m_u_counts = pd.DataFrame(
+        [
+            ("first_name", 2, 30.0, 1.0),
+            ("first_name", 0, 10.0, 90.0),
+            ("first_name", -1, 5.0, 5.0),
+            ("surname", 1, 40.0, 2.0),
+            ("surname", 0, 1.0, 80.0),
+            ("_probability_two_random_records_match", 0, 0.25, 0.75),
+        ],
+        columns=["output_column_name", "comparison_vector_value", "m_count", "u_count"],
+    )
+    m_counts, u_counts, probability_two_random_records_match = m_u_counts_to_arrays(
+        settings_obj, parameters, m_u_counts
+    )
+
+    assert probability_two_random_records_match == 0.25
+    assert m_counts.shape == parameters.m_probabilities.shape
+    # The null level is dropped, and unobserved levels are NaN
+    np.testing.assert_array_equal(m_counts[0], [30.0, np.nan, 10.0])
+    np.testing.assert_array_equal(u_counts[1], [2.0, 80.0, np.nan])
+    assert np.isnan(m_counts[2:]).all()
+
+
+def test_maximise():
+    settings_obj = Settings(get_settings_dict())
+    parameters = EMParameterStore.from_settings_obj(settings_obj)
+    original_u = parameters.u_probabilities.copy()
+
+    m_counts = np.full(parameters.m_probabilities.shape, np.nan)
+    m_counts[:, :2] = [[3.0, 1.0]] * 5
+    m_counts[0] = [6.0, np.nan, 2.0]
+
+    parameters.maximise(
+        m_counts, m_counts, 0.1, fix_u_probabilities=True, fix_m_probabilities=False
+    )
+
+    assert parameters.m_estimated and not parameters.u_estimated
+    np.testing.assert_array_equal(parameters.u_probabilities, original_u)
+    np.testing.assert_allclose(
+        parameters.m_probabilities[0], [0.75, LEVEL_NOT_OBSERVED_PROBABILITY, 0.25]
+    )
+    np.testing.assert_allclose(parameters.m_probabilities[1, :2], [0.75, 0.25])
+    assert parameters.m_observed[0].tolist() == [True, False, True]
+    assert parameters.probability_two_random_records_match == 0.1
+
+    parameters.maximise(
+        m_counts, m_counts, 0.2, fix_probability_two_random_records_match=True
+    )
+    assert parameters.probability_two_random_records_match == 0.1
+
+
+def test_max_change():
+    settings_obj = Settings(get_settings_dict())
+    previous = EMParameterStore.from_settings_obj(settings_obj)
+
+    parameters = previous.copy()
+    assert parameters.max_change(previous)["max_abs_change_value"] == 0
+
+    parameters.m_probabilities[1, 0] -= 0.1
+    parameters.u_probabilities[0, 2] += 0.2
+    parameters.probability_two_random_records_match += 0.05
+    max_change = parameters.max_change(previous)
+    assert max_change["max_change_type"] == "u_probability"
+    assert max_change["max_change_value"] == pytest.approx(0.2)
+    assert max_change["index"] == (0, 2)
+
+    parameters.probability_two_random_records_match += 0.5
+    max_change = parameters.max_change(previous)
+    assert max_change["max_change_type"] == "probability_two_random_records_match"
+    assert max_change["max_abs_change_value"] == pytest.approx(0.55)
+    assert max_change["index"] is None
+
+
+def test_populate_settings_obj_warns_about_unobserved_levels(caplog):
+    settings_obj = Settings(get_settings_dict())
+    parameters = EMParameterStore.from_settings_obj(settings_obj)
+
+    counts = np.full(parameters.m_probabilities.shape, np.nan)
+    counts[:, :2] = 1.0
+    counts[0] = [1.0, np.nan, 1.0]
+    parameters.maximise(counts, counts, 0.1, fix_u_probabilities=True)
+
+    with caplog.at_level(logging.WARNING):
+        parameters.populate_settings_obj(settings_obj)
+
+    first_name_levels = settings_obj.comparisons[0]._comparison_levels_excluding_null
+    assert first_name_levels[1]._m_probability == LEVEL_NOT_OBSERVED_TEXT
+    assert first_name_levels[1].m_probability == LEVEL_NOT_OBSERVED_PROBABILITY
+    # u probabilities were not estimated, so are unchanged
+    assert first_name_levels[1].u_probability == 0.1
+
+    warnings = [r.getMessage() for r in caplog.records]
+    assert len(warnings) == 1
+    assert "not observed in dataset, unable to train m value" in warnings[0]
+
+
+@pytest.mark.parametrize("fix_u_probabilities", [False, True])
+def test_iteration_history_starts_from_starting_parameters(fix_u_probabilities, caplog):
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+    linker = DuckDBLinker(df, get_settings_dict())
+    linker.estimate_u_using_random_sampling(max_pairs=1e4, seed=1)
+    starting = _m_u_probabilities(linker._settings_obj)
+
+    linker.estimate_parameters_using_expectation_maximisation(
+        "l.surname = r.surname", fix_u_probabilities=fix_u_probabilities
+    )
+    session = linker._em_training_sessions[-1]
+
+    caplog.clear()
+    with caplog.at_level(logging.WARNING):
+        history = session._settings_obj_history
+    assert len(history) > 2
+    assert not caplog.records
+
+    iteration_0 = _m_u_probabilities(history[0])
+    assert iteration_0 == {k: v for k, v in starting.items() if k in iteration_0}
+
+    if fix_u_probabilities:
+        final = _m_u_probabilities(history[-1])
+        assert {k: u for k, (_, u) in final.items()} == {
+            k: u for k, (_, u) in iteration_0.items()
+        }
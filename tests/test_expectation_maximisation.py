@@ -35,3 +35,38 @@ def test_clear_error_when_empty_block():
         linker.estimate_parameters_using_expectation_maximisation(
             "l.surname = r.surname"
         )
+
+
+def test_estimate_without_term_frequencies():
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+    settings = {
+        "link_type": "dedupe_only",
+        "comparisons": [
+            cl.levenshtein_at_thresholds("first_name", 2),
+            cl.exact_match("surname"),
+            cl.exact_match("dob"),
+            cl.exact_match("city"),
+            cl.exact_match("email"),
+        ],
+        "blocking_rules_to_generate_predictions": ["l.surname = r.surname"],
+    }
+
+    linker_0 = DuckDBLinker(df, settings)
+    linker_1 = DuckDBLinker(df, settings)
+
+    session_0 = linker_0.estimate_parameters_using_expectation_maximisation(
+        "l.surname = r.surname"
+    )
+    session_1 = linker_1.estimate_parameters_using_expectation_maximisation(
+        "l.surname = r.surname", estimate_without_term_frequencies=True
+    )
+
+    assert len(session_0._settings_obj_history) == len(session_1._settings_obj_history)
+
+    records_0 = linker_0._settings_obj._parameters_as_detailed_records
+    records_1 = linker_1._settings_obj._parameters_as_detailed_records
+    for r_0, r_1 in zip(records_0, records_1):
+        assert r_0["comparison_name"] == r_1["comparison_name"]
+        assert r_0["m_probability"] == pytest.approx(r_1["m_probability"])
+        assert r_0["u_probability"] == pytest.approx(r_1["u_probability"])
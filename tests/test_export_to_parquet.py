@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+from tests.basic_settings import get_settings_dict
+
+pytest.importorskip("pyarrow")
+
+
+def _sorted(df):
+    cols = ["unique_id_l", "unique_id_r", "match_weight", "gamma_surname"]
+    df = df[cols].astype({"gamma_surname": int})
+    return df.sort_values(cols[:2]).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("backend", ["duckdb", "sqlite"])
+def test_as_arrow_and_to_parquet(backend, tmp_path, make_linker):
+    df_predict = make_linker(backend, get_settings_dict()).predict()
+    expected = df_predict.as_pandas_dataframe()
+
+    table = df_predict.as_arrow()
+    assert table.num_rows == len(expected)
+    assert table.column_names == list(expected.columns)
+    pd.testing.assert_frame_equal(_sorted(table.to_pandas()), _sorted(expected))
+
+    path = str(tmp_path / "predictions.parquet")
+    df_predict.to_parquet(path)
+    pd.testing.assert_frame_equal(_sorted(pd.read_parquet(path)), _sorted(expected))
+
+    with pytest.raises(ValueError):
+        df_predict.to_parquet(path)
+    df_predict.to_parquet(path, overwrite=True)
+
+    partitioned_path = tmp_path / "partitioned"
+    df_predict.to_parquet(str(partitioned_path), partition_by="gamma_surname")
+    assert {p.name for p in partitioned_path.iterdir()} == {
+        f"gamma_surname={v}" for v in expected["gamma_surname"].unique()
+    }
+    # Depending on the backend, the partition column may also be in the files
+    df_partitioned = pd.concat(
+        [pd.read_parquet(f) for f in partitioned_path.rglob("*.parquet")]
+    )
+    cols = ["unique_id_l", "unique_id_r", "match_weight"]
+    pd.testing.assert_frame_equal(
+        df_partitioned[cols].sort_values(cols).reset_index(drop=True),
+        expected[cols].sort_values(cols).reset_index(drop=True),
+    )
@@ -158,11 +158,28 @@ def test_link_only(input, source_l, source_r):
         input,
         settings,
     )
-    df_predict = linker.predict().as_pandas_dataframe()
-
-    assert len(df_predict) == 7257
-    assert set(df_predict.source_dataset_l.values) == source_l
-    assert set(df_predict.source_dataset_r.values) == source_r
+    df_predict = linker.predict()
+    df_predict_pd = df_predict.as_pandas_dataframe()
+
+    assert len(df_predict_pd) == 7257
+    assert set(df_predict_pd.source_dataset_l.values) == source_l
+    assert set(df_predict_pd.source_dataset_r.values) == source_r
+
+    # Both connected components algorithms should give identical cluster ids
+    cols = ["source_dataset", "unique_id", "cluster_id"]
+    clusters = {
+        algorithm: linker.cluster_pairwise_predictions_at_threshold(
+            df_predict, 0.5, algorithm=algorithm
+        )
+        .as_pandas_dataframe()[cols]
+        .sort_values(cols)
+        .reset_index(drop=True)
+        for algorithm in ["label_propagation", "star_contraction", "union_find"]
+    }
+    for algorithm in ["star_contraction", "union_find"]:
+        pd.testing.assert_frame_equal(
+            clusters["label_propagation"], clusters[algorithm]
+        )
 
 
 @pytest.mark.parametrize(
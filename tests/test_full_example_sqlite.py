@@ -55,6 +55,9 @@ def test_full_example_sqlite(tmp_path):
     )
 
     linker.cluster_pairwise_predictions_at_threshold(df_predict, 0.5)
+    linker.cluster_pairwise_predictions_at_threshold(
+        df_predict, 0.5, algorithm="union_find"
+    )
 
     linker.unlinkables_chart(source_dataset="Testing")
 
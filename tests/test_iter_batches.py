@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+from tests.basic_settings import get_settings_dict
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.mark.parametrize("backend", ["duckdb", "sqlite"])
+def test_iter_batches_of_predictions(backend, make_linker):
+    linker = make_linker(backend, get_settings_dict())
+
+    df_predict = linker.predict()
+    expected = df_predict.as_pandas_dataframe()
+
+    batches = list(df_predict.iter_batches(batch_size=1000))
+    assert len(batches) > 1
+    assert all(batch.num_rows <= 1000 for batch in batches)
+
+    result = pd.concat([batch.to_pandas() for batch in batches], ignore_index=True)
+    assert list(result.columns) == list(expected.columns)
+
+    cols = ["unique_id_l", "unique_id_r", "match_weight"]
+    pd.testing.assert_frame_equal(
+        result[cols].sort_values(cols[:2]).reset_index(drop=True),
+        expected[cols].sort_values(cols[:2]).reset_index(drop=True),
+    )
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from tests.basic_settings import get_settings_dict
+
+
+@pytest.mark.parametrize("backend", ["duckdb", "sqlite"])
+def test_match_weight_lookup_gives_same_predictions(backend, make_linker):
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        "l.surname = r.surname",
+        "l.dob = r.dob",
+    ]
+
+    results = {}
+    for use_lookup in [False, True]:
+        linker = make_linker(backend, settings)
+        linker._predict_using_match_weight_lookup = use_lookup
+        results[use_lookup] = {
+            "full": linker.predict(),
+            "threshold": linker.predict(threshold_match_weight=5),
+            "compact": linker.predict(compact_output=True),
+        }
+
+    for output in ["full", "threshold", "compact"]:
+        expected = results[False][output].as_pandas_dataframe()
+        actual = results[True][output].as_pandas_dataframe()
+        assert list(actual.columns) == list(expected.columns)
+        uid_cols = ["unique_id_l", "unique_id_r"]
+        pd.testing.assert_frame_equal(
+            actual.sort_values(uid_cols).reset_index(drop=True),
+            expected.sort_values(uid_cols).reset_index(drop=True),
+            check_dtype=False,
+        )
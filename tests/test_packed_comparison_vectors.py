@@ -0,0 +1,104 @@
+import pandas as pd
+import pytest
+
+from splink.comparison_vector_distribution import comparison_vector_distribution_sql
+from splink.duckdb.duckdb_linker import DuckDBLinker
+from splink.settings import Settings
+from tests.basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+uid_cols = ["unique_id_l", "unique_id_r"]
+
+
+def _sorted(df, by):
+    return df.sort_values(by).reset_index(drop=True)
+
+
+def test_packed_comparison_vector_layout():
+    settings = get_settings_dict()
+    settings["pack_comparison_vectors"] = True
+    settings_obj = Settings(settings)
+
+    # first_name has three non-null levels, so its values (plus one) need two bits
+    layout = [
+        (cc._output_column_name, offset, num_bits)
+        for cc, offset, num_bits in settings_obj._packed_comparison_vector_layout
+    ]
+    assert layout == [
+        ("first_name", 0, 2),
+        ("surname", 2, 2),
+        ("dob", 4, 2),
+        ("email", 6, 2),
+        ("city", 8, 2),
+    ]
+
+    settings["comparisons"] = settings["comparisons"] * 7
+    for i, cc in enumerate(settings["comparisons"]):
+        settings["comparisons"][i] = {**cc, "output_column_name": f"c_{i}"}
+    with pytest.raises(ValueError):
+        Settings(settings)
+
+
+@pytest.mark.parametrize("use_lookup", [False, True])
+def test_packed_comparison_vectors_give_same_predictions(use_lookup):
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        "l.surname = r.surname",
+        "l.dob = r.dob",
+    ]
+
+    results = {}
+    for pack in [False, True]:
+        settings["pack_comparison_vectors"] = pack
+        linker = DuckDBLinker(df, settings)
+        linker._predict_using_match_weight_lookup = use_lookup
+        df_predict = linker.predict()
+        results[pack] = {
+            "predict": df_predict.as_pandas_dataframe(),
+            "distribution": linker.query_sql(
+                comparison_vector_distribution_sql(linker).replace(
+                    "__splink__df_predict", df_predict.physical_name
+                )
+            ),
+        }
+
+    df_packed = results[True]["predict"]
+    assert "packed_comparison_vector" in df_packed.columns
+    gamma = df_packed["packed_comparison_vector"]
+    assert ((gamma % 4) - 1 == df_packed["gamma_first_name"]).all()
+    assert (((gamma // 256) % 4) - 1 == df_packed["gamma_city"]).all()
+
+    pd.testing.assert_frame_equal(
+        _sorted(df_packed.drop(columns="packed_comparison_vector"), uid_cols),
+        _sorted(results[False]["predict"], uid_cols),
+    )
+
+    by = ["gam_concat"]
+    pd.testing.assert_frame_equal(
+        _sorted(results[True]["distribution"], by),
+        _sorted(results[False]["distribution"], by),
+        check_dtype=False,
+    )
+
+
+@pytest.mark.parametrize("estimate_without_term_frequencies", [False, True])
+def test_packed_comparison_vectors_give_same_parameter_estimates(
+    estimate_without_term_frequencies,
+):
+    settings = get_settings_dict()
+
+    estimates = {}
+    for pack in [False, True]:
+        settings["pack_comparison_vectors"] = pack
+        linker = DuckDBLinker(df, settings)
+        linker.estimate_u_using_random_sampling(max_pairs=1e4, seed=1)
+        linker.estimate_parameters_using_expectation_maximisation(
+            "l.surname = r.surname",
+            estimate_without_term_frequencies=estimate_without_term_frequencies,
+        )
+        estimates[pack] = linker._settings_obj._parameter_estimates_as_records
+
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(estimates[True]), pd.DataFrame(estimates[False])
+    )
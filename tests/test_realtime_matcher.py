@@ -0,0 +1,55 @@
+import pandas as pd
+
+from splink.duckdb.duckdb_linker import DuckDBLinker
+from tests.basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+uid_cols = ["unique_id_l", "unique_id_r"]
+
+
+def _tables(linker, prefix):
+    tables = linker.query_sql(
+        "select table_name from information_schema.tables "
+        f"where starts_with(table_name, '{prefix}')"
+    )
+    return list(tables["table_name"])
+
+
+def test_realtime_matcher_matches_find_matches_to_new_records():
+    linker = DuckDBLinker(df, get_settings_dict())
+    blocking_rules = ["l.surname = r.surname", "l.dob = r.dob"]
+    records = df.sample(5, random_state=1).to_dict("records")
+
+    expected = []
+    for record in records:
+        expected.append(
+            linker.find_matches_to_new_records(
+                [record], blocking_rules=blocking_rules, match_weight_threshold=-4
+            ).as_pandas_dataframe()
+        )
+    # The records registered by find_matches_to_new_records are dropped
+    assert _tables(linker, "__splink__df_new_records") == []
+
+    with linker.realtime_matcher(blocking_rules, match_weight_threshold=-4) as matcher:
+        cache = linker._intermediate_table_cache
+        assert "__splink__df_tf_first_name" in cache.pinned_templated_names
+
+        for record, df_expected in zip(records, expected):
+            df_matches = matcher.find_matches([record]).as_pandas_dataframe()
+            assert len(df_matches) > 0
+            pd.testing.assert_frame_equal(
+                df_matches.sort_values(uid_cols).reset_index(drop=True),
+                df_expected.sort_values(uid_cols).reset_index(drop=True),
+            )
+
+        # Each lookup reuses the same staging and output tables
+        assert len(_tables(linker, "__splink__df_new_records")) == 1
+        assert len(_tables(linker, matcher._predictions_tablename)) == 1
+
+    assert _tables(linker, "__splink__df_new_records") == []
+    assert _tables(linker, matcher._predictions_tablename) == []
+    assert cache.pinned_templated_names == {"__splink__df_concat_with_tf"}
+    # The linker's settings are unchanged
+    assert linker._settings_obj._link_type == "dedupe_only"
+    assert not linker._find_new_matches_mode
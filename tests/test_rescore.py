@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from splink.duckdb.duckdb_linker import DuckDBLinker
+from tests.basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+uid_cols = ["unique_id_l", "unique_id_r"]
+
+
+def _sorted(df):
+    return df.sort_values(uid_cols).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("use_lookup", [False, True])
+def test_rescore_matches_predict_after_parameters_change(use_lookup):
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        "l.surname = r.surname",
+        "l.dob = r.dob",
+    ]
+    linker = DuckDBLinker(df, settings)
+    linker._predict_using_match_weight_lookup = use_lookup
+
+    with pytest.raises(ValueError):
+        linker.rescore()
+
+    df_predict = linker.predict(retain_comparison_vectors=True).as_pandas_dataframe()
+    df_rescored = linker.rescore().as_pandas_dataframe()
+    pd.testing.assert_frame_equal(_sorted(df_rescored), _sorted(df_predict))
+
+    df_comparison_vectors = linker._intermediate_table_cache[
+        "__splink__df_comparison_vectors"
+    ]
+
+    linker.estimate_parameters_using_expectation_maximisation(
+        "l.first_name = r.first_name"
+    )
+    df_predict = linker.predict(threshold_match_weight=2).as_pandas_dataframe()
+
+    for df_cvs in [None, df_comparison_vectors, df_comparison_vectors.physical_name]:
+        df_rescored = linker.rescore(
+            df_cvs, threshold_match_weight=2
+        ).as_pandas_dataframe()
+        pd.testing.assert_frame_equal(_sorted(df_rescored), _sorted(df_predict))
+
+
+def test_rescore_after_early_threshold_filtering_keeps_all_pairs():
+    settings = get_settings_dict()
+    settings["blocking_rules_to_generate_predictions"] = [
+        "l.surname = r.surname",
+        "l.dob = r.dob",
+    ]
+    linker = DuckDBLinker(df, settings)
+
+    # The early filter would discard pairs using the current parameters, so is not
+    # applied to comparison vectors which are retained for rescoring
+    linker.predict(
+        threshold_match_weight=8,
+        early_threshold_filtering=True,
+        retain_comparison_vectors=True,
+    )
+
+    linker.estimate_parameters_using_expectation_maximisation(
+        "l.first_name = r.first_name"
+    )
+    df_predict = linker.predict(threshold_match_weight=8).as_pandas_dataframe()
+    df_rescored = linker.rescore(threshold_match_weight=8).as_pandas_dataframe()
+    pd.testing.assert_frame_equal(_sorted(df_rescored), _sorted(df_predict))
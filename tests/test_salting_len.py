@@ -1,5 +1,7 @@
+import pandas as pd
 import pytest
 
+from splink.duckdb.duckdb_linker import DuckDBLinker
 from splink.spark.spark_linker import SparkLinker
 from tests.basic_settings import get_settings_dict
 
@@ -25,6 +27,7 @@ def generate_linker_output(
     df,
     link_type="dedupe_only",
     blocking_rules=None,
+    linker_class=SparkLinker,
 ):
     # Adjust our settings object
     settings = get_settings_dict()
@@ -33,7 +36,9 @@ def generate_linker_output(
         settings["blocking_rules_to_generate_predictions"] = blocking_rules
     settings["link_type"] = link_type
 
-    linker = SparkLinker(df, settings)
+    linker = linker_class(df, settings)
+    # Salting is only applied by default by the SparkLinker
+    linker._supports_salting = True
 
     df_predict = linker.predict()
     df_predict = df_predict.as_pandas_dataframe()
@@ -73,3 +78,60 @@ def test_salting_spark(spark):
 
     check_same_ids(df1, df2)
     check_answer(df1, df2)
+
+
+blocking_rules_no_salt = [
+    "l.city = r.city and levenshtein(l.surname, r.surname) < 3",
+    "l.first_name = r.first_name",
+    "l.dob = r.dob",
+]
+
+blocking_rules_salting_skewed_keys = [
+    {
+        "blocking_rule": "l.city = r.city and levenshtein(l.surname, r.surname) < 3",
+        "salting_partitions": 4,
+        "skewed_key_threshold": 30,
+    },
+    {
+        "blocking_rule": "l.first_name = r.first_name",
+        "salting_partitions": 3,
+        "skewed_key_threshold": 5,
+    },
+    "l.dob = r.dob",
+]
+
+
+def test_salting_skewed_keys_spark(spark):
+    df_spark = spark.read.csv(
+        "./tests/datasets/fake_1000_from_splink_demos.csv", header=True
+    )
+    spark.catalog.dropTempView("__splink__df_concat_with_tf")
+    df1 = generate_linker_output(df=df_spark, blocking_rules=blocking_rules_no_salt)
+    spark.catalog.dropTempView("__splink__df_concat_with_tf")
+
+    df_spark = spark.read.csv(
+        "./tests/datasets/fake_1000_from_splink_demos.csv", header=True
+    )
+    df2 = generate_linker_output(
+        df=df_spark, blocking_rules=blocking_rules_salting_skewed_keys
+    )
+
+    check_same_ids(df1, df2)
+    check_answer(df1, df2)
+
+
+def test_salting_skewed_keys_duckdb():
+    df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+    df1 = generate_linker_output(
+        df=df, blocking_rules=blocking_rules_no_salt, linker_class=DuckDBLinker
+    )
+    df2 = generate_linker_output(
+        df=df,
+        blocking_rules=blocking_rules_salting_skewed_keys,
+        linker_class=DuckDBLinker,
+    )
+
+    check_same_ids(df1, df2)
+    check_answer(df1, df2)
+    assert list(df1["match_key"]) == list(df2["match_key"])
@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from splink.duckdb.duckdb_linker import DuckDBLinker
+from tests.basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+
+
+@pytest.mark.parametrize("link_type", ["dedupe_only", "link_and_dedupe"])
+@pytest.mark.parametrize("algorithm", ["label_propagation", "union_find"])
+def test_update_clusters_matches_clustering_from_scratch(link_type, algorithm):
+    settings = get_settings_dict()
+    settings["link_type"] = link_type
+
+    if link_type == "dedupe_only":
+        linker = DuckDBLinker(df, settings)
+        uid_cols = ["unique_id"]
+    else:
+        linker = DuckDBLinker([df.iloc[:500], df.iloc[500:]], settings)
+        uid_cols = ["source_dataset", "unique_id"]
+
+    threshold = 0.5
+    df_predict = linker.predict()
+    df_predict_pd = df_predict.as_pandas_dataframe()
+
+    # Treat one in five records as new records
+    def is_new(unique_id):
+        return unique_id % 5 == 0
+
+    is_new_pair = is_new(df_predict_pd["unique_id_l"]) | is_new(
+        df_predict_pd["unique_id_r"]
+    )
+    df_old_predictions = linker.register_table(
+        df_predict_pd[~is_new_pair], "old_predictions", overwrite=True
+    )
+    df_new_predictions = linker.register_table(
+        df_predict_pd[is_new_pair], "new_predictions", overwrite=True
+    )
+
+    df_old_clusters = linker.cluster_pairwise_predictions_at_threshold(
+        df_old_predictions, threshold
+    ).as_pandas_dataframe()
+    df_old_clusters = df_old_clusters[~is_new(df_old_clusters["unique_id"])]
+    df_old_clusters = linker.register_table(
+        df_old_clusters[["cluster_id"] + uid_cols], "old_clusters", overwrite=True
+    )
+
+    df_updated = linker.update_clusters_from_new_predictions(
+        df_old_clusters, df_new_predictions, threshold, algorithm=algorithm
+    ).as_pandas_dataframe()
+
+    df_expected = linker.cluster_pairwise_predictions_at_threshold(
+        df_predict, threshold
+    ).as_pandas_dataframe()
+
+    # Only new records which appear in the new predictions are added
+    new_ids_in_predictions = set(df_predict_pd.loc[is_new_pair, "unique_id_l"]) | set(
+        df_predict_pd.loc[is_new_pair, "unique_id_r"]
+    )
+    df_expected = df_expected[
+        ~is_new(df_expected["unique_id"])
+        | df_expected["unique_id"].isin(new_ids_in_predictions)
+    ]
+
+    cols = ["cluster_id"] + uid_cols
+    pd.testing.assert_frame_equal(
+        df_updated[cols].sort_values(cols).reset_index(drop=True),
+        df_expected[cols].sort_values(cols).reset_index(drop=True),
+    )
@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from splink.duckdb.duckdb_linker import DuckDBLinker
+from tests.basic_settings import get_settings_dict
+
+df = pd.read_csv("./tests/datasets/fake_1000_from_splink_demos.csv")
+df["unused_col"] = "x"
+
+
+@pytest.mark.parametrize("link_type", ["dedupe_only", "link_and_dedupe"])
+def test_select_only_columns_used_by_model(link_type):
+    settings = get_settings_dict()
+    settings["link_type"] = link_type
+    settings["blocking_rules_to_generate_predictions"] = [
+        "l.surname = r.surname",
+        "l.dob = r.dob",
+    ]
+    settings["additional_columns_to_retain"] = []
+
+    if link_type == "dedupe_only":
+        input_tables = df
+    else:
+        input_tables = [df.iloc[:500], df.iloc[500:]]
+
+    results = {}
+    for select_only_used in [False, True]:
+        settings["select_only_columns_used_by_model"] = select_only_used
+        linker = DuckDBLinker(input_tables, settings)
+        df_predict = linker.predict().as_pandas_dataframe()
+        results[select_only_used] = df_predict.sort_values(
+            ["unique_id_l", "unique_id_r"]
+        ).reset_index(drop=True)
+
+        concat_columns = {
+            c.unquote().name() for c in linker._initialise_df_concat_with_tf().columns
+        }
+        assert ("unused_col" in concat_columns) is not select_only_used
+        assert ("group" in concat_columns) is not select_only_used
+        assert {"unique_id", "surname", "dob", "tf_first_name"} <= concat_columns
+
+    pd.testing.assert_frame_equal(results[False], results[True])